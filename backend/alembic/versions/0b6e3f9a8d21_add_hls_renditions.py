@@ -0,0 +1,55 @@
+"""Add HLS renditions
+
+Revision ID: 0b6e3f9a8d21
+Revises: f4a8d25e6c17
+Create Date: 2026-10-17 19:08:03.552471
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import table_columns
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b6e3f9a8d21'
+down_revision: Union[str, Sequence[str], None] = 'f4a8d25e6c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = table_columns('videos')
+    if columns is None:
+        return
+    if 'hls_prefix' not in columns:
+        op.add_column('videos', sa.Column('hls_prefix', sa.String(length=255), nullable=True))
+    op.create_table('video_renditions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('video_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=20), nullable=False),
+    sa.Column('width', sa.Integer(), nullable=False),
+    sa.Column('height', sa.Integer(), nullable=False),
+    sa.Column('bandwidth', sa.Integer(), nullable=False),
+    sa.Column('codecs', sa.String(length=100), nullable=True),
+    sa.Column('playlist', sa.String(length=255), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['video_id'], ['videos.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True
+    )
+    op.create_index(op.f('ix_video_renditions_id'), 'video_renditions', ['id'], unique=False, if_not_exists=True)
+    op.create_index(op.f('ix_video_renditions_video_id'), 'video_renditions', ['video_id'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if table_columns('videos') is None:
+        return
+    op.drop_index(op.f('ix_video_renditions_video_id'), table_name='video_renditions', if_exists=True)
+    op.drop_index(op.f('ix_video_renditions_id'), table_name='video_renditions', if_exists=True)
+    op.drop_table('video_renditions', if_exists=True)
+    op.drop_column('videos', 'hls_prefix')
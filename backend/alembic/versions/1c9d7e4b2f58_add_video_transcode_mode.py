@@ -0,0 +1,36 @@
+"""Add video transcode mode
+
+Revision ID: 1c9d7e4b2f58
+Revises: 0b6e3f9a8d21
+Create Date: 2026-10-17 19:09:27.904615
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import table_columns
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1c9d7e4b2f58'
+down_revision: Union[str, Sequence[str], None] = '0b6e3f9a8d21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = table_columns('videos')
+    if columns is None:
+        return
+    if 'transcode_mode' not in columns:
+        op.add_column('videos', sa.Column('transcode_mode', sa.String(length=20), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if table_columns('videos') is None:
+        return
+    op.drop_column('videos', 'transcode_mode')
@@ -0,0 +1,71 @@
+"""Add video assets
+
+Revision ID: 2d4a6b8c0e93
+Revises: 1c9d7e4b2f58
+Create Date: 2026-10-17 19:11:52.268130
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import table_columns
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2d4a6b8c0e93'
+down_revision: Union[str, Sequence[str], None] = '1c9d7e4b2f58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = table_columns('videos')
+    if columns is None:
+        return
+    op.create_table('video_assets',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('content_hash', sa.String(length=64), nullable=False),
+    sa.Column('filename', sa.String(length=255), nullable=False),
+    sa.Column('video_url', sa.String(length=500), nullable=False),
+    sa.Column('thumbnail_url', sa.String(length=500), nullable=True),
+    sa.Column('hls_prefix', sa.String(length=255), nullable=True),
+    sa.Column('duration', sa.Float(), nullable=False),
+    sa.Column('width', sa.Integer(), nullable=False),
+    sa.Column('height', sa.Integer(), nullable=False),
+    sa.Column('fps', sa.Float(), nullable=True),
+    sa.Column('codec', sa.String(length=20), nullable=True),
+    sa.Column('transcode_mode', sa.String(length=20), nullable=True),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    if_not_exists=True
+    )
+    op.create_index(op.f('ix_video_assets_id'), 'video_assets', ['id'], unique=False, if_not_exists=True)
+    op.create_index(op.f('ix_video_assets_content_hash'), 'video_assets', ['content_hash'], unique=True, if_not_exists=True)
+    if 'content_hash' not in columns:
+        op.add_column('videos', sa.Column('content_hash', sa.String(length=64), nullable=True))
+    if 'asset_id' not in columns:
+        op.add_column('videos', sa.Column('asset_id', sa.Integer(), nullable=True))
+        if op.get_context().dialect.name != 'sqlite':  # SQLite cannot add constraints to a table
+            # Named as Postgres names the constraint create_all makes
+            op.create_foreign_key('videos_asset_id_fkey', 'videos', 'video_assets', ['asset_id'], ['id'])
+    op.create_index(op.f('ix_videos_content_hash'), 'videos', ['content_hash'], unique=False, if_not_exists=True)
+    op.create_index(op.f('ix_videos_asset_id'), 'videos', ['asset_id'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if table_columns('videos') is None:
+        return
+    op.drop_index(op.f('ix_videos_asset_id'), table_name='videos', if_exists=True)
+    op.drop_index(op.f('ix_videos_content_hash'), table_name='videos', if_exists=True)
+    if op.get_context().dialect.name != 'sqlite':
+        op.drop_constraint('videos_asset_id_fkey', 'videos', type_='foreignkey')
+    op.drop_column('videos', 'asset_id')
+    op.drop_column('videos', 'content_hash')
+    op.drop_index(op.f('ix_video_assets_content_hash'), table_name='video_assets', if_exists=True)
+    op.drop_index(op.f('ix_video_assets_id'), table_name='video_assets', if_exists=True)
+    op.drop_table('video_assets', if_exists=True)
@@ -0,0 +1,36 @@
+"""Add video processing lease
+
+Revision ID: 3e5f7a9b1c24
+Revises: d81f4b2c9a6e
+Create Date: 2026-10-17 20:41:07.552318
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import table_columns
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e5f7a9b1c24'
+down_revision: Union[str, Sequence[str], None] = 'd81f4b2c9a6e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = table_columns('videos')
+    if columns is None:
+        return
+    if 'processing_started_at' not in columns:
+        op.add_column('videos', sa.Column('processing_started_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if table_columns('videos') is None:
+        return
+    op.drop_column('videos', 'processing_started_at')
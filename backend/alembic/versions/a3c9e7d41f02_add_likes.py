@@ -0,0 +1,49 @@
+"""Add likes
+
+Revision ID: a3c9e7d41f02
+Revises: fce35b6afc69
+Create Date: 2026-10-17 15:02:18.517344
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import table_columns
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c9e7d41f02'
+down_revision: Union[str, Sequence[str], None] = 'fce35b6afc69'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = table_columns('videos')
+    if columns is None:
+        return
+    if 'like_count' not in columns:
+        # Constant default: no table rewrite on Postgres 11+
+        op.add_column('videos', sa.Column('like_count', sa.Integer(), server_default='0', nullable=False))
+    op.create_table('likes',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('video_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['video_id'], ['videos.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'video_id'),
+    if_not_exists=True
+    )
+    op.create_index('ix_likes_video_id', 'likes', ['video_id'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if table_columns('videos') is None:
+        return
+    op.drop_index('ix_likes_video_id', table_name='likes', if_exists=True)
+    op.drop_table('likes', if_exists=True)
+    op.drop_column('videos', 'like_count')
@@ -0,0 +1,49 @@
+"""Add follows
+
+Revision ID: d81f4b2c9a6e
+Revises: a3c9e7d41f02
+Create Date: 2026-10-17 18:41:07.204519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import table_columns
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd81f4b2c9a6e'
+down_revision: Union[str, Sequence[str], None] = 'a3c9e7d41f02'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = table_columns('users')
+    for name in ('follower_count', 'following_count'):
+        if name not in columns:
+            op.add_column('users', sa.Column(name, sa.Integer(), server_default='0', nullable=False))
+    op.create_table('follows',
+    sa.Column('follower_id', sa.Integer(), nullable=False),
+    sa.Column('followee_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.CheckConstraint('follower_id <> followee_id', name='ck_follows_not_self'),
+    sa.ForeignKeyConstraint(['followee_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['follower_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('follower_id', 'followee_id'),
+    if_not_exists=True
+    )
+    op.create_index('ix_follows_followee_created', 'follows', ['followee_id', sa.text('created_at DESC'), sa.text('follower_id DESC')], unique=False, if_not_exists=True)
+    op.create_index('ix_follows_follower_created', 'follows', ['follower_id', sa.text('created_at DESC'), sa.text('followee_id DESC')], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_follows_follower_created', table_name='follows', if_exists=True)
+    op.drop_index('ix_follows_followee_created', table_name='follows', if_exists=True)
+    op.drop_table('follows', if_exists=True)
+    op.drop_column('users', 'following_count')
+    op.drop_column('users', 'follower_count')
@@ -0,0 +1,45 @@
+"""Add video processing state
+
+Revision ID: e2b7c4a19d03
+Revises: bc185a8772b1
+Create Date: 2026-10-17 19:05:12.381904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import table_columns
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7c4a19d03'
+down_revision: Union[str, Sequence[str], None] = 'bc185a8772b1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COLUMNS = [
+    sa.Column('processing_error', sa.Text(), nullable=True),
+    sa.Column('processing_attempts', sa.Integer(), server_default='0', nullable=True),
+    sa.Column('source_path', sa.String(length=500), nullable=True),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = table_columns('videos')
+    if columns is None:
+        return
+    for column in COLUMNS:
+        if column.name not in columns:
+            op.add_column('videos', column.copy())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if table_columns('videos') is None:
+        return
+    for column in reversed(COLUMNS):
+        op.drop_column('videos', column.name)
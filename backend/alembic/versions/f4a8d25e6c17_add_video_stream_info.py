@@ -0,0 +1,44 @@
+"""Add video fps and codec
+
+Revision ID: f4a8d25e6c17
+Revises: e2b7c4a19d03
+Create Date: 2026-10-17 19:06:40.117352
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import table_columns
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a8d25e6c17'
+down_revision: Union[str, Sequence[str], None] = 'e2b7c4a19d03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COLUMNS = [
+    sa.Column('fps', sa.Float(), nullable=True),
+    sa.Column('codec', sa.String(length=20), nullable=True),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = table_columns('videos')
+    if columns is None:
+        return
+    for column in COLUMNS:
+        if column.name not in columns:
+            op.add_column('videos', column.copy())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if table_columns('videos') is None:
+        return
+    for column in reversed(COLUMNS):
+        op.drop_column('videos', column.name)
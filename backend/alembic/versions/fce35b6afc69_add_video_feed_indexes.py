@@ -0,0 +1,56 @@
+"""Add video feed indexes
+
+Revision ID: fce35b6afc69
+Revises: 2d4a6b8c0e93
+Create Date: 2026-10-17 10:12:44.281935
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.migrations import table_columns
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'fce35b6afc69'
+down_revision: Union[str, Sequence[str], None] = '2d4a6b8c0e93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FEED_INDEXES = {
+    # Public feed: GET /videos/
+    'ix_videos_public_feed': (
+        ['created_at DESC', 'id DESC'],
+        "is_public AND NOT is_deleted AND processing_status = 'completed'"
+    ),
+    # One creator's videos: GET /videos/my-videos and GET /videos/?creator_id=
+    'ix_videos_creator_feed': (
+        ['creator_id', 'created_at DESC', 'id DESC'],
+        'NOT is_deleted'
+    ),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if table_columns('videos') is None:
+        return
+    # Build without locking writes out of a live table
+    with op.get_context().autocommit_block():
+        for name, (columns, where) in FEED_INDEXES.items():
+            op.create_index(
+                name, 'videos', [sa.text(column) for column in columns],
+                unique=False, if_not_exists=True,
+                postgresql_where=sa.text(where), postgresql_concurrently=True
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if table_columns('videos') is None:
+        return
+    with op.get_context().autocommit_block():
+        for name in FEED_INDEXES:
+            op.drop_index(name, table_name='videos', if_exists=True, postgresql_concurrently=True)
@@ -1,58 +1,38 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.security import verify_password, create_access_token, verify_token
-from app.schemas.user import UserCreate, User, UserLogin, Token
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
+from app.core.rate_limit import rate_limit
+from app.core.security import create_access_token, get_current_user
+from app.schemas.user import Principal, UserCreate, User, UserLogin, Token
 from app.services.user_service import UserService
-from app.models.user import User as UserModel
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    user_id = verify_token(token)
-    if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    user_service = UserService(db)
-    user = user_service.get_user_by_id(int(user_id))
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found"
-        )
-    return user
-
-@router.post("/register", response_model=User)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+@router.post("/register", response_model=User, dependencies=[Depends(rate_limit("auth"))])
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_async_db)):
     user_service = UserService(db)
     
     # Check if user already exists
-    if user_service.get_user_by_email(user_data.email):
+    if await user_service.get_user_by_email(user_data.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    if user_service.get_user_by_username(user_data.username):
+    if await user_service.get_user_by_username(user_data.username):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already taken"
         )
     
     # Create new user
-    user = user_service.create_user(user_data)
+    user = await user_service.create_user(user_data)
     return user
 
-@router.post("/login", response_model=Token)
-async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
+@router.post("/login", response_model=Token, dependencies=[Depends(rate_limit("auth"))])
+async def login(user_credentials: UserLogin, db: AsyncSession = Depends(get_async_db)):
     user_service = UserService(db)
-    user = user_service.authenticate_user(user_credentials.email, user_credentials.password)
+    user = await user_service.authenticate_user(user_credentials.email, user_credentials.password)
     
     if not user:
         raise HTTPException(
@@ -65,5 +45,9 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
     return {"access_token": access_token, "token_type": "bearer"}
 
 @router.get("/me", response_model=User)
-async def read_users_me(current_user: UserModel = Depends(get_current_user)):
-    return current_user
+async def read_users_me(current_user: Principal = Depends(get_current_user), db: AsyncSession = Depends(get_async_db)):
+    # The full profile is not cached; only this endpoint needs it
+    user = await UserService(db).get_user_by_id(current_user.id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return user
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.database import get_async_db
+from app.core.rate_limit import rate_limit
 from app.services.user_service import UserService
 from app.schemas.user import UserUpdate
 from pydantic import BaseModel, EmailStr
@@ -14,13 +15,13 @@ class PasswordReset(BaseModel):
     token: str
     new_password: str
 
-@router.post("/request-password-reset")
+@router.post("/request-password-reset", dependencies=[Depends(rate_limit("auth"))])
 async def request_password_reset(
     request: PasswordResetRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     user_service = UserService(db)
-    user = user_service.get_user_by_email(request.email)
+    user = await user_service.get_user_by_email(request.email)
     
     if not user:
         # Don't reveal if email exists or not for security
@@ -33,10 +34,10 @@ async def request_password_reset(
     
     return {"message": "If the email exists, a password reset link has been sent"}
 
-@router.post("/reset-password")
+@router.post("/reset-password", dependencies=[Depends(rate_limit("auth"))])
 async def reset_password(
     reset_data: PasswordReset,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # In a real implementation, you would:
     # 1. Verify the token from Redis
@@ -0,0 +1,105 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from app.core.database import get_async_db
+from app.core.pagination import InvalidCursor, Page
+from app.core.security import get_current_user
+from app.models.user import User
+from app.schemas.user import (
+    FollowingLookupResponse,
+    FollowResponse,
+    Principal,
+    UserListResponse,
+    UserProfile,
+    UserSummary
+)
+from app.services.follow_service import FollowService
+from config import FOLLOW_LOOKUP_MAX_IDS
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+async def _active_user(user_id: int, db: AsyncSession) -> User:
+    user = await db.get(User, user_id)
+    if user is None or not user.is_active:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+def _user_list(page: Page) -> UserListResponse:
+    return UserListResponse(
+        users=[UserSummary.model_validate(user) for user in page.items],
+        has_next=page.has_next,
+        next_cursor=page.next_cursor
+    )
+
+@router.get("/me/following/lookup", response_model=FollowingLookupResponse)
+async def lookup_following(
+    ids: List[int] = Query(..., max_length=FOLLOW_LOOKUP_MAX_IDS),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Which of these users the current user follows.
+
+    Meant to be called once per page of videos or users with every creator
+    on it, rather than once per row.
+    """
+    following = await FollowService(db).following_among(current_user.id, ids)
+    return FollowingLookupResponse(following=[user_id for user_id in dict.fromkeys(ids) if user_id in following])
+
+@router.get("/{user_id}", response_model=UserProfile)
+async def get_user_profile(user_id: int, db: AsyncSession = Depends(get_async_db)):
+    """A user's public profile, with follower and following counts"""
+    return await _active_user(user_id, db)
+
+@router.post("/{user_id}/follow", response_model=FollowResponse)
+async def follow_user(
+    user_id: int,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Follow a user; following again changes nothing"""
+    if user_id == current_user.id:
+        raise HTTPException(status_code=400, detail="You cannot follow yourself")
+    followee = await _active_user(user_id, db)
+    await FollowService(db).follow(current_user.id, user_id)
+    await db.refresh(followee, ["follower_count"])
+    return FollowResponse(user_id=user_id, following=True, follower_count=followee.follower_count)
+
+@router.delete("/{user_id}/follow", response_model=FollowResponse)
+async def unfollow_user(
+    user_id: int,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Stop following a user"""
+    followee = await _active_user(user_id, db)
+    await FollowService(db).unfollow(current_user.id, user_id)
+    await db.refresh(followee, ["follower_count"])
+    return FollowResponse(user_id=user_id, following=False, follower_count=followee.follower_count)
+
+@router.get("/{user_id}/followers", response_model=UserListResponse)
+async def get_followers(
+    user_id: int,
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """A user's followers, most recent first"""
+    await _active_user(user_id, db)
+    try:
+        return _user_list(await FollowService(db).followers(user_id, page_size, cursor))
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/{user_id}/following", response_model=UserListResponse)
+async def get_following(
+    user_id: int,
+    page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Whom a user follows, most recently followed first"""
+    await _active_user(user_id, db)
+    try:
+        return _user_list(await FollowService(db).following(user_id, page_size, cursor))
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -1,209 +1,315 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Request, Response
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import os
+import re
 import mimetypes
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.models.video import Video
-from app.models.user import User
+from app.schemas.user import Principal
 from app.schemas.video import (
     VideoCreate, 
     VideoUpdate, 
     Video as VideoSchema, 
     VideoUploadResponse,
-    VideoListResponse
+    VideoListResponse,
+    LikeResponse,
+    UploadSessionCreate,
+    UploadSessionStatus
 )
-from app.services.video_service import VideoProcessingService
+from app.services.like_service import LikeService
+from app.services.video_service import VideoProcessingService, InvalidVideoError
 from app.services.cloud_storage import CloudStorageService
+from app.services.video_locator import VideoLocation, video_locator
+from app.services.video_queries import VideoQueries
 from app.core.security import get_current_user
-from config import DEBUG, USE_CLOUD_STORAGE
+from app.core.job_queue import JobQueue, VideoJob, get_job_queue
+from app.core.like_counter import like_counter
+from app.core.file_response import RangeFileResponse
+from app.core.rate_limit import rate_limit, require_upload_capacity
+from app.core.pagination import InvalidCursor, Page, count, paginate
+from app.core.response_cache import FEED_TAG, creator_tag, response_cache, video_tag
+from app.core.video_cache import video_cache
+from app.core.upload_sessions import UploadSession, UploadSessionStore, get_upload_session_store
+from app.schemas.video import VideoProcessingStatus
+from config import DEBUG, RESUMABLE_CHUNK_SIZE, USE_CLOUD_STORAGE
 
 router = APIRouter(prefix="/videos", tags=["videos"])
 
 video_service = VideoProcessingService()
 storage_service = CloudStorageService()
 
-@router.post("/upload", response_model=VideoUploadResponse)
+# New uploads: the uploader's rate first, then the processing backlog
+UPLOAD_ADMISSION = [Depends(rate_limit("upload", per_user=True)), Depends(require_upload_capacity)]
+STREAM_LIMIT = [Depends(rate_limit("stream"))]
+
+@router.post("/upload", response_model=VideoUploadResponse, dependencies=UPLOAD_ADMISSION)
 async def upload_video(
     title: str = Form(..., min_length=1, max_length=200),
     description: Optional[str] = Form(None, max_length=1000),
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    job_queue: JobQueue = Depends(get_job_queue)
 ):
-    """Upload a new video with processing and optimization"""
+    """Upload a new video; optimization and thumbnails are done by the background workers"""
     try:
         video_data = VideoCreate(title=title, description=description)
-        video = await video_service.process_video_upload(file, video_data, current_user.id, db)
-        
-        return VideoUploadResponse(
-            video_id=video.id,
-            message="Video uploaded successfully",
-            processing_status=video.processing_status
-        )
+        video = await video_service.create_pending_video(file, video_data, current_user.id, db)
+        return await _queue_processing(video, db, job_queue)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
+async def _queue_processing(video: Video, db: AsyncSession, job_queue: JobQueue) -> VideoUploadResponse:
+    """Hand a staged upload to the workers and build the upload response"""
+    # Identical content already processed: the video was completed from the existing asset
+    if video.processing_status != VideoProcessingStatus.COMPLETED:
+        try:
+            job_queue.enqueue(VideoJob(video_id=video.id))
+        except Exception as e:
+            video.processing_status = VideoProcessingStatus.FAILED
+            video.processing_error = f"Could not queue video for processing: {str(e)}"
+            await db.commit()
+            video_service.discard_source(video.source_path)
+            raise HTTPException(status_code=503, detail="Video processing queue unavailable")
+    
+    return VideoUploadResponse(
+        video_id=video.id,
+        message="Video uploaded successfully",
+        processing_status=video.processing_status
+    )
+
+CONTENT_RANGE_PATTERN = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+def _get_upload_session(upload_id: str, current_user: Principal, sessions: UploadSessionStore) -> UploadSession:
+    session = sessions.get(upload_id)
+    if session is None or session.creator_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return session
+
+def _upload_status(session: UploadSession, sessions: UploadSessionStore) -> UploadSessionStatus:
+    received = sessions.ranges(session.upload_id)
+    return UploadSessionStatus(
+        upload_id=session.upload_id,
+        size=session.size,
+        chunk_size=RESUMABLE_CHUNK_SIZE,
+        received=[[start, end] for start, end in received],
+        received_bytes=sum(end - start + 1 for start, end in received),
+        complete=received == [(0, session.size - 1)]
+    )
+
+@router.post("/uploads", response_model=UploadSessionStatus, status_code=201, dependencies=UPLOAD_ADMISSION)
+async def create_upload_session(
+    upload: UploadSessionCreate,
+    current_user: Principal = Depends(get_current_user),
+    sessions: UploadSessionStore = Depends(get_upload_session_store)
+):
+    """Start a resumable upload; chunks are then PUT with a Content-Range header"""
+    session = UploadSession(
+        creator_id=current_user.id,
+        filename=upload.filename,
+        size=upload.size,
+        title=upload.title,
+        description=upload.description
+    )
+    await video_service.start_resumable_upload(session.upload_id, session.filename, session.size)
+    sessions.create(session)
+    return _upload_status(session, sessions)
+
+@router.get("/uploads/{upload_id}", response_model=UploadSessionStatus)
+async def get_upload_session(
+    upload_id: str,
+    current_user: Principal = Depends(get_current_user),
+    sessions: UploadSessionStore = Depends(get_upload_session_store)
+):
+    """Byte ranges received so far, so an interrupted client knows what to resend"""
+    session = _get_upload_session(upload_id, current_user, sessions)
+    return _upload_status(session, sessions)
+
+@router.put("/uploads/{upload_id}", response_model=UploadSessionStatus)
+async def upload_chunk(
+    upload_id: str,
+    request: Request,
+    current_user: Principal = Depends(get_current_user),
+    sessions: UploadSessionStore = Depends(get_upload_session_store)
+):
+    """Store one chunk at the offset given by its Content-Range; chunks may arrive in any order"""
+    session = _get_upload_session(upload_id, current_user, sessions)
+    
+    match = CONTENT_RANGE_PATTERN.match(request.headers.get("content-range", ""))
+    if not match:
+        raise HTTPException(status_code=400, detail="Content-Range header required, e.g. bytes 0-1048575/5242880")
+    start, end, total = (int(value) for value in match.groups())
+    if total != session.size or start > end or end >= session.size:
+        raise HTTPException(status_code=416, detail=f"Range must lie within 0-{session.size - 1}/{session.size}")
+    if end - start + 1 > RESUMABLE_CHUNK_SIZE:
+        raise HTTPException(status_code=413, detail=f"Chunks are limited to {RESUMABLE_CHUNK_SIZE} bytes")
+    
+    # Streamed straight into place; the range is only recorded once fully written
+    try:
+        await video_service.write_chunk(upload_id, start, end, request.stream())
+    except InvalidVideoError as e:
+        # The header rules the whole upload out, so there is nothing to resume
+        sessions.delete(upload_id)
+        video_service.abort_resumable_upload(upload_id)
+        raise HTTPException(status_code=400, detail=str(e))
+    sessions.add_range(upload_id, start, end)
+    return _upload_status(session, sessions)
+
+@router.post(
+    "/uploads/{upload_id}/complete",
+    response_model=VideoUploadResponse,
+    # Already admitted when the session was created; only the backlog is checked again
+    dependencies=[Depends(require_upload_capacity)]
+)
+async def complete_upload_session(
+    upload_id: str,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    sessions: UploadSessionStore = Depends(get_upload_session_store),
+    job_queue: JobQueue = Depends(get_job_queue)
+):
+    """Finish a resumable upload once every byte has arrived and queue it for processing"""
+    session = _get_upload_session(upload_id, current_user, sessions)
+    status = _upload_status(session, sessions)
+    if not status.complete:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Upload incomplete: received {status.received_bytes} of {session.size} bytes"
+        )
+    
+    # Drop the session first so a concurrent completion cannot register the file twice
+    sessions.delete(upload_id)
+    video_data = VideoCreate(title=session.title, description=session.description)
+    try:
+        video = await video_service.finish_resumable_upload(
+            upload_id, session.filename, video_data, current_user.id, db
+        )
+    except InvalidVideoError as e:
+        video_service.abort_resumable_upload(upload_id)
+        raise HTTPException(status_code=400, detail=str(e))
+    return await _queue_processing(video, db, job_queue)
+
+@router.delete("/uploads/{upload_id}")
+async def cancel_upload_session(
+    upload_id: str,
+    current_user: Principal = Depends(get_current_user),
+    sessions: UploadSessionStore = Depends(get_upload_session_store)
+):
+    """Abandon a resumable upload and discard the chunks received so far"""
+    _get_upload_session(upload_id, current_user, sessions)
+    sessions.delete(upload_id)
+    video_service.abort_resumable_upload(upload_id)
+    return {"message": "Upload cancelled"}
+
+async def _paginate_videos(db: AsyncSession, statement, page: int, page_size: int, cursor: Optional[str]) -> Page:
+    """Newest-first page of videos, by cursor when given, else by page number"""
+    try:
+        return await paginate(db, statement, Video.created_at, Video.id, page_size, cursor=cursor, page=page)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _video_schemas(videos: List[Video]) -> List[VideoSchema]:
+    """Video responses with like counts: the rows' flushed counts plus one Redis read for the pending ones"""
+    pending = like_counter.pending(video.id for video in videos)
+    return [VideoSchema.from_model(video, pending.get(video.id, 0)) for video in videos]
+
+def _cached_json(body: bytes, hit: bool) -> Response:
+    return Response(content=body, media_type="application/json", headers={"X-Cache": "HIT" if hit else "MISS"})
+
 @router.get("/", response_model=VideoListResponse)
 async def get_videos(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
     creator_id: Optional[int] = Query(None),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(False),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get paginated list of public videos"""
-    query = db.query(Video).filter(
-        Video.is_public == True,
-        Video.is_deleted == False,
-        Video.processing_status == "completed"
+    # Anonymous pages are identical for every viewer, so they are served pre-serialized
+    key = response_cache.key(
+        "/videos/", page=page, page_size=page_size, creator_id=creator_id, cursor=cursor, include_total=include_total
     )
+    body = await response_cache.get_async(key)
+    if body is not None:
+        return _cached_json(body, hit=True)
     
-    if creator_id:
-        query = query.filter(Video.creator_id == creator_id)
-    
-    total = query.count()
-    videos = query.offset((page - 1) * page_size).limit(page_size).all()
-    
-    # Convert to response format
-    video_schemas = []
-    for video in videos:
-        video_dict = {
-            "id": video.id,
-            "title": video.title,
-            "description": video.description,
-            "filename": video.filename,
-            "original_filename": video.original_filename,
-            "file_size": video.file_size,
-            "duration": video.duration,
-            "width": video.width,
-            "height": video.height,
-            "format": video.format,
-            "thumbnail_url": video.thumbnail_url,
-            "video_url": video.video_url,
-            "processing_status": video.processing_status,
-            "is_public": video.is_public,
-            "is_deleted": video.is_deleted,
-            "creator_id": video.creator_id,
-            "created_at": video.created_at,
-            "updated_at": video.updated_at,
-            "creator_username": video.creator.username if video.creator else None
-        }
-        video_schemas.append(VideoSchema(**video_dict))
+    statement = VideoQueries(db).public_videos(creator_id)
     
-    return VideoListResponse(
+    total = await count(db, statement) if include_total else None
+    result = await _paginate_videos(db, statement, page, page_size, cursor)
+    
+    video_schemas = _video_schemas(result.items)
+    
+    body = VideoListResponse(
         videos=video_schemas,
         total=total,
         page=page,
         page_size=page_size,
-        has_next=(page * page_size) < total
-    )
+        has_next=result.has_next,
+        next_cursor=result.next_cursor
+    ).model_dump_json().encode()
+    await response_cache.set_async(key, body, [creator_tag(creator_id) if creator_id else FEED_TAG])
+    return _cached_json(body, hit=False)
 
 @router.get("/my-videos", response_model=VideoListResponse)
 async def get_my_videos(
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(False),
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get current user's videos"""
-    query = db.query(Video).filter(
-        Video.creator_id == current_user.id,
-        Video.is_deleted == False
-    )
+    statement = VideoQueries(db).user_videos(current_user.id)
     
-    total = query.count()
-    videos = query.offset((page - 1) * page_size).limit(page_size).all()
-    
-    # Convert to response format
-    video_schemas = []
-    for video in videos:
-        video_dict = {
-            "id": video.id,
-            "title": video.title,
-            "description": video.description,
-            "filename": video.filename,
-            "original_filename": video.original_filename,
-            "file_size": video.file_size,
-            "duration": video.duration,
-            "width": video.width,
-            "height": video.height,
-            "format": video.format,
-            "thumbnail_url": video.thumbnail_url,
-            "video_url": video.video_url,
-            "processing_status": video.processing_status,
-            "is_public": video.is_public,
-            "is_deleted": video.is_deleted,
-            "creator_id": video.creator_id,
-            "created_at": video.created_at,
-            "updated_at": video.updated_at,
-            "creator_username": video.creator.username if video.creator else None
-        }
-        video_schemas.append(VideoSchema(**video_dict))
+    total = await count(db, statement) if include_total else None
+    result = await _paginate_videos(db, statement, page, page_size, cursor)
+    
+    video_schemas = _video_schemas(result.items)
     
     return VideoListResponse(
         videos=video_schemas,
         total=total,
         page=page,
         page_size=page_size,
-        has_next=(page * page_size) < total
+        has_next=result.has_next,
+        next_cursor=result.next_cursor
     )
 
 @router.get("/{video_id}", response_model=VideoSchema)
 async def get_video(
     video_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get a specific video by ID"""
-    video = db.query(Video).filter(
-        Video.id == video_id,
-        Video.is_public == True,
-        Video.is_deleted == False,
-        Video.processing_status == "completed"
-    ).first()
+    key = response_cache.key(f"/videos/{video_id}")
+    body = await response_cache.get_async(key)
+    if body is not None:
+        return _cached_json(body, hit=True)
+    
+    video = await VideoQueries(db).get_public_video(video_id)
     
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
     
-    video_dict = {
-        "id": video.id,
-        "title": video.title,
-        "description": video.description,
-        "filename": video.filename,
-        "original_filename": video.original_filename,
-        "file_size": video.file_size,
-        "duration": video.duration,
-        "width": video.width,
-        "height": video.height,
-        "format": video.format,
-        "thumbnail_url": video.thumbnail_url,
-        "video_url": video.video_url,
-        "processing_status": video.processing_status,
-        "is_public": video.is_public,
-        "is_deleted": video.is_deleted,
-        "creator_id": video.creator_id,
-        "created_at": video.created_at,
-        "updated_at": video.updated_at,
-        "creator_username": video.creator.username if video.creator else None
-    }
-    
-    return VideoSchema(**video_dict)
+    body = _video_schemas([video])[0].model_dump_json().encode()
+    await response_cache.set_async(key, body, [video_tag(video.id), creator_tag(video.creator_id)])
+    return _cached_json(body, hit=False)
 
 @router.put("/{video_id}", response_model=VideoSchema)
 async def update_video(
     video_id: int,
     video_update: VideoUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update video metadata"""
-    video = db.query(Video).filter(
-        Video.id == video_id,
-        Video.creator_id == current_user.id,
-        Video.is_deleted == False
-    ).first()
+    video = await VideoQueries(db).get_user_video(video_id, current_user.id)
     
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
@@ -216,38 +322,20 @@ async def update_video(
     if video_update.is_public is not None:
         video.is_public = video_update.is_public
     
-    db.commit()
-    db.refresh(video)
-    
-    video_dict = {
-        "id": video.id,
-        "title": video.title,
-        "description": video.description,
-        "filename": video.filename,
-        "original_filename": video.original_filename,
-        "file_size": video.file_size,
-        "duration": video.duration,
-        "width": video.width,
-        "height": video.height,
-        "format": video.format,
-        "thumbnail_url": video.thumbnail_url,
-        "video_url": video.video_url,
-        "processing_status": video.processing_status,
-        "is_public": video.is_public,
-        "is_deleted": video.is_deleted,
-        "creator_id": video.creator_id,
-        "created_at": video.created_at,
-        "updated_at": video.updated_at,
-        "creator_username": video.creator.username if video.creator else None
-    }
-    
-    return VideoSchema(**video_dict)
+    await db.commit()
+    # updated_at is set by the database
+    await db.refresh(video, ["updated_at"])
+    # Visibility may have changed
+    await video_locator.invalidate_async(video.id)
+    await response_cache.invalidate_video_async(video.id, video.creator_id)
+    
+    return _video_schemas([video])[0]
 
 @router.delete("/{video_id}")
 async def delete_video(
     video_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a video"""
     success = await video_service.delete_video(video_id, current_user.id, db)
@@ -257,21 +345,48 @@ async def delete_video(
     
     return {"message": "Video deleted successfully"}
 
-@router.get("/{video_id}/stream")
-async def stream_video(
+async def _likeable_video(video_id: int) -> int:
+    # Same visibility as streaming, and usually already cached by it
+    if not await video_locator.resolve(video_id):
+        raise HTTPException(status_code=404, detail="Video not found")
+    return video_id
+
+async def _likes_changed(video_id: int) -> None:
+    # The video's own cached page shows its count. Feed pages are left to
+    # their TTL rather than dropped on every like of a popular video.
+    await response_cache.invalidate_async(video_tag(video_id))
+
+@router.post("/{video_id}/like", response_model=LikeResponse)
+async def like_video(
     video_id: int,
-    request: Request,
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Like a video; liking it again changes nothing"""
+    likes = LikeService(db)
+    if await likes.like(current_user.id, await _likeable_video(video_id)):
+        await _likes_changed(video_id)
+    return LikeResponse(video_id=video_id, liked=True, like_count=await likes.like_count(video_id))
+
+@router.delete("/{video_id}/like", response_model=LikeResponse)
+async def unlike_video(
+    video_id: int,
+    current_user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
-    """Stream video file with range request support for efficient video delivery"""
-    video = db.query(Video).filter(
-        Video.id == video_id,
-        Video.is_public == True,
-        Video.is_deleted == False,
-        Video.processing_status == "completed"
-    ).first()
+    """Take back a like"""
+    likes = LikeService(db)
+    if await likes.unlike(current_user.id, await _likeable_video(video_id)):
+        await _likes_changed(video_id)
+    return LikeResponse(video_id=video_id, liked=False, like_count=await likes.like_count(video_id))
+
+@router.api_route("/{video_id}/stream", methods=["GET", "HEAD"], dependencies=STREAM_LIMIT)
+async def stream_video(video_id: int, request: Request):
+    """Stream video file with range and conditional request support for efficient video delivery"""
+    # Players send many range requests per view; resolve from cache rather than the database
+    location = await video_locator.resolve(video_id)
     
-    if not video:
+    if not location:
         raise HTTPException(status_code=404, detail="Video not found")
     
     # Get video file path
@@ -279,115 +394,101 @@ async def stream_video(
         # For GCS, redirect to the public URL
         return Response(
             status_code=302,
-            headers={"Location": video.video_url}
+            headers={"Location": location.video_url}
         )
     else:
-        # For local storage, implement range request support
-        return await _stream_local_video(video, request)
+        # For local storage, serve ranges straight from the file
+        return _stream_local_video(location, request)
 
-async def _stream_local_video(video: Video, request: Request):
-    """Stream video from local storage with range request support"""
-    try:
-        # Get local file path
-        local_video_dir = "uploads/videos"
-        file_path = os.path.join(local_video_dir, video.filename)
-        
-        if not os.path.exists(file_path):
-            raise HTTPException(status_code=404, detail="Video file not found")
-        
-        # Get file size
-        file_size = os.path.getsize(file_path)
-        
-        # Parse range header
-        range_header = request.headers.get('Range')
-        
-        if range_header:
-            # Parse range header (e.g., "bytes=0-1023")
-            range_match = range_header.replace('bytes=', '').split('-')
-            start = int(range_match[0]) if range_match[0] else 0
-            end = int(range_match[1]) if range_match[1] else file_size - 1
-            
-            # Ensure end doesn't exceed file size
-            end = min(end, file_size - 1)
-            
-            # Calculate content length
-            content_length = end - start + 1
-            
-            # Create file generator for range
-            def file_generator():
-                with open(file_path, 'rb') as f:
-                    f.seek(start)
-                    remaining = content_length
-                    while remaining > 0:
-                        chunk_size = min(8192, remaining)  # 8KB chunks
-                        chunk = f.read(chunk_size)
-                        if not chunk:
-                            break
-                        remaining -= len(chunk)
-                        yield chunk
-            
-            # Get content type
-            content_type, _ = mimetypes.guess_type(video.filename)
-            if not content_type:
-                content_type = 'video/mp4'
-            
-            # Return streaming response with range
-            return StreamingResponse(
-                file_generator(),
-                status_code=206,  # Partial Content
-                headers={
-                    'Content-Type': content_type,
-                    'Content-Length': str(content_length),
-                    'Content-Range': f'bytes {start}-{end}/{file_size}',
-                    'Accept-Ranges': 'bytes',
-                    'Cache-Control': 'public, max-age=3600'
-                }
-            )
-        else:
-            # No range header, return full file
-            def file_generator():
-                with open(file_path, 'rb') as f:
-                    while True:
-                        chunk = f.read(8192)  # 8KB chunks
-                        if not chunk:
-                            break
-                        yield chunk
-            
-            # Get content type
-            content_type, _ = mimetypes.guess_type(video.filename)
-            if not content_type:
-                content_type = 'video/mp4'
-            
-            return StreamingResponse(
-                file_generator(),
-                media_type=content_type,
-                headers={
-                    'Content-Length': str(file_size),
-                    'Accept-Ranges': 'bytes',
-                    'Cache-Control': 'public, max-age=3600'
-                }
-            )
-            
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error streaming video: {str(e)}")
+def _stream_local_video(location: VideoLocation, request: Request) -> RangeFileResponse:
+    """Serve a video from local storage, honouring Range, If-Range and cache validators"""
+    file_path = os.path.join(storage_service.local_video_dir, location.filename)
+    if not os.path.isfile(file_path):
+        raise HTTPException(status_code=404, detail="Video file not found")
+    
+    # Get content type
+    content_type, _ = mimetypes.guess_type(location.filename)
+    if not content_type:
+        content_type = 'video/mp4'
+    
+    return RangeFileResponse(
+        file_path,
+        request.headers,
+        media_type=content_type,
+        headers={'Cache-Control': 'public, max-age=3600'},
+        method=request.method,
+        cache=video_cache
+    )
 
-@router.get("/{video_id}/thumbnail")
-async def get_video_thumbnail(
+HLS_CONTENT_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".m4s": "video/iso.segment",
+    ".mp4": "video/mp4",
+}
+# Rendition and segment names as written by the packager; rejects traversal like ".."
+HLS_PATH_PATTERN = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9_.-]*$")
+
+@router.get("/{video_id}/hls/master.m3u8", dependencies=STREAM_LIMIT)
+async def get_hls_master_playlist(video_id: int, request: Request):
+    """Serve the adaptive bitrate master playlist"""
+    return _serve_hls_file(await _get_hls_video(video_id), "master.m3u8", request)
+
+@router.get("/{video_id}/hls/{rendition}/{segment}", dependencies=STREAM_LIMIT)
+async def get_hls_segment(
     video_id: int,
-    db: Session = Depends(get_db)
+    rendition: str,
+    segment: str,
+    request: Request
 ):
+    """Serve a rendition's media playlist, init segment or fMP4 media segment"""
+    if not HLS_PATH_PATTERN.match(rendition) or not HLS_PATH_PATTERN.match(segment):
+        raise HTTPException(status_code=404, detail="Segment not found")
+    
+    return _serve_hls_file(await _get_hls_video(video_id), f"{rendition}/{segment}", request)
+
+async def _get_hls_video(video_id: int) -> VideoLocation:
+    location = await video_locator.resolve(video_id)
+    
+    if not location:
+        raise HTTPException(status_code=404, detail="Video not found")
+    
+    if not location.hls_prefix:
+        raise HTTPException(status_code=404, detail="Adaptive streaming not available")
+    
+    return location
+
+def _serve_hls_file(location: VideoLocation, relative_path: str, request: Request):
+    """Serve a file from a video's HLS tree, redirecting to cloud storage when in use"""
+    if USE_CLOUD_STORAGE:
+        return Response(
+            status_code=302,
+            headers={"Location": storage_service.get_public_url(f"{location.hls_prefix}/{relative_path}", "hls")}
+        )
+    
+    file_path = os.path.join(storage_service.local_hls_dir, location.hls_prefix, relative_path)
+    if not os.path.isfile(file_path):
+        raise HTTPException(status_code=404, detail="Segment not found")
+    
+    extension = os.path.splitext(file_path)[1]
+    # Packaged VOD output never changes, so segments can be cached indefinitely
+    cache_control = 'public, max-age=3600' if extension == ".m3u8" else 'public, max-age=31536000, immutable'
+    return RangeFileResponse(
+        file_path,
+        request.headers,
+        media_type=HLS_CONTENT_TYPES.get(extension, 'application/octet-stream'),
+        headers={'Cache-Control': cache_control},
+        method=request.method
+    )
+
+@router.get("/{video_id}/thumbnail")
+async def get_video_thumbnail(video_id: int):
     """Get video thumbnail"""
-    video = db.query(Video).filter(
-        Video.id == video_id,
-        Video.is_public == True,
-        Video.is_deleted == False,
-        Video.processing_status == "completed"
-    ).first()
+    location = await video_locator.resolve(video_id)
     
-    if not video:
+    if not location:
         raise HTTPException(status_code=404, detail="Video not found")
     
-    if not video.thumbnail_url:
+    if not location.thumbnail_url:
         raise HTTPException(status_code=404, detail="Thumbnail not available")
     
-    return {"thumbnail_url": video.thumbnail_url}
+    return {"thumbnail_url": location.thumbnail_url}
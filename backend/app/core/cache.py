@@ -0,0 +1,284 @@
+import asyncio
+import functools
+import json
+import pickle
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, Type
+from pydantic import BaseModel
+from app.core.metrics import metrics
+from app.core.redis_client import redis_bytes_client
+from config import CACHE_BACKEND, CACHE_L1_SIZE, CACHE_L1_TTL, CACHE_TTL
+
+class JsonSerializer:
+    """Plain JSON types"""
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode()
+
+    def loads(self, raw: bytes) -> Any:
+        return json.loads(raw)
+
+class PickleSerializer:
+    """Any picklable value; only for data this service wrote itself"""
+
+    def dumps(self, value: Any) -> bytes:
+        return pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, raw: bytes) -> Any:
+        return pickle.loads(raw)
+
+class PydanticSerializer:
+    """Instances of one pydantic model, as its JSON"""
+
+    def __init__(self, model: Type[BaseModel]):
+        self.model = model
+
+    def dumps(self, value: BaseModel) -> bytes:
+        return value.model_dump_json().encode()
+
+    def loads(self, raw: bytes) -> BaseModel:
+        return self.model.model_validate_json(raw)
+
+class TierStats:
+    """Hit/miss counts and time spent for one tier of a cache"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.seconds = 0.0
+
+    def snapshot(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "avg_ms": round(self.seconds / lookups * 1000, 3) if lookups else 0.0
+        }
+
+# Every live cache by name, for /metrics
+caches: "weakref.WeakValueDictionary[str, TwoTierCache]" = weakref.WeakValueDictionary()
+
+class TwoTierCache:
+    """Read-through cache with an in-process LRU in front of Redis.
+
+    get_or_load() tries the local LRU, then Redis, and only then awaits the
+    loader. Concurrent misses for one key in a process share a single load,
+    which runs in its own task so a caller that goes away does not fail
+    the others. Both tiers hold serialized bytes, so callers never share
+    a mutable object.
+
+    With stale_ttl, an entry is kept that much longer past its ttl and
+    served while one background load refreshes it; that load outlives the
+    request, so the loader must not use request-scoped resources. None is
+    cached too, for negative_ttl seconds (default ttl) and never served
+    stale. invalidate() drops Redis at once; other processes may keep
+    their local copy for up to l1_ttl seconds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        client=None,
+        ttl: int = CACHE_TTL,
+        negative_ttl: Optional[int] = None,
+        stale_ttl: int = 0,
+        l1_ttl: float = CACHE_L1_TTL,
+        l1_size: int = CACHE_L1_SIZE,
+        serializer=None
+    ):
+        self.name = name
+        self.client = client  # None keeps the cache in process only
+        self.ttl = ttl
+        self.negative_ttl = ttl if negative_ttl is None else negative_ttl
+        self.stale_ttl = stale_ttl
+        self.l1_ttl = l1_ttl
+        self.l1_size = l1_size
+        self.serializer = serializer or JsonSerializer()
+        self._lock = threading.Lock()
+        # key -> (entry bytes, wall-clock time the local copy expires)
+        self._local: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._stats = {"l1": TierStats(), "l2": TierStats(), "origin": TierStats()}
+        self._coalesced = 0
+        self._stale_served = 0
+        caches[name] = self
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self.name}:{key}"
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """The cached value for key, calling loader() to fill it on a miss"""
+        key = self._key(key)
+        found, value, fresh = self._get_local(key)
+        if not found:
+            found, value, fresh = self._get_shared(key)
+        if not found:
+            return await self._load(key, loader)
+        if not fresh:
+            # Serve the stale copy and refresh it behind the caller's back
+            self._count("stale_served")
+            self._start_load(key, loader)
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._set(self._key(key), value)
+
+    def invalidate(self, key: Hashable) -> None:
+        key = self._key(key)
+        with self._lock:
+            self._local.pop(key, None)
+        if self.client is None:
+            return
+        try:
+            self.client.delete(key)
+        except Exception as e:
+            print(f"Warning: Could not invalidate cache entry {key}: {e}")
+
+    def clear(self) -> None:
+        """Drop the in-process entries (Redis entries expire on their own)"""
+        with self._lock:
+            self._local.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **{tier: stats.snapshot() for tier, stats in self._stats.items()},
+                "entries": len(self._local),
+                "coalesced": self._coalesced,
+                "stale_served": self._stale_served
+            }
+
+    # Entries are "<fresh until>|" followed by "=<payload>", or nothing for None
+
+    def _encode(self, value: Any, fresh_until: float) -> bytes:
+        head = f"{fresh_until:.3f}|".encode()
+        return head if value is None else head + b"=" + self.serializer.dumps(value)
+
+    def _decode(self, entry: bytes) -> Tuple[Any, bool]:
+        head, _, body = entry.partition(b"|")
+        value = self.serializer.loads(body[1:]) if body else None
+        return value, float(head) > time.time()
+
+    def _get_local(self, key: str) -> Tuple[bool, Any, bool]:
+        started = time.perf_counter()
+        with self._lock:
+            item = self._local.get(key)
+            if item is not None and item[1] <= time.time():
+                del self._local[key]
+                item = None
+            if item is not None:
+                self._local.move_to_end(key)
+        if item is None:
+            self._record("l1", False, started)
+            return False, None, False
+        value, fresh = self._decode(item[0])
+        self._record("l1", True, started)
+        return True, value, fresh
+
+    def _get_shared(self, key: str) -> Tuple[bool, Any, bool]:
+        if self.client is None:
+            return False, None, False
+        started = time.perf_counter()
+        try:
+            entry = self.client.get(key)
+        except Exception as e:
+            # A Redis outage must not take the cached path down with it
+            print(f"Warning: Could not read cache entry {key}: {e}")
+            entry = None
+        if entry is None:
+            self._record("l2", False, started)
+            return False, None, False
+        value, fresh = self._decode(entry)
+        self._record("l2", True, started)
+        self._set_local(key, entry, time.time() + self.l1_ttl)
+        return True, value, fresh
+
+    def _set(self, key: str, value: Any) -> None:
+        now = time.time()
+        ttl = self.negative_ttl if value is None else self.ttl
+        keep = ttl if value is None else ttl + self.stale_ttl
+        entry = self._encode(value, now + ttl)
+        self._set_local(key, entry, now + min(self.l1_ttl, keep))
+        if self.client is None:
+            return
+        try:
+            self.client.set(key, entry, ex=keep)
+        except Exception as e:
+            print(f"Warning: Could not write cache entry {key}: {e}")
+
+    def _set_local(self, key: str, entry: bytes, expires_at: float) -> None:
+        with self._lock:
+            self._local[key] = (entry, expires_at)
+            self._local.move_to_end(key)
+            while len(self._local) > self.l1_size:
+                self._local.popitem(last=False)
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self._count("coalesced")
+        # Shielded: cancelling one caller leaves the load running for the rest
+        return await asyncio.shield(self._start_load(key, loader))
+
+    def _start_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = self._inflight.get(key)
+        # A load can only be shared within its own event loop
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._fill(key, loader))
+            self._inflight[key] = task
+            task.add_done_callback(functools.partial(self._finish_load, key))
+        return task
+
+    def _finish_load(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled() and task.exception() is not None:
+            # Retrieved here so a load nobody waits for does not log as unhandled
+            metrics.increment(f"cache.{self.name}.load_error")
+
+    async def _fill(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.perf_counter()
+        value = await loader()
+        self._record("origin", False, started)
+        self._set(key, value)
+        return value
+
+    def _record(self, tier: str, hit: bool, started: float) -> None:
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            stats = self._stats[tier]
+            if hit:
+                stats.hits += 1
+            else:
+                stats.misses += 1
+            stats.seconds += elapsed
+        metrics.increment(f"cache.{self.name}.{tier}.{'hit' if hit else 'miss'}")
+
+    def _count(self, event: str) -> None:
+        with self._lock:
+            if event == "coalesced":
+                self._coalesced += 1
+            else:
+                self._stale_served += 1
+        metrics.increment(f"cache.{self.name}.{event}")
+
+def cached(cache: TwoTierCache, key: Callable[..., Hashable]):
+    """Cache an async function's results in cache, under key(*args, **kwargs).
+
+    For methods the key function receives self as well, e.g.
+    @cached(user_cache, key=lambda self, user_id: user_id).
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await cache.get_or_load(key(*args, **kwargs), lambda: func(*args, **kwargs))
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+def cache_client():
+    """The Redis client shared caches use, or None when configured in-process"""
+    return redis_bytes_client if CACHE_BACKEND == "redis" else None
@@ -0,0 +1,76 @@
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Optional
+from config import VIDEO_PROCESSING_CONCURRENCY
+
+class StageTimeoutError(Exception):
+    """Raised when a CPU-bound processing stage exceeds its time budget"""
+
+# Seconds a shared-pool stage gets past its timeout to report its own timeout first
+SELF_TIMED_GRACE = 5.0
+
+_media_executor: Optional[ProcessPoolExecutor] = None
+_media_executor_lock = threading.Lock()
+
+def get_media_executor() -> ProcessPoolExecutor:
+    """Process pool shared by every stage that bounds its own run time, created on first use"""
+    global _media_executor
+    with _media_executor_lock:
+        if _media_executor is None:
+            _media_executor = ProcessPoolExecutor(max_workers=VIDEO_PROCESSING_CONCURRENCY)
+        return _media_executor
+
+def shutdown_media_executor() -> None:
+    """Shut the media pool down, letting stages that are still running finish"""
+    global _media_executor
+    with _media_executor_lock:
+        executor, _media_executor = _media_executor, None
+    if executor is not None:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def _terminate(executor: ProcessPoolExecutor) -> None:
+    # ProcessPoolExecutor cannot cancel a running call, so stop its processes directly
+    for process in list(getattr(executor, "_processes", {}).values()):
+        process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+async def run_blocking(
+    func: Callable[..., Any],
+    *args,
+    timeout: float,
+    stage: str,
+    executor: Optional[Executor] = None,
+    isolated: bool = False,
+) -> Any:
+    """Run a blocking function off the event loop, bounded by a timeout.
+
+    By default the call goes to the shared media pool, which is never torn
+    down on a timeout: other jobs have stages running in it. Functions run
+    there must bound their own run time (the ffmpeg stages pass theirs to
+    subprocess.run); past `timeout` plus a grace period the caller gets
+    StageTimeoutError and the pool process is left to finish. isolated=True
+    runs the call in a single-use process of its own instead, terminated on
+    timeout, for stages such as OpenCV decodes that cannot stop themselves.
+    Video workers run one stage at a time, so those processes stay bounded
+    by the worker count.
+    """
+    loop = asyncio.get_running_loop()
+    single_use = executor is None and isolated
+    if single_use:
+        pool = ProcessPoolExecutor(max_workers=1)
+        wait = timeout
+    elif executor is not None:
+        pool, wait = executor, timeout
+    else:
+        pool, wait = get_media_executor(), timeout + SELF_TIMED_GRACE
+    future = loop.run_in_executor(pool, func, *args)
+    try:
+        return await asyncio.wait_for(future, wait)
+    except asyncio.TimeoutError:
+        if single_use:
+            _terminate(pool)
+        raise StageTimeoutError(f"Video {stage} stage timed out after {timeout:.0f}s")
+    finally:
+        if single_use:
+            pool.shutdown(wait=False)
@@ -0,0 +1,240 @@
+import hashlib
+import os
+import uuid
+from email.utils import formatdate, parsedate_to_datetime
+from typing import List, Mapping, Optional, Tuple
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+from app.core.video_cache import HotVideoCache
+from config import STREAM_CHUNK_SIZE
+
+# Coalesced ranges beyond this are answered with the whole file instead (RFC 7233 §6.1)
+MAX_RANGES = 16
+
+# Offered by few ASGI servers; uvicorn, which this app ships with, has no such path
+ZEROCOPY_EXTENSION = "http.response.zerocopysend"
+
+class RangeNotSatisfiable(Exception):
+    """No requested byte range overlaps the file"""
+
+def parse_range_header(header: str, size: int) -> Optional[List[Tuple[int, int]]]:
+    """Resolve a Range header into sorted, coalesced inclusive (start, end) pairs.
+
+    Returns None when the header should be ignored (unknown unit, bad syntax
+    or too many ranges) and raises RangeNotSatisfiable when it is valid but
+    no range overlaps the file.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec.strip():
+        return None
+
+    ranges = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        first, dash, last = part.partition("-")
+        first, last = first.strip(), last.strip()
+        if not dash or not (first or last) or not (first + last).isdigit():
+            return None
+        if not first:
+            # Suffix range: the final N bytes
+            length = int(last)
+            if length > 0 and size > 0:
+                ranges.append((max(size - length, 0), size - 1))
+            continue
+        start = int(first)
+        if last and int(last) < start:
+            return None
+        end = int(last) if last else size - 1
+        if start < size:
+            ranges.append((start, min(end, size - 1)))
+
+    if not ranges:
+        raise RangeNotSatisfiable()
+
+    coalesced: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if coalesced and start <= coalesced[-1][1] + 1:
+            coalesced[-1] = (coalesced[-1][0], max(coalesced[-1][1], end))
+        else:
+            coalesced.append((start, end))
+    if len(coalesced) > MAX_RANGES:
+        return None
+    return coalesced
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match list against our ETag (RFC 7232 §3.2)"""
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+def _parse_http_date(value: str) -> Optional[float]:
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+class RangeFileResponse(Response):
+    """File response with full RFC 7232/7233 support for video delivery.
+
+    Answers conditional requests (If-None-Match, If-Modified-Since, If-Range)
+    and single, suffix and multi-range requests. With a cache, small files
+    are served as slices of an in-memory mapping; otherwise file bytes go
+    out through the ASGI zero-copy extension (os.sendfile) when the server
+    offers it, or in large chunks read off the event loop.
+
+    uvicorn does not implement that extension, so under uvicorn the
+    sendfile path is inactive and uncached files are always read in chunks.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        request_headers: Mapping[str, str],
+        media_type: str = "application/octet-stream",
+        headers: Optional[Mapping[str, str]] = None,
+        method: str = "GET",
+        chunk_size: int = STREAM_CHUNK_SIZE,
+        cache: Optional[HotVideoCache] = None
+    ):
+        self.path = path
+        self.cache = cache
+        self.chunk_size = chunk_size
+        self.media_type = media_type
+        self.send_body = method != "HEAD"
+        self.background = None
+        self.parts: List[Tuple[bytes, int, int]] = []  # (preamble, start, end) written in order
+        self.epilogue = b""
+
+        stat = os.stat(path)
+        size = stat.st_size
+        self.size, self.mtime_ns = size, stat.st_mtime_ns
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+        etag = '"' + hashlib.md5(f"{stat.st_mtime_ns}-{size}".encode()).hexdigest() + '"'
+        request_headers = Headers(headers=dict(request_headers))
+
+        self.status_code = 200
+        self.init_headers(headers)
+        self.body = b""
+        self.headers.setdefault("accept-ranges", "bytes")
+        self.headers.setdefault("etag", etag)
+        self.headers.setdefault("last-modified", last_modified)
+
+        if self._not_modified(request_headers, etag, stat.st_mtime):
+            self.status_code = 304
+            # A 304 carries validators but no representation headers
+            for header in ("content-length", "content-type"):
+                if header in self.headers:
+                    del self.headers[header]
+            return
+
+        ranges = None
+        range_header = request_headers.get("range")
+        if range_header and method in ("GET", "HEAD") and self._if_range_holds(request_headers, etag, last_modified):
+            try:
+                ranges = parse_range_header(range_header, size)
+            except RangeNotSatisfiable:
+                self.status_code = 416
+                self.headers["content-range"] = f"bytes */{size}"
+                self.headers["content-length"] = "0"
+                return
+
+        if not ranges:
+            self.status_code = 200
+            self.headers["content-type"] = media_type
+            self.headers["content-length"] = str(size)
+            if size:
+                self.parts = [(b"", 0, size - 1)]
+        elif len(ranges) == 1:
+            start, end = ranges[0]
+            self.status_code = 206
+            self.headers["content-type"] = media_type
+            self.headers["content-range"] = f"bytes {start}-{end}/{size}"
+            self.headers["content-length"] = str(end - start + 1)
+            self.parts = [(b"", start, end)]
+        else:
+            boundary = uuid.uuid4().hex
+            self.status_code = 206
+            self.headers["content-type"] = f"multipart/byteranges; boundary={boundary}"
+            for index, (start, end) in enumerate(ranges):
+                # Every part after the first starts on a new line after the previous body
+                separator = "" if index == 0 else "\r\n"
+                preamble = (
+                    f"{separator}--{boundary}\r\n"
+                    f"Content-Type: {media_type}\r\n"
+                    f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+                ).encode("latin-1")
+                self.parts.append((preamble, start, end))
+            self.epilogue = f"\r\n--{boundary}--\r\n".encode("latin-1")
+            length = sum(len(preamble) + end - start + 1 for preamble, start, end in self.parts)
+            self.headers["content-length"] = str(length + len(self.epilogue))
+
+    def _not_modified(self, request_headers: Headers, etag: str, mtime: float) -> bool:
+        # If-None-Match takes precedence; If-Modified-Since is only consulted without it
+        if "if-none-match" in request_headers:
+            return _etag_matches(request_headers["if-none-match"], etag)
+        if "if-modified-since" in request_headers:
+            since = _parse_http_date(request_headers["if-modified-since"])
+            return since is not None and int(mtime) <= since
+        return False
+
+    def _if_range_holds(self, request_headers: Headers, etag: str, last_modified: str) -> bool:
+        """Ranges only apply if the client's copy is still current; otherwise send it all"""
+        if_range = request_headers.get("if-range")
+        if if_range is None:
+            return True
+        if_range = if_range.strip()
+        if if_range.startswith('"') or if_range.startswith("W/"):
+            # If-Range requires a strong match, so weak tags never qualify
+            return not if_range.startswith("W/") and if_range == etag
+        return if_range == last_modified
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if not self.send_body or not self.parts:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+
+        if self.cache is not None and self.cache.admits(self.size):
+            buffer = self.cache.get(self.path, self.size, self.mtime_ns)
+            if buffer is None:
+                buffer = await anyio.to_thread.run_sync(self.cache.load, self.path, self.size, self.mtime_ns)
+            if buffer is not None:
+                await self._send_from_memory(buffer, send)
+                return
+
+        zerocopy = ZEROCOPY_EXTENSION in scope.get("extensions", {})
+        async with await anyio.open_file(self.path, "rb") as f:
+            for preamble, start, end in self.parts:
+                if preamble:
+                    await send({"type": "http.response.body", "body": preamble, "more_body": True})
+                if zerocopy:
+                    await send({
+                        "type": ZEROCOPY_EXTENSION,
+                        "file": f.wrapped.fileno(),
+                        "offset": start,
+                        "count": end - start + 1,
+                        "more_body": True,
+                    })
+                    continue
+                await f.seek(start)
+                remaining = end - start + 1
+                while remaining > 0:
+                    chunk = await f.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": self.epilogue, "more_body": False})
+
+    async def _send_from_memory(self, buffer: memoryview, send: Send) -> None:
+        # Slicing a memoryview shares the mapping; chunking keeps server backpressure
+        for preamble, start, end in self.parts:
+            if preamble:
+                await send({"type": "http.response.body", "body": preamble, "more_body": True})
+            for offset in range(start, end + 1, self.chunk_size):
+                chunk = buffer[offset:min(offset + self.chunk_size, end + 1)]
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": self.epilogue, "more_body": False})
@@ -0,0 +1,166 @@
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional, Set, Tuple
+from app.core.redis_client import redis_client
+from config import FOLLOW_MIRROR_BACKEND, FOLLOW_MIRROR_TTL
+
+# Marks a mirror as holding the user's whole list, so an empty list is not a miss.
+# User ids start at 1, and in the followers set its score of 0 sorts below every follow.
+LOADED = "0"
+# Members written per command when loading a large list
+LOAD_CHUNK = 1000
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def to_score(moment: datetime) -> int:
+    """Microseconds since the epoch; exact in a Redis score for the next few centuries"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)  # SQLite hands back naive UTC
+    return (moment - EPOCH) // timedelta(microseconds=1)
+
+def from_score(score: float) -> datetime:
+    return EPOCH + timedelta(microseconds=int(score))
+
+class FollowMirror:
+    """Redis copies of the follows table, for the reads that happen on every page.
+
+    follows:following:<user> is a set of the ids the user follows, so
+    "which of these creators do I follow" is one SMISMEMBER however long
+    the page. follows:followers:<user> is a sorted set of follower ids
+    scored by when they followed, so follower lists page newest first with
+    ZREVRANGEBYSCORE. The database stays the source of truth: a mirror is
+    loaded from it on the first read that misses and then kept current by
+    follow() and unfollow() after they commit, expiring `ttl` seconds after
+    the load. Neither reads nor writes extend that.
+
+    Writes land on a missing mirror too but don't mark it loaded, and a
+    load adds to whatever is there rather than replacing it, so a follow
+    committed during a load is not lost. An unfollow committed during a
+    load can be, until the mirror expires and the next read reloads it.
+
+    Every method returns None (or does nothing) without a client or while
+    Redis is down; callers then read the database.
+    """
+
+    def __init__(self, client=None, ttl: int = FOLLOW_MIRROR_TTL, prefix: str = "follows"):
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @property
+    def enabled(self) -> bool:
+        return self.client is not None
+
+    def following_key(self, user_id: int) -> str:
+        return f"{self.prefix}:following:{user_id}"
+
+    def followers_key(self, user_id: int) -> str:
+        return f"{self.prefix}:followers:{user_id}"
+
+    def following_among(self, user_id: int, user_ids: List[int]) -> Optional[Set[int]]:
+        """Which of user_ids the user follows, in one round trip; None if not mirrored"""
+        if self.client is None:
+            return None
+        key = self.following_key(user_id)
+        try:
+            flags = self.client.smismember(key, [LOADED, *user_ids])
+        except Exception as e:
+            print(f"Warning: Could not read follows of user {user_id}: {e}")
+            return None
+        if not flags[0]:
+            return None
+        return {followee_id for followee_id, flag in zip(user_ids, flags[1:]) if flag}
+
+    def followers_page(
+        self,
+        user_id: int,
+        limit: int,
+        before: Optional[datetime] = None
+    ) -> Optional[List[Tuple[int, datetime]]]:
+        """Up to `limit` (follower id, followed at) pairs newest first, older than `before`;
+        None if not mirrored"""
+        if self.client is None:
+            return None
+        key = self.followers_key(user_id)
+        newest = f"({to_score(before)}" if before is not None else "+inf"
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.zscore(key, LOADED)
+            pipe.zrevrangebyscore(key, newest, f"({LOADED}", start=0, num=limit, withscores=True)
+            loaded, entries = pipe.execute()
+        except Exception as e:
+            print(f"Warning: Could not read followers of user {user_id}: {e}")
+            return None
+        if loaded is None:
+            return None
+        return [(int(member), from_score(score)) for member, score in entries]
+
+    def load_following(self, user_id: int, followee_ids: Iterable[int]) -> None:
+        key = self.following_key(user_id)
+        self._load(key, lambda pipe, chunk: pipe.sadd(key, *chunk), [*followee_ids, LOADED])
+
+    def load_followers(self, user_id: int, followers: Iterable[Tuple[int, datetime]]) -> None:
+        key = self.followers_key(user_id)
+        scored = [(follower_id, to_score(followed_at)) for follower_id, followed_at in followers] + [(LOADED, 0)]
+        self._load(key, lambda pipe, chunk: pipe.zadd(key, dict(chunk)), scored)
+
+    def _load(self, key: str, add, members: list) -> None:
+        if self.client is None:
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            # The marker goes in last, so a load that dies partway is still a miss
+            for start in range(0, len(members), LOAD_CHUNK):
+                add(pipe, members[start:start + LOAD_CHUNK])
+            pipe.expire(key, self.ttl)
+            pipe.execute()
+        except Exception as e:
+            print(f"Warning: Could not load follow mirror {key}: {e}")
+
+    def followed(self, follower_id: int, followee_id: int, followed_at: datetime) -> None:
+        """Mirror a committed follow"""
+        if self.client is None:
+            return
+        following, followers = self.following_key(follower_id), self.followers_key(followee_id)
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.sadd(following, followee_id)
+            pipe.ttl(following)
+            pipe.zadd(followers, {follower_id: to_score(followed_at)})
+            pipe.ttl(followers)
+            _, following_ttl, _, followers_ttl = pipe.execute()
+            # Only a key this write created gets a TTL; a loaded mirror keeps its own
+            for key, ttl in ((following, following_ttl), (followers, followers_ttl)):
+                if ttl < 0:
+                    self.client.expire(key, self.ttl)
+        except Exception as e:
+            self._drop(follower_id, followee_id, e)
+
+    def unfollowed(self, follower_id: int, followee_id: int) -> None:
+        """Mirror a committed unfollow"""
+        if self.client is None:
+            return
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.srem(self.following_key(follower_id), followee_id)
+            pipe.zrem(self.followers_key(followee_id), follower_id)
+            pipe.execute()
+        except Exception as e:
+            self._drop(follower_id, followee_id, e)
+
+    def _drop(self, follower_id: int, followee_id: int, error: Exception) -> None:
+        # A mirror that missed a change must not be read; the next read reloads it
+        print(f"Warning: Could not mirror follow of user {followee_id} by user {follower_id}: {error}")
+        try:
+            self.client.delete(self.following_key(follower_id), self.followers_key(followee_id))
+        except Exception:
+            pass  # Redis is down; the mirrors expire on their own
+
+def _client():
+    if FOLLOW_MIRROR_BACKEND == "redis":
+        return redis_client
+    if FOLLOW_MIRROR_BACKEND == "fakeredis":
+        import fakeredis  # only needed for tests and local runs without Redis
+        return fakeredis.FakeRedis(decode_responses=True)
+    return None
+
+follow_mirror = FollowMirror(client=_client())
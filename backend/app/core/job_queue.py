@@ -0,0 +1,191 @@
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel, Field
+from app.core.redis_client import redis_client
+from config import VIDEO_QUEUE_BACKEND, VIDEO_WORKER_HEARTBEAT_TTL
+
+class VideoJob(BaseModel):
+    """A unit of background work: process one uploaded video"""
+    video_id: int
+    attempts: int = 0
+    job_id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+
+    def next_attempt(self) -> "VideoJob":
+        return self.model_copy(update={"attempts": self.attempts + 1})
+
+class JobQueue:
+    """Reliable job queue interface used by the upload API and the video workers.
+
+    Jobs handed out by ``dequeue`` stay assigned to the worker until they are
+    acknowledged, so a worker that dies mid-job can have its work recovered.
+    """
+
+    def enqueue(self, job: VideoJob) -> None:
+        raise NotImplementedError
+
+    def dequeue(self, worker_id: str, timeout: float = 1.0) -> Optional[VideoJob]:
+        raise NotImplementedError
+
+    def ack(self, worker_id: str, job: VideoJob) -> None:
+        raise NotImplementedError
+
+    def retry(self, job: VideoJob, delay: float) -> None:
+        raise NotImplementedError
+
+    def heartbeat(self, worker_id: str) -> None:
+        raise NotImplementedError
+
+    def recover_stale(self) -> int:
+        """Requeue jobs held by workers whose heartbeat expired; returns the count"""
+        raise NotImplementedError
+
+    def depth(self) -> int:
+        """Number of jobs waiting (pending or scheduled for retry)"""
+        raise NotImplementedError
+
+class RedisJobQueue(JobQueue):
+    """Redis-backed queue using the reliable-queue (BLMOVE) pattern"""
+
+    def __init__(self, client=None, name: str = "video_jobs", heartbeat_ttl: int = VIDEO_WORKER_HEARTBEAT_TTL):
+        self.client = client or redis_client
+        self.name = name
+        self.heartbeat_ttl = heartbeat_ttl
+        self.pending_key = f"{name}:pending"
+        self.delayed_key = f"{name}:delayed"
+        self.workers_key = f"{name}:workers"
+
+    def _processing_key(self, worker_id: str) -> str:
+        return f"{self.name}:processing:{worker_id}"
+
+    def _heartbeat_key(self, worker_id: str) -> str:
+        return f"{self.name}:heartbeat:{worker_id}"
+
+    def enqueue(self, job: VideoJob) -> None:
+        self.client.lpush(self.pending_key, job.model_dump_json())
+
+    def _promote_due_jobs(self) -> None:
+        """Move retries whose delay has elapsed back onto the pending list"""
+        due = self.client.zrangebyscore(self.delayed_key, 0, time.time())
+        for raw in due:
+            # Only the caller that wins the ZREM moves the job
+            if self.client.zrem(self.delayed_key, raw):
+                self.client.lpush(self.pending_key, raw)
+
+    def dequeue(self, worker_id: str, timeout: float = 1.0) -> Optional[VideoJob]:
+        self.heartbeat(worker_id)
+        self._promote_due_jobs()
+        raw = self.client.blmove(
+            self.pending_key, self._processing_key(worker_id), timeout, "RIGHT", "LEFT"
+        )
+        if raw is None:
+            return None
+        return VideoJob.model_validate_json(raw)
+
+    def ack(self, worker_id: str, job: VideoJob) -> None:
+        self.client.lrem(self._processing_key(worker_id), 1, job.model_dump_json())
+
+    def retry(self, job: VideoJob, delay: float) -> None:
+        self.client.zadd(self.delayed_key, {job.model_dump_json(): time.time() + delay})
+
+    def heartbeat(self, worker_id: str) -> None:
+        self.client.sadd(self.workers_key, worker_id)
+        self.client.set(self._heartbeat_key(worker_id), "1", ex=self.heartbeat_ttl)
+
+    def recover_stale(self) -> int:
+        recovered = 0
+        for worker_id in self.client.smembers(self.workers_key):
+            if self.client.exists(self._heartbeat_key(worker_id)):
+                continue
+            processing_key = self._processing_key(worker_id)
+            while self.client.lmove(processing_key, self.pending_key, "RIGHT", "LEFT") is not None:
+                recovered += 1
+            self.client.srem(self.workers_key, worker_id)
+        return recovered
+
+    def depth(self) -> int:
+        return self.client.llen(self.pending_key) + self.client.zcard(self.delayed_key)
+
+class InMemoryJobQueue(JobQueue):
+    """In-process stand-in for tests and single-process development"""
+
+    def __init__(self, heartbeat_ttl: int = VIDEO_WORKER_HEARTBEAT_TTL):
+        self.heartbeat_ttl = heartbeat_ttl
+        self._condition = threading.Condition()
+        self._pending: deque = deque()
+        self._delayed: List[Tuple[float, VideoJob]] = []
+        self._processing: Dict[str, List[VideoJob]] = {}
+        self._heartbeats: Dict[str, float] = {}
+
+    def enqueue(self, job: VideoJob) -> None:
+        with self._condition:
+            self._pending.appendleft(job)
+            self._condition.notify()
+
+    def _promote_due_jobs(self) -> None:
+        now = time.time()
+        due = [job for run_at, job in self._delayed if run_at <= now]
+        self._delayed = [(run_at, job) for run_at, job in self._delayed if run_at > now]
+        for job in due:
+            self._pending.appendleft(job)
+
+    def dequeue(self, worker_id: str, timeout: float = 1.0) -> Optional[VideoJob]:
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            self._heartbeats[worker_id] = time.monotonic()
+            while True:
+                self._promote_due_jobs()
+                if self._pending:
+                    job = self._pending.pop()
+                    self._processing.setdefault(worker_id, []).append(job)
+                    return job
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._condition.wait(min(remaining, 0.1))
+
+    def ack(self, worker_id: str, job: VideoJob) -> None:
+        with self._condition:
+            held = self._processing.get(worker_id, [])
+            self._processing[worker_id] = [j for j in held if j.job_id != job.job_id]
+
+    def retry(self, job: VideoJob, delay: float) -> None:
+        with self._condition:
+            self._delayed.append((time.time() + delay, job))
+            self._condition.notify()
+
+    def heartbeat(self, worker_id: str) -> None:
+        with self._condition:
+            self._heartbeats[worker_id] = time.monotonic()
+
+    def recover_stale(self) -> int:
+        recovered = 0
+        with self._condition:
+            now = time.monotonic()
+            for worker_id in list(self._processing):
+                if now - self._heartbeats.get(worker_id, 0) < self.heartbeat_ttl:
+                    continue
+                for job in self._processing.pop(worker_id):
+                    self._pending.append(job)
+                    recovered += 1
+                self._heartbeats.pop(worker_id, None)
+            if recovered:
+                self._condition.notify_all()
+        return recovered
+
+    def depth(self) -> int:
+        with self._condition:
+            return len(self._pending) + len(self._delayed)
+
+_job_queue: Optional[JobQueue] = None
+
+def get_job_queue() -> JobQueue:
+    global _job_queue
+    if _job_queue is None:
+        if VIDEO_QUEUE_BACKEND == "memory":
+            _job_queue = InMemoryJobQueue()
+        else:
+            _job_queue = RedisJobQueue()
+    return _job_queue
@@ -0,0 +1,200 @@
+import random
+import threading
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from redis.exceptions import LockError
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal
+from app.core.metrics import metrics
+from app.core.redis_client import redis_client
+from app.models.video import Video
+from config import LIKE_COUNTER_BACKEND, LIKE_COUNTER_SHARDS, LIKE_FLUSH_BATCH, LIKE_FLUSH_INTERVAL
+
+# Ids of videos whose shards may hold unflushed deltas
+DIRTY_KEY = "likes:dirty"
+FLUSH_LOCK_KEY = "likes:flush_lock"
+
+videos = Video.__table__
+# One statement for the whole batch, run as an executemany
+ADD_LIKES = update(videos).where(videos.c.id == bindparam("b_video_id")).values(
+    like_count=videos.c.like_count + bindparam("b_delta")
+)
+
+class LikeCounter:
+    """Write-behind like counts: Redis takes the increments, Postgres gets
+    them in batches.
+
+    A like is an INCRBY on one of `shards` keys for its video, so a viral
+    video's writes spread over several keys (and cluster slots) instead of
+    one. flush() takes each shard's value out of Redis (GETDEL, atomic per
+    key, so likes that arrive mid-flush start the shard afresh for the next
+    one) and only then applies the taken deltas to videos.like_count with
+    one batched UPDATE. If the update fails they are added back, so no delta
+    is ever applied twice; a flusher that dies between taking and committing
+    loses at most its batch. A video's count is its like_count plus
+    pending(). That sum is not exact: while a flush is in progress its
+    deltas are counted in neither, and cached responses show the sum as of
+    when they were cached, for up to RESPONSE_CACHE_TTL (a like or unlike
+    drops the video's own page).
+
+    Without a client, or while Redis is down, increment() returns False
+    and callers update the row directly.
+    """
+
+    def __init__(self, client=None, shards: int = LIKE_COUNTER_SHARDS, prefix: str = "likes"):
+        self.client = client
+        self.shards = shards
+        self.prefix = prefix
+
+    @property
+    def enabled(self) -> bool:
+        return self.client is not None
+
+    def _shard_keys(self, video_id: int) -> List[str]:
+        return [f"{self.prefix}:{video_id}:{shard}" for shard in range(self.shards)]
+
+    def increment(self, video_id: int, delta: int = 1) -> bool:
+        """Record a like (or an unlike, with -1); False if it was not recorded"""
+        if self.client is None:
+            return False
+        key = f"{self.prefix}:{video_id}:{random.randrange(self.shards)}"
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.incrby(key, delta)
+            pipe.sadd(DIRTY_KEY, video_id)
+            pipe.execute()
+            return True
+        except Exception as e:
+            print(f"Warning: Could not count like for video {video_id}: {e}")
+            return False
+
+    def pending(self, video_ids: Iterable[int]) -> Dict[int, int]:
+        """Unflushed deltas for the videos, in one round trip; missing ids have none"""
+        video_ids = list(dict.fromkeys(video_ids))
+        if self.client is None or not video_ids:
+            return {}
+        try:
+            shard_values = self._read_shards(video_ids)
+        except Exception as e:
+            print(f"Warning: Could not read pending likes: {e}")
+            return {}
+        return {video_id: sum(value for _, value in shards) for video_id, shards in shard_values.items()}
+
+    def _read_shards(self, video_ids: List[int], take: bool = False) -> Dict[int, List[Tuple[str, int]]]:
+        """Non-zero shard values by video; `take` removes the shards as it reads them"""
+        pipe = self.client.pipeline(transaction=False)
+        keys = [(video_id, key) for video_id in video_ids for key in self._shard_keys(video_id)]
+        for _, key in keys:
+            if take:
+                pipe.getdel(key)
+            else:
+                pipe.get(key)
+        shard_values: Dict[int, List[Tuple[str, int]]] = defaultdict(list)
+        for (video_id, key), value in zip(keys, pipe.execute()):
+            if value is not None and int(value) != 0:
+                shard_values[video_id].append((key, int(value)))
+        return shard_values
+
+    def flush(self, session_factory: Callable[[], Session] = SessionLocal, batch: int = LIKE_FLUSH_BATCH) -> int:
+        """Apply pending deltas to the database; returns how many videos were updated.
+
+        A Redis lock keeps flushers in other processes from splitting the
+        same videos' shards between them.
+        """
+        if self.client is None:
+            return 0
+        lock = self.client.lock(FLUSH_LOCK_KEY, timeout=max(LIKE_FLUSH_INTERVAL * 10, 60), blocking=False)
+        if not lock.acquire():
+            return 0
+        try:
+            flushed = 0
+            while True:
+                video_ids = [int(video_id) for video_id in self.client.spop(DIRTY_KEY, batch) or []]
+                if not video_ids:
+                    return flushed
+                flushed += self._flush_batch(video_ids, session_factory)
+                if len(video_ids) < batch:
+                    return flushed
+        finally:
+            try:
+                lock.release()
+            except LockError:
+                pass  # Expired mid-flush; nothing left to release
+
+    def _flush_batch(self, video_ids: List[int], session_factory: Callable[[], Session]) -> int:
+        try:
+            shard_values = self._read_shards(video_ids, take=True)
+        except Exception:
+            self.client.sadd(DIRTY_KEY, *video_ids)
+            raise
+        rows = [
+            {"b_video_id": video_id, "b_delta": sum(value for _, value in shards)}
+            for video_id, shards in shard_values.items()
+        ]
+        rows = [row for row in rows if row["b_delta"] != 0]
+        try:
+            if rows:
+                db = session_factory()
+                try:
+                    db.execute(ADD_LIKES, rows)
+                    db.commit()
+                finally:
+                    db.close()
+        except Exception:
+            # Not applied, so hand the taken deltas back for the next flush
+            pipe = self.client.pipeline(transaction=False)
+            for shards in shard_values.values():
+                for key, value in shards:
+                    pipe.incrby(key, value)
+            pipe.sadd(DIRTY_KEY, *video_ids)
+            pipe.execute()
+            raise
+        metrics.increment("likes.flushed_videos", len(rows))
+        return len(rows)
+
+class LikeFlusher:
+    """Flushes the like counter every `interval` seconds on a background thread"""
+
+    def __init__(
+        self,
+        counter: LikeCounter,
+        interval: float = LIKE_FLUSH_INTERVAL,
+        session_factory: Callable[[], Session] = SessionLocal
+    ):
+        self.counter = counter
+        self.interval = interval
+        self.session_factory = session_factory
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.thread = threading.Thread(target=self._run, name="like-flusher", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stop, after one last flush so a clean shutdown leaves nothing behind"""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def _run(self) -> None:
+        while True:
+            stopping = self.stop_event.wait(self.interval)
+            try:
+                self.counter.flush(self.session_factory)
+            except Exception as e:
+                print(f"Warning: Could not flush like counts: {e}")
+            if stopping:
+                return
+
+def _client():
+    if LIKE_COUNTER_BACKEND == "redis":
+        return redis_client
+    if LIKE_COUNTER_BACKEND == "fakeredis":
+        import fakeredis  # only needed for tests and local runs without Redis
+        return fakeredis.FakeRedis(decode_responses=True)
+    return None
+
+like_counter = LikeCounter(client=_client())
@@ -0,0 +1,37 @@
+import threading
+from collections import Counter
+from typing import Dict
+from app.core.redis_client import redis_client
+
+SHARED_METRICS_KEY = "metrics:counters"
+
+class Metrics:
+    """Process-local counters, optionally mirrored to Redis so that
+    counts from separate worker processes add up in one place"""
+
+    def __init__(self, client=None):
+        self.client = client or redis_client
+        self._lock = threading.Lock()
+        self._counters: Counter = Counter()
+
+    def increment(self, name: str, amount: int = 1, shared: bool = False) -> None:
+        with self._lock:
+            self._counters[name] += amount
+        if shared:
+            try:
+                self.client.hincrby(SHARED_METRICS_KEY, name, amount)
+            except Exception as e:
+                # Metrics must never break the code path being measured
+                print(f"Warning: Could not record shared metric {name}: {e}")
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """Local counters for this process plus the shared cross-process totals"""
+        with self._lock:
+            local = dict(self._counters)
+        try:
+            shared = {name: int(value) for name, value in self.client.hgetall(SHARED_METRICS_KEY).items()}
+        except Exception:
+            shared = {}
+        return {"local": local, "shared": shared}
+
+metrics = Metrics()
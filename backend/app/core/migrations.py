@@ -0,0 +1,22 @@
+"""Schema inspection shared by the Alembic migrations.
+
+The app creates the videos table and its related tables itself on startup
+(see ``app.main``), so a database may reach a migration without them. Such a
+database gets the new columns and tables from the models along with the
+table, and the migration has nothing to do. Offline (``--sql``) output cannot
+inspect the database; it assumes the table exists without the new columns.
+"""
+from typing import Optional, Set
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def table_columns(table: str) -> Optional[Set[str]]:
+    """Return the column names of ``table``, or None if it does not exist."""
+    if op.get_context().as_sql:
+        return set()
+    inspector = sa.inspect(op.get_bind())
+    if table not in inspector.get_table_names():
+        return None
+    return {column['name'] for column in inspector.get_columns(table)}
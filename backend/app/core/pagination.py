@@ -0,0 +1,81 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+class InvalidCursor(ValueError):
+    """A cursor token that was not issued by encode_cursor"""
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque token for the position just after a row in (created_at, id) order"""
+    raw = json.dumps([created_at.isoformat(), row_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def decode_cursor(token: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        created_at, row_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+class Page:
+    """One page of rows in newest-first order"""
+
+    def __init__(self, items: List[Any], has_next: bool, next_cursor: Optional[str]):
+        self.items = items
+        self.has_next = has_next
+        self.next_cursor = next_cursor
+
+def page_statement(
+    statement: Select,
+    created_column,
+    id_column,
+    page_size: int,
+    cursor: Optional[str] = None,
+    page: int = 1
+) -> Select:
+    """The query paginate() runs for a page, including the look-ahead row.
+
+    With a cursor the page starts right after the row it names, using a
+    row-value comparison that an index on (created_at DESC, id DESC) can
+    seek to, so deep pages cost the same as the first. Without one, page
+    numbers fall back to OFFSET for older clients.
+    """
+    statement = statement.order_by(created_column.desc(), id_column.desc())
+    if cursor is not None:
+        created_at, row_id = decode_cursor(cursor)
+        statement = statement.where(tuple_(created_column, id_column) < tuple_(created_at, row_id))
+    elif page > 1:
+        statement = statement.offset((page - 1) * page_size)
+    return statement.limit(page_size + 1)
+
+async def paginate(
+    db: AsyncSession,
+    statement: Select,
+    created_column,
+    id_column,
+    page_size: int,
+    cursor: Optional[str] = None,
+    page: int = 1
+) -> Page:
+    """Fetch a page ordered by (created_at, id) descending.
+
+    One extra row is read to tell whether another page follows; no count
+    is needed.
+    """
+    statement = page_statement(statement, created_column, id_column, page_size, cursor, page)
+    rows = (await db.execute(statement)).scalars().all()
+    has_next = len(rows) > page_size
+    rows = rows[:page_size]
+    next_cursor = None
+    if has_next:
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, created_column.key), getattr(last, id_column.key))
+    return Page(rows, has_next, next_cursor)
+
+async def count(db: AsyncSession, statement: Select) -> int:
+    """Exact number of rows a statement selects; a full scan, so only on request"""
+    return await db.scalar(select(func.count()).select_from(statement.order_by(None).subquery()))
@@ -0,0 +1,177 @@
+import asyncio
+import hashlib
+import hmac
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+import bcrypt
+from fastapi import HTTPException, status
+from app.core.metrics import metrics
+from config import (
+    PASSWORD_ARGON2_MEMORY_COST,
+    PASSWORD_ARGON2_PARALLELISM,
+    PASSWORD_ARGON2_TIME_COST,
+    PASSWORD_BCRYPT_ROUNDS,
+    PASSWORD_HASH_MAX_PENDING,
+    PASSWORD_HASH_SCHEME,
+    PASSWORD_HASH_WORKERS,
+)
+
+# Salted SHA-256 hashes stored before passwords used a slow hash; still
+# accepted at login and replaced there
+LEGACY_SALT = "microvideoblog_salt_2024"
+
+class BcryptScheme:
+    """bcrypt with a configurable work factor (each step doubles the cost)"""
+
+    prefixes = ("$2a$", "$2b$", "$2y$")
+
+    def __init__(self, rounds: int = PASSWORD_BCRYPT_ROUNDS):
+        self.rounds = rounds
+
+    def _secret(self, password: str) -> bytes:
+        # bcrypt only reads the first 72 bytes; newer releases refuse longer input
+        return password.encode()[:72]
+
+    def hash(self, password: str) -> str:
+        return bcrypt.hashpw(self._secret(password), bcrypt.gensalt(self.rounds)).decode()
+
+    def verify(self, password: str, hashed: str) -> bool:
+        return bcrypt.checkpw(self._secret(password), hashed.encode())
+
+    def needs_rehash(self, hashed: str) -> bool:
+        return int(hashed.split("$")[2]) != self.rounds
+
+class Argon2Scheme:
+    """Argon2id; needs the argon2-cffi package"""
+
+    prefixes = ("$argon2id$",)
+
+    def __init__(
+        self,
+        time_cost: int = PASSWORD_ARGON2_TIME_COST,
+        memory_cost: int = PASSWORD_ARGON2_MEMORY_COST,
+        parallelism: int = PASSWORD_ARGON2_PARALLELISM
+    ):
+        import argon2  # only needed when this scheme is configured
+        self._exceptions = argon2.exceptions
+        self._hasher = argon2.PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+
+    def hash(self, password: str) -> str:
+        return self._hasher.hash(password)
+
+    def verify(self, password: str, hashed: str) -> bool:
+        try:
+            return self._hasher.verify(hashed, password)
+        except self._exceptions.VerificationError:
+            return False
+
+    def needs_rehash(self, hashed: str) -> bool:
+        return self._hasher.check_needs_rehash(hashed)
+
+class LegacySha256Scheme:
+    """The original salted SHA-256; verify only"""
+
+    def verify(self, password: str, hashed: str) -> bool:
+        expected = hashlib.sha256((password + LEGACY_SALT).encode()).hexdigest()
+        return hmac.compare_digest(expected, hashed)
+
+def create_scheme(name: str = PASSWORD_HASH_SCHEME):
+    if name == "argon2":
+        return Argon2Scheme()
+    if name == "bcrypt":
+        return BcryptScheme()
+    raise ValueError(f"Unknown password hash scheme: {name}")
+
+class PasswordHasher:
+    """Hashes new passwords with the configured scheme and verifies any
+    hash this service has ever stored: bcrypt, Argon2id or legacy SHA-256.
+
+    All methods block for as long as the scheme's cost dictates; request
+    handlers go through the async functions below instead.
+    """
+
+    def __init__(self, scheme=None):
+        self.scheme = scheme or create_scheme()
+        self._legacy = LegacySha256Scheme()
+
+    def hash(self, password: str) -> str:
+        return self.scheme.hash(password)
+
+    def verify(self, password: str, hashed: str) -> bool:
+        scheme = self._scheme_for(hashed)
+        if scheme is None:
+            return self._legacy.verify(password, hashed)
+        return scheme.verify(password, hashed)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """Whether a hash that just verified should be replaced with a current one"""
+        if not hashed.startswith(self.scheme.prefixes):
+            return True
+        return self.scheme.needs_rehash(hashed)
+
+    def _scheme_for(self, hashed: str):
+        if hashed.startswith(self.scheme.prefixes):
+            return self.scheme
+        if hashed.startswith(BcryptScheme.prefixes):
+            return BcryptScheme()
+        if hashed.startswith(Argon2Scheme.prefixes):
+            return Argon2Scheme()
+        return None
+
+class PasswordHashPool:
+    """Bounded thread pool for password hashing.
+
+    bcrypt and argon2 release the GIL, so hashes run in parallel across the
+    workers while the event loop keeps serving other requests. At most
+    max_pending hashes may be running or queued; beyond that callers are
+    turned away with 503 instead of waiting behind a queue that only grows.
+    """
+
+    def __init__(self, workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+            return self._executor
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                metrics.increment("password_hash.rejected")
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Too many sign-ins in progress, please retry",
+                    headers={"Retry-After": "1"}
+                )
+            self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def pending(self) -> int:
+        with self._lock:
+            return self._pending
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+password_hasher = PasswordHasher()
+password_pool = PasswordHashPool()
+
+async def hash_password(password: str) -> str:
+    return await password_pool.run(password_hasher.hash, password)
+
+async def check_password(password: str, hashed: str) -> bool:
+    return await password_pool.run(password_hasher.verify, password, hashed)
@@ -0,0 +1,203 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+import anyio
+from fastapi import Depends, HTTPException, Request, status
+from app.core.job_queue import JobQueue, get_job_queue
+from app.core.metrics import metrics
+from app.core.redis_client import redis_client
+from app.core.security import get_current_user
+from app.schemas.user import Principal
+from config import (
+    RATE_LIMIT_AUTH,
+    RATE_LIMIT_BACKEND,
+    RATE_LIMIT_LOCAL_KEYS,
+    RATE_LIMIT_STREAM,
+    RATE_LIMIT_TRUST_FORWARDED_FOR,
+    RATE_LIMIT_UPLOAD,
+    UPLOAD_MAX_QUEUE_DEPTH,
+)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+class RateLimit:
+    """A token bucket: holds up to `burst` requests and refills at `count` per `period` seconds"""
+
+    def __init__(self, count: int, period: float, burst: Optional[int] = None):
+        self.count = count
+        self.period = period
+        self.burst = burst or count
+
+    @property
+    def rate(self) -> float:
+        """Tokens added per second"""
+        return self.count / self.period
+
+    @classmethod
+    def parse(cls, value: str) -> Optional["RateLimit"]:
+        """Parse "10/minute" or "10/minute burst 20"; empty or "off" means unlimited"""
+        value = value.strip()
+        if not value or value == "off":
+            return None
+        limit, _, burst = value.partition(" burst ")
+        count, _, period = limit.partition("/")
+        if period.strip() not in PERIODS:
+            raise ValueError(f"Invalid rate limit: {value!r}")
+        return cls(int(count), PERIODS[period.strip()], int(burst) if burst else None)
+
+class Decision:
+    def __init__(self, allowed: bool, remaining: float, retry_after: float):
+        self.allowed = allowed
+        self.remaining = remaining
+        self.retry_after = retry_after
+
+# Refill and take in one step, so concurrent API processes never both spend
+# the last token. Redis's own clock keeps every process on the same time.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or burst
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+-- Lua numbers would be truncated to integers on the way out
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+class LocalTokenBuckets:
+    """Token buckets for one process, least recently used dropped past max_keys"""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_LOCAL_KEYS):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def take(self, key: str, limit: RateLimit, cost: int = 1) -> Decision:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (limit.burst, now))
+            tokens = min(limit.burst, tokens + (now - updated) * limit.rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return Decision(allowed, tokens, 0.0 if allowed else (cost - tokens) / limit.rate)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+class RateLimiter:
+    """Token buckets shared by every API process through Redis.
+
+    While Redis is unreachable each process falls back to its own buckets,
+    so limits still hold per process rather than not at all.
+    """
+
+    def __init__(self, client=None, prefix: str = "ratelimit"):
+        self.client = client  # None keeps the buckets in process only
+        self.prefix = prefix
+        self.local = LocalTokenBuckets()
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT) if client is not None else None
+
+    def _key(self, scope: str, identity: str) -> str:
+        return f"{self.prefix}:{scope}:{identity}"
+
+    def take(self, scope: str, identity: str, limit: RateLimit, cost: int = 1) -> Decision:
+        key = self._key(scope, identity)
+        if self._script is not None:
+            try:
+                allowed, remaining, retry_after = self._script(keys=[key], args=[limit.rate, limit.burst, cost])
+                return Decision(bool(int(allowed)), float(remaining), float(retry_after))
+            except Exception as e:
+                print(f"Warning: Could not check rate limit {key}, limiting in process: {e}")
+        return self.local.take(key, limit, cost)
+
+    async def take_async(self, scope: str, identity: str, limit: RateLimit, cost: int = 1) -> Decision:
+        """take, with the Redis round trip on a worker thread"""
+        if self._script is None:
+            return self.local.take(self._key(scope, identity), limit, cost)
+        return await anyio.to_thread.run_sync(self.take, scope, identity, limit, cost)
+
+def _limiter() -> Optional[RateLimiter]:
+    if RATE_LIMIT_BACKEND == "redis":
+        return RateLimiter(redis_client)
+    if RATE_LIMIT_BACKEND == "memory":
+        return RateLimiter()
+    return None
+
+rate_limiter = _limiter()
+
+# Per route group; see config for what each one covers
+ROUTE_LIMITS: Dict[str, Optional[RateLimit]] = {
+    "auth": RateLimit.parse(RATE_LIMIT_AUTH),
+    "upload": RateLimit.parse(RATE_LIMIT_UPLOAD),
+    "stream": RateLimit.parse(RATE_LIMIT_STREAM),
+}
+
+def client_ip(request: Request) -> str:
+    if RATE_LIMIT_TRUST_FORWARDED_FOR:
+        # Only behind a proxy that sets it; otherwise clients could pick their own bucket
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+async def _enforce(scope: str, identity: str) -> None:
+    limit = ROUTE_LIMITS.get(scope)
+    if rate_limiter is None or limit is None:
+        return
+    decision = await rate_limiter.take_async(scope, identity, limit)
+    if not decision.allowed:
+        metrics.increment(f"rate_limit.{scope}.rejected")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Rate limit exceeded, please retry later",
+            headers={"Retry-After": str(max(1, math.ceil(decision.retry_after)))}
+        )
+
+def rate_limit(scope: str, per_user: bool = False):
+    """Dependency enforcing ROUTE_LIMITS[scope] per client IP, or per
+    authenticated user with per_user (which then requires a token)"""
+    if per_user:
+        async def limit_user(current_user: Principal = Depends(get_current_user)):
+            await _enforce(scope, f"user:{current_user.id}")
+        return limit_user
+
+    async def limit_ip(request: Request):
+        await _enforce(scope, f"ip:{client_ip(request)}")
+    return limit_ip
+
+async def require_upload_capacity(job_queue: JobQueue = Depends(get_job_queue)):
+    """Shed new uploads while the processing backlog is already too deep to absorb them"""
+    if UPLOAD_MAX_QUEUE_DEPTH <= 0:
+        return
+    try:
+        depth = await anyio.to_thread.run_sync(job_queue.depth)
+    except Exception as e:
+        print(f"Warning: Could not read processing queue depth: {e}")
+        return
+    if depth >= UPLOAD_MAX_QUEUE_DEPTH:
+        metrics.increment("upload.shed")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Video processing is backed up, please retry later",
+            headers={"Retry-After": "30"}
+        )
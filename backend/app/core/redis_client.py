@@ -4,5 +4,8 @@ from config import REDIS_URL
 # Redis client for session management and caching
 redis_client = redis.from_url(REDIS_URL, decode_responses=True)
 
+# Values returned as raw bytes, for payloads that are served without decoding
+redis_bytes_client = redis.from_url(REDIS_URL)
+
 def get_redis():
     return redis_client
@@ -0,0 +1,141 @@
+import random
+import threading
+import anyio
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlencode
+from app.core.metrics import metrics
+from app.core.redis_client import redis_bytes_client
+from config import RESPONSE_CACHE_BACKEND, RESPONSE_CACHE_TTL, RESPONSE_CACHE_TTL_JITTER
+
+# Every unfiltered public feed page
+FEED_TAG = "feed"
+
+def creator_tag(creator_id: int) -> str:
+    return f"creator:{creator_id}"
+
+def video_tag(video_id: int) -> str:
+    return f"video:{video_id}"
+
+class ResponseCache:
+    """Serialized JSON bodies of public GET responses, shared through Redis.
+
+    Entries are keyed by path and normalized query parameters and filed
+    under tags (the feed, a creator, a video) so a change can drop every
+    page that shows it. Expiry is spread with random jitter so pages
+    cached together do not all miss together. A page rebuilt while it is
+    being invalidated can be stored stale; the TTL bounds how long.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        name: str = "response",
+        ttl: int = RESPONSE_CACHE_TTL,
+        jitter: float = RESPONSE_CACHE_TTL_JITTER
+    ):
+        self.client = client  # None disables the cache
+        self.name = name
+        self.ttl = ttl
+        self.jitter = jitter
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def key(self, path: str, **params) -> str:
+        """Cache key for a path and its parsed query parameters; unset ones are left out"""
+        query = urlencode(sorted((name, value) for name, value in params.items() if value is not None))
+        return f"{self.name}:{path}?{query}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.name}:tag:{tag}"
+
+    def _expiry(self) -> int:
+        return self.ttl + random.randint(0, int(self.ttl * self.jitter))
+
+    def get(self, key: str) -> Optional[bytes]:
+        if self.client is None:
+            return None
+        try:
+            body = self.client.get(key)
+        except Exception as e:
+            # Serve from the database while Redis is unavailable
+            print(f"Warning: Could not read cached response {key}: {e}")
+            body = None
+        self._record(body is not None)
+        return body
+
+    def set(self, key: str, body: bytes, tags: Iterable[str]) -> None:
+        if self.client is None:
+            return
+        expiry = self._expiry()
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.set(key, body, ex=expiry)
+            for tag in tags:
+                # Tag sets outlive their newest member, then expire with it
+                pipe.sadd(self._tag_key(tag), key)
+                pipe.expire(self._tag_key(tag), self.ttl + int(self.ttl * self.jitter))
+            pipe.execute()
+        except Exception as e:
+            print(f"Warning: Could not cache response {key}: {e}")
+
+    def invalidate(self, *tags: str) -> None:
+        """Drop every cached response filed under any of the tags"""
+        if self.client is None or not tags:
+            return
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for tag_key in tag_keys:
+                pipe.smembers(tag_key)
+            keys = set().union(*pipe.execute())
+            self.client.delete(*keys, *tag_keys)
+            metrics.increment("response_cache.invalidation", len(keys))
+        except Exception as e:
+            print(f"Warning: Could not invalidate cached responses for {', '.join(tags)}: {e}")
+
+    def invalidate_video(self, video_id: int, creator_id: int) -> None:
+        """Forget the pages showing a video after it was added, changed or removed"""
+        self.invalidate(FEED_TAG, creator_tag(creator_id), video_tag(video_id))
+
+    # Request handlers use these, so the Redis round trips run on a worker thread
+    async def get_async(self, key: str) -> Optional[bytes]:
+        if self.client is None:
+            return None
+        return await anyio.to_thread.run_sync(self.get, key)
+
+    async def set_async(self, key: str, body: bytes, tags: Iterable[str]) -> None:
+        if self.client is not None:
+            await anyio.to_thread.run_sync(self.set, key, body, list(tags))
+
+    async def invalidate_async(self, *tags: str) -> None:
+        if self.client is not None:
+            await anyio.to_thread.run_sync(lambda: self.invalidate(*tags))
+
+    async def invalidate_video_async(self, video_id: int, creator_id: int) -> None:
+        if self.client is not None:
+            await anyio.to_thread.run_sync(self.invalidate_video, video_id, creator_id)
+
+    def _record(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+        metrics.increment("response_cache.hit" if hit else "response_cache.miss")
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            hits, misses = self._hits, self._misses
+        lookups = hits + misses
+        return {"hits": hits, "misses": misses, "hit_rate": hits / lookups if lookups else 0.0}
+
+def _client():
+    if RESPONSE_CACHE_BACKEND == "redis":
+        return redis_bytes_client
+    if RESPONSE_CACHE_BACKEND == "fakeredis":
+        import fakeredis  # only needed for tests and local runs without Redis
+        return fakeredis.FakeRedis()
+    return None
+
+response_cache = ResponseCache(client=_client())
@@ -1,27 +1,28 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
-from passlib.context import CryptContext
-import hashlib
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from app.core.cache import PydanticSerializer, TwoTierCache, cache_client, cached
+from app.core.database import get_async_db
+from app.core.metrics import metrics
+from app.core.passwords import password_hasher
 from app.models.user import User
-from config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.schemas.user import Principal
+from config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES, METRICS_TOKEN, PRINCIPAL_CACHE_TTL, TOKEN_CACHE_SIZE
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    # Verify password using the same hashing method
-    salt = "microvideoblog_salt_2024"
-    return hashlib.sha256((plain_password + salt).encode()).hexdigest() == hashed_password
+    """Blocking; request handlers use app.core.passwords.check_password"""
+    return password_hasher.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    # Use SHA-256 for simplicity to avoid bcrypt issues
-    # In production, you'd want to use a proper password hashing library
-    salt = "microvideoblog_salt_2024"
-    return hashlib.sha256((password + salt).encode()).hexdigest()
+    """Blocking; request handlers use app.core.passwords.hash_password"""
+    return password_hasher.hash(password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -33,23 +34,85 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+class TokenCache:
+    """Bounded LRU of verified tokens and their subjects.
+
+    A token's signature and claims cannot change, so once verified it is
+    trusted until its exp without decoding it again.
+    """
+
+    def __init__(self, max_size: int = TOKEN_CACHE_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    def get(self, token: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None and entry[1] <= time.time():
+                del self._entries[token]
+                entry = None
+            if entry is None:
+                return None
+            self._entries.move_to_end(token)
+            return entry[0]
+
+    def put(self, token: str, subject: str, expires_at: float) -> None:
+        with self._lock:
+            self._entries[token] = (subject, expires_at)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+token_cache = TokenCache()
+
 def verify_token(token: str) -> Optional[str]:
+    user_id = token_cache.get(token)
+    if user_id is not None:
+        metrics.increment("token_cache.hit")
+        return user_id
+    metrics.increment("token_cache.miss")
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
         if user_id is None:
             return None
+        # decode() has rejected expired tokens; ones without exp are not cached
+        if payload.get("exp") is not None:
+            token_cache.put(token, user_id, float(payload["exp"]))
         return user_id
     except JWTError:
         return None
 
+# Authenticated users by id; UserService invalidates on update and delete.
+# Other processes may keep their local copy for up to CACHE_L1_TTL seconds.
+principal_cache = TwoTierCache(
+    "principal",
+    client=cache_client(),
+    ttl=PRINCIPAL_CACHE_TTL,
+    serializer=PydanticSerializer(Principal)
+)
+
+# A load opens its own session on the engine rather than using the caller's:
+# the cache shares one load between concurrent requests, which must not run
+# on a session another request owns.
+@cached(principal_cache, key=lambda user_id, bind: user_id)
+async def load_principal(user_id: int, bind: AsyncEngine) -> Optional[Principal]:
+    async with AsyncSession(bind, autoflush=False, expire_on_commit=False) as db:
+        user = await db.get(User, user_id)
+        return Principal.model_validate(user) if user else None
+
 # Security scheme
 security = HTTPBearer()
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
     """Get current authenticated user"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -62,8 +125,23 @@ def get_current_user(
     if user_id is None:
         raise credentials_exception
     
-    user = db.query(User).filter(User.id == int(user_id)).first()
-    if user is None:
+    # Only the engine is shared with the load; the request's session stays its own
+    user = await load_principal(int(user_id), db.bind)
+    if user is None or not user.is_active:
         raise credentials_exception
     
     return user
+
+optional_security = HTTPBearer(auto_error=False)
+
+def require_metrics_token(credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)) -> None:
+    """Admit only scrapers holding METRICS_TOKEN; with none configured there is nothing to serve"""
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    token = credentials.credentials if credentials else ""
+    if not secrets.compare_digest(token.encode(), METRICS_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
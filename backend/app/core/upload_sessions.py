@@ -0,0 +1,144 @@
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel, Field
+from app.core.redis_client import redis_client
+from config import UPLOAD_SESSION_BACKEND, UPLOAD_SESSION_TTL
+
+class UploadSession(BaseModel):
+    """A resumable upload in progress: what is being sent and by whom"""
+    upload_id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    creator_id: int
+    filename: str
+    size: int
+    title: str
+    description: Optional[str] = None
+    created_at: float = Field(default_factory=time.time)
+
+def merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Collapse inclusive byte ranges into sorted, non-overlapping ones"""
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+class UploadSessionStore:
+    """Session state for resumable uploads.
+
+    Chunks may arrive in parallel and out of order, so each received byte
+    range is recorded independently and merged when read.
+    """
+
+    def create(self, session: UploadSession) -> None:
+        raise NotImplementedError
+
+    def get(self, upload_id: str) -> Optional[UploadSession]:
+        raise NotImplementedError
+
+    def add_range(self, upload_id: str, start: int, end: int) -> None:
+        """Record that bytes start..end (inclusive) are on disk; also extends the session TTL"""
+        raise NotImplementedError
+
+    def ranges(self, upload_id: str) -> List[Tuple[int, int]]:
+        """Merged inclusive byte ranges received so far"""
+        raise NotImplementedError
+
+    def delete(self, upload_id: str) -> None:
+        raise NotImplementedError
+
+class RedisUploadSessionStore(UploadSessionStore):
+    """Sessions as Redis hashes, received ranges in a sorted set keyed by start offset"""
+
+    def __init__(self, client=None, name: str = "upload_sessions", ttl: int = UPLOAD_SESSION_TTL):
+        self.client = client or redis_client
+        self.name = name
+        self.ttl = ttl
+
+    def _session_key(self, upload_id: str) -> str:
+        return f"{self.name}:{upload_id}"
+
+    def _ranges_key(self, upload_id: str) -> str:
+        return f"{self.name}:{upload_id}:ranges"
+
+    def create(self, session: UploadSession) -> None:
+        key = self._session_key(session.upload_id)
+        self.client.set(key, session.model_dump_json(), ex=self.ttl)
+
+    def get(self, upload_id: str) -> Optional[UploadSession]:
+        raw = self.client.get(self._session_key(upload_id))
+        if raw is None:
+            return None
+        return UploadSession.model_validate_json(raw)
+
+    def add_range(self, upload_id: str, start: int, end: int) -> None:
+        ranges_key = self._ranges_key(upload_id)
+        pipe = self.client.pipeline()
+        # ZADD is atomic, so concurrent chunk requests never lose each other's ranges
+        pipe.zadd(ranges_key, {f"{start}-{end}": start})
+        pipe.expire(ranges_key, self.ttl)
+        pipe.expire(self._session_key(upload_id), self.ttl)
+        pipe.execute()
+
+    def ranges(self, upload_id: str) -> List[Tuple[int, int]]:
+        members = self.client.zrange(self._ranges_key(upload_id), 0, -1)
+        return merge_ranges([tuple(int(part) for part in member.split("-")) for member in members])
+
+    def delete(self, upload_id: str) -> None:
+        self.client.delete(self._session_key(upload_id), self._ranges_key(upload_id))
+
+class InMemoryUploadSessionStore(UploadSessionStore):
+    """In-process stand-in for tests and single-process development"""
+
+    def __init__(self, ttl: int = UPLOAD_SESSION_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._sessions: Dict[str, Tuple[UploadSession, float]] = {}
+        self._ranges: Dict[str, List[Tuple[int, int]]] = {}
+
+    def create(self, session: UploadSession) -> None:
+        with self._lock:
+            self._sessions[session.upload_id] = (session, time.monotonic() + self.ttl)
+            self._ranges[session.upload_id] = []
+
+    def get(self, upload_id: str) -> Optional[UploadSession]:
+        with self._lock:
+            entry = self._sessions.get(upload_id)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                self._sessions.pop(upload_id, None)
+                self._ranges.pop(upload_id, None)
+                return None
+            return entry[0]
+
+    def add_range(self, upload_id: str, start: int, end: int) -> None:
+        with self._lock:
+            if upload_id not in self._sessions:
+                return
+            session, _ = self._sessions[upload_id]
+            self._sessions[upload_id] = (session, time.monotonic() + self.ttl)
+            self._ranges[upload_id].append((start, end))
+
+    def ranges(self, upload_id: str) -> List[Tuple[int, int]]:
+        with self._lock:
+            return merge_ranges(self._ranges.get(upload_id, []))
+
+    def delete(self, upload_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(upload_id, None)
+            self._ranges.pop(upload_id, None)
+
+_upload_session_store: Optional[UploadSessionStore] = None
+
+def get_upload_session_store() -> UploadSessionStore:
+    global _upload_session_store
+    if _upload_session_store is None:
+        if UPLOAD_SESSION_BACKEND == "memory":
+            _upload_session_store = InMemoryUploadSessionStore()
+        else:
+            _upload_session_store = RedisUploadSessionStore()
+    return _upload_session_store
@@ -0,0 +1,96 @@
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+from app.core.metrics import metrics
+from config import VIDEO_CACHE_MAX_BYTES, VIDEO_CACHE_MAX_FILE_BYTES
+
+class CachedFile:
+    """A read-only mapping of one file, tagged with the stat it was loaded from"""
+
+    def __init__(self, buffer: mmap.mmap, size: int, mtime_ns: int):
+        self.buffer = buffer
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+class HotVideoCache:
+    """Size-bounded LRU of memory-mapped video files.
+
+    Range requests are answered with memoryview slices of the mapping, so a
+    hit neither touches the file descriptor table nor copies bytes in user
+    space. Entries are keyed by path and revalidated against the file's size
+    and mtime on every lookup, so a replaced file is never served stale.
+
+    Evicted mappings are not closed explicitly: responses still streaming
+    from them hold memoryviews, and the mapping is released once the last
+    of those is dropped.
+    """
+
+    def __init__(self, max_bytes: int = VIDEO_CACHE_MAX_BYTES, max_file_bytes: int = VIDEO_CACHE_MAX_FILE_BYTES):
+        self.max_bytes = max_bytes
+        self.max_file_bytes = min(max_file_bytes, max_bytes)
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, CachedFile]" = OrderedDict()
+        self._bytes = 0
+
+    def admits(self, size: int) -> bool:
+        """Whether a file of this size may be cached at all"""
+        return 0 < size <= self.max_file_bytes
+
+    def get(self, path: str, size: int, mtime_ns: int) -> Optional[memoryview]:
+        """The cached bytes of path if they match the given stat; never does I/O"""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and entry.size == size and entry.mtime_ns == mtime_ns:
+                self._entries.move_to_end(path)
+                metrics.increment("video_cache.hit")
+                return memoryview(entry.buffer)
+        metrics.increment("video_cache.miss")
+        return None
+
+    def load(self, path: str, size: int, mtime_ns: int) -> Optional[memoryview]:
+        """Map path into the cache, evicting least recently used files to stay in budget.
+
+        Blocking: pages are faulted in up front so later hits never wait on
+        the disk. Returns None when the file is too large to cache or no
+        longer matches the stat the caller based its response headers on.
+        """
+        with open(path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            if not self.admits(stat.st_size) or (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                return None
+            buffer = mmap.mmap(f.fileno(), 0, flags=mmap.MAP_SHARED | getattr(mmap, "MAP_POPULATE", 0), prot=mmap.PROT_READ)
+        entry = CachedFile(buffer, stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            previous = self._entries.pop(path, None)
+            if previous is not None:
+                self._bytes -= previous.size
+            self._entries[path] = entry
+            self._bytes += entry.size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                metrics.increment("video_cache.eviction")
+        return memoryview(buffer)
+
+    def invalidate(self, path: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(path, None)
+            if entry is not None:
+                self._bytes -= entry.size
+                metrics.increment("video_cache.invalidation")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+# Mappings are shared with the page cache, so worker processes serving the
+# same hot files do not each hold a private copy
+video_cache = HotVideoCache()
@@ -1,24 +1,68 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from app.api.auth import router as auth_router
 from app.api.password_reset import router as password_reset_router
+from app.api.users import router as users_router
 from app.api.videos import router as videos_router
-from app.core.database import engine
+from app.core.database import async_engine, engine
 from app.models.user import User
 from app.models.video import Video
-from config import DEBUG
+from app.models.video_rendition import VideoRendition
+from app.models.video_asset import VideoAsset
+from app.models.like import Like
+from app.models.follow import Follow
+from app.core.cache import caches
+from app.core.executors import shutdown_media_executor
+from app.core.like_counter import LikeFlusher, like_counter
+from app.core.metrics import metrics
+from app.core.passwords import password_pool
+from app.core.response_cache import response_cache
+from app.core.security import require_metrics_token
+from app.core.video_cache import video_cache
+from app.services.video_worker import VideoWorkerPool
+from config import DEBUG, RUN_LIKE_FLUSHER_IN_API, RUN_VIDEO_WORKERS_IN_API
 import os
 
 # Create database tables
 User.metadata.create_all(bind=engine)
 Video.metadata.create_all(bind=engine)
+VideoRendition.metadata.create_all(bind=engine)
+VideoAsset.metadata.create_all(bind=engine)
+Like.metadata.create_all(bind=engine)
+Follow.metadata.create_all(bind=engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Run the video workers alongside the API unless they are deployed separately
+    worker_pool = None
+    if RUN_VIDEO_WORKERS_IN_API:
+        try:
+            worker_pool = VideoWorkerPool()
+            worker_pool.start()
+        except Exception as e:
+            print(f"Warning: Could not start video workers: {e}")
+            worker_pool = None
+    like_flusher = None
+    if RUN_LIKE_FLUSHER_IN_API and like_counter.enabled:
+        like_flusher = LikeFlusher(like_counter)
+        like_flusher.start()
+    yield
+    if worker_pool:
+        worker_pool.stop()
+    if like_flusher:
+        like_flusher.stop()
+    shutdown_media_executor()
+    password_pool.shutdown()
+    await async_engine.dispose()
 
 app = FastAPI(
     title="Micro Video Blog API",
     description="A micro-video blog platform for 5-second video content",
     version="1.0.0",
-    debug=DEBUG
+    debug=DEBUG,
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -34,6 +78,7 @@ app.add_middleware(
 app.include_router(auth_router)
 app.include_router(password_reset_router)
 app.include_router(videos_router)
+app.include_router(users_router)
 
 # Mount static files for video and thumbnail serving
 os.makedirs("uploads/videos", exist_ok=True)
@@ -48,3 +93,13 @@ async def root():
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+# Cache and queue internals are not for the public; scrapers authenticate (see METRICS_TOKEN)
+@app.get("/metrics", dependencies=[Depends(require_metrics_token)])
+def get_metrics():
+    return {
+        **metrics.snapshot(),
+        "video_cache": video_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "caches": {name: cache.stats() for name, cache in caches.items()}
+    }
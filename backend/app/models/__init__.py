@@ -1,2 +1,6 @@
 from .user import User
 from .video import Video
+from .video_rendition import VideoRendition
+from .video_asset import VideoAsset
+from .like import Like
+from .follow import Follow
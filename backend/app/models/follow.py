@@ -0,0 +1,26 @@
+from sqlalchemy import CheckConstraint, Column, Integer, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class Follow(Base):
+    """One user following another; the row's existence is the follow.
+
+    The primary key (follower_id, followee_id) answers "does A follow B"
+    and "which of these does A follow", and lists whom A follows. The
+    index on (followee_id, created_at, follower_id) lists a user's
+    followers newest first without touching the table. Counts are kept
+    on User.follower_count and User.following_count by FollowService.
+    """
+    __tablename__ = "follows"
+
+    follower_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    followee_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        CheckConstraint("follower_id <> followee_id", name="ck_follows_not_self"),
+        # A user's followers, newest first, as a keyset page
+        Index("ix_follows_followee_created", followee_id, created_at.desc(), follower_id.desc()),
+        # Whom a user follows, newest first
+        Index("ix_follows_follower_created", follower_id, created_at.desc(), followee_id.desc()),
+    )
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+class Like(Base):
+    """One user's like of one video; the row's existence is the like.
+
+    Counts are not derived from this table on reads: Video.like_count is
+    kept up to date by the like counter (app.core.like_counter).
+    """
+    __tablename__ = "likes"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    video_id = Column(Integer, ForeignKey("videos.id", ondelete="CASCADE"), primary_key=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # A video's likers, and recounting a video's likes
+        Index("ix_likes_video_id", video_id),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Float
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Float, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
@@ -16,14 +16,25 @@ class Video(Base):
     width = Column(Integer, nullable=False)
     height = Column(Integer, nullable=False)
     format = Column(String(10), nullable=False)  # mp4, webm, mov
+    fps = Column(Float, nullable=True)
+    codec = Column(String(20), nullable=True)  # Source codec fourcc, e.g. avc1, vp80
+    transcode_mode = Column(String(20), nullable=True)  # transcode, or remux when the upload was web-ready
     thumbnail_url = Column(String(500), nullable=True)
     video_url = Column(String(500), nullable=False)
     processing_status = Column(String(20), default="pending")  # pending, processing, completed, failed
+    processing_error = Column(Text, nullable=True)
+    processing_attempts = Column(Integer, default=0)
+    processing_started_at = Column(DateTime(timezone=True), nullable=True)  # Start of the current worker's lease
+    source_path = Column(String(500), nullable=True)  # Staged upload awaiting processing
+    hls_prefix = Column(String(255), nullable=True)  # Storage prefix of the HLS ladder, if packaged
+    content_hash = Column(String(64), nullable=True, index=True)  # SHA-256 of the uploaded bytes
     is_public = Column(Boolean, default=True)
     is_deleted = Column(Boolean, default=False)
+    like_count = Column(Integer, nullable=False, default=0, server_default="0")  # Flushed from the like counter
     
     # Foreign keys
     creator_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    asset_id = Column(Integer, ForeignKey("video_assets.id"), nullable=True, index=True)  # Shared processed media
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -32,6 +43,21 @@ class Video(Base):
     # Relationships
     creator = relationship("User", back_populates="videos")
 
+    # Feed indexes, in the (created_at DESC, id DESC) order listings are paged by.
+    # Postgres keeps them partial; elsewhere they cover every row.
+    __table_args__ = (
+        # GET /videos/: public, live, finished videos
+        Index(
+            "ix_videos_public_feed", created_at.desc(), id.desc(),
+            postgresql_where=text("is_public AND NOT is_deleted AND processing_status = 'completed'")
+        ),
+        # GET /videos/my-videos and GET /videos/?creator_id=: one creator's live videos
+        Index(
+            "ix_videos_creator_feed", creator_id, created_at.desc(), id.desc(),
+            postgresql_where=text("NOT is_deleted")
+        ),
+    )
+
 # Add the relationship to User model
 from app.models.user import User
 User.videos = relationship("Video", back_populates="creator")
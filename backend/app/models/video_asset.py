@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, DateTime, Float
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+class VideoAsset(Base):
+    """Processed media for one distinct upload, shared by every video with the same content"""
+    __tablename__ = "video_assets"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String(64), unique=True, index=True, nullable=False)  # SHA-256 of the uploaded bytes
+    filename = Column(String(255), nullable=False)  # Optimized MP4 in the videos folder
+    video_url = Column(String(500), nullable=False)
+    thumbnail_url = Column(String(500), nullable=True)
+    hls_prefix = Column(String(255), nullable=True)
+    duration = Column(Float, nullable=False)
+    width = Column(Integer, nullable=False)
+    height = Column(Integer, nullable=False)
+    fps = Column(Float, nullable=True)
+    codec = Column(String(20), nullable=True)
+    transcode_mode = Column(String(20), nullable=True)
+    ref_count = Column(Integer, nullable=False, default=1)  # Videos pointing at this asset; files go at zero
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationships
+    videos = relationship("Video", back_populates="asset")
+
+# Add the relationship to Video model
+from app.models.video import Video
+Video.asset = relationship("VideoAsset", back_populates="videos")
@@ -0,0 +1,28 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.core.database import Base
+
+class VideoRendition(Base):
+    __tablename__ = "video_renditions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    video_id = Column(Integer, ForeignKey("videos.id", ondelete="CASCADE"), nullable=False, index=True)
+    name = Column(String(20), nullable=False)  # e.g. 240p, 480p, 720p
+    width = Column(Integer, nullable=False)
+    height = Column(Integer, nullable=False)
+    bandwidth = Column(Integer, nullable=False)  # Peak bits per second, as advertised in the master playlist
+    codecs = Column(String(100), nullable=True)  # RFC 6381 codecs string, e.g. avc1.64001f,mp4a.40.2
+    playlist = Column(String(255), nullable=False)  # Media playlist path relative to the master playlist
+    
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationships
+    video = relationship("Video", back_populates="renditions")
+
+# Add the relationship to Video model
+from app.models.video import Video
+Video.renditions = relationship(
+    "VideoRendition", back_populates="video", order_by=VideoRendition.height, cascade="all, delete-orphan"
+)
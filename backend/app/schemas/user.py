@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class UserBase(BaseModel):
@@ -20,6 +20,8 @@ class UserInDB(UserBase):
     id: int
     is_active: bool
     is_verified: bool
+    follower_count: int = 0
+    following_count: int = 0
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -29,6 +31,49 @@ class UserInDB(UserBase):
 class User(UserInDB):
     pass
 
+class UserProfile(BaseModel):
+    """What anyone may see of a user"""
+    id: int
+    username: str
+    full_name: Optional[str] = None
+    follower_count: int = 0
+    following_count: int = 0
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class UserSummary(BaseModel):
+    """A user as listed among followers and followings"""
+    id: int
+    username: str
+    full_name: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class FollowResponse(BaseModel):
+    user_id: int
+    following: bool
+    follower_count: int
+
+class UserListResponse(BaseModel):
+    users: List[UserSummary]
+    has_next: bool
+    next_cursor: Optional[str] = None  # Pass as cursor to fetch the following page
+
+class FollowingLookupResponse(BaseModel):
+    following: List[int]  # The requested ids the current user follows
+
+class Principal(BaseModel):
+    """The authenticated user, as much of it as request handling needs"""
+    id: int
+    username: str
+    is_active: bool
+
+    class Config:
+        from_attributes = True
+
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, validator
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from enum import Enum
 
@@ -14,6 +14,18 @@ class VideoFormat(str, Enum):
     WEBM = "webm"
     MOV = "mov"
 
+class MediaInfo(BaseModel):
+    """Media properties collected while probing and transcoding an upload"""
+    duration: float
+    width: int
+    height: int
+    fps: float
+    codec: Optional[str] = None
+    frame_count: int
+    output_width: int
+    output_height: int
+    transcode_mode: str = "transcode"  # transcode, or remux for uploads that were already web-ready
+
 class VideoBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=200)
     description: Optional[str] = Field(None, max_length=1000)
@@ -35,11 +47,16 @@ class VideoInDB(VideoBase):
     width: int
     height: int
     format: VideoFormat
+    fps: Optional[float] = None
+    codec: Optional[str] = None
+    transcode_mode: Optional[str] = None
     thumbnail_url: Optional[str]
     video_url: str
     processing_status: VideoProcessingStatus
+    processing_error: Optional[str] = None
     is_public: bool
     is_deleted: bool
+    like_count: int = 0
     creator_id: int
     created_at: datetime
     updated_at: Optional[datetime]
@@ -49,15 +66,46 @@ class VideoInDB(VideoBase):
 
 class Video(VideoInDB):
     creator_username: Optional[str] = None
+    hls_url: Optional[str] = None  # Master playlist for adaptive streaming, when packaged
+
+    @classmethod
+    def from_model(cls, video, pending_likes: int = 0) -> "Video":
+        """API representation of a Video row; load its creator up front to avoid a query here.
+
+        pending_likes are likes still in the like counter, not yet flushed to the row.
+        """
+        schema = cls.model_validate(video)
+        schema.like_count = (video.like_count or 0) + pending_likes
+        schema.creator_username = video.creator.username if video.creator else None
+        schema.hls_url = f"/videos/{video.id}/hls/master.m3u8" if video.hls_prefix else None
+        return schema
 
 class VideoUploadResponse(BaseModel):
     video_id: int
     message: str
     processing_status: VideoProcessingStatus
 
+class UploadSessionCreate(VideoBase):
+    filename: str = Field(..., min_length=1, max_length=255)
+    size: int = Field(..., gt=0)  # Total upload length in bytes
+
+class UploadSessionStatus(BaseModel):
+    upload_id: str
+    size: int
+    chunk_size: int  # Largest chunk the server accepts per request
+    received: List[List[int]]  # Inclusive [start, end] byte ranges already stored
+    received_bytes: int
+    complete: bool
+
+class LikeResponse(BaseModel):
+    video_id: int
+    liked: bool
+    like_count: int
+
 class VideoListResponse(BaseModel):
     videos: list[Video]
-    total: int
+    total: Optional[int] = None  # Only counted when include_total is requested
     page: int
     page_size: int
     has_next: bool
+    next_cursor: Optional[str] = None  # Pass as cursor to fetch the following page
@@ -1,4 +1,5 @@
 import os
+import shutil
 import uuid
 from typing import Optional, Tuple
 from google.cloud import storage
@@ -13,10 +14,12 @@ class CloudStorageService:
         # Local storage paths
         self.local_video_dir = "uploads/videos"
         self.local_thumbnail_dir = "uploads/thumbnails"
+        self.local_hls_dir = "uploads/hls"
         
         # Create local directories
         os.makedirs(self.local_video_dir, exist_ok=True)
         os.makedirs(self.local_thumbnail_dir, exist_ok=True)
+        os.makedirs(self.local_hls_dir, exist_ok=True)
         
         # Initialize GCS client if using cloud storage
         self.gcs_client = None
@@ -44,27 +47,28 @@ class CloudStorageService:
             print(f"Error ensuring bucket exists: {e}")
             raise
     
-    def upload_file(self, file_data: bytes, file_extension: str, folder: str = "videos") -> Tuple[str, str]:
+    def upload_file(self, file_path: str, file_extension: str, folder: str = "videos") -> Tuple[str, str]:
         """
-        Upload file to storage and return (filename, public_url)
+        Upload a file from disk to storage and return (filename, public_url).
+        The file is streamed, never loaded into memory as a whole.
         """
         # Generate unique filename
         unique_filename = f"{uuid.uuid4()}.{file_extension}"
         
         if self.use_cloud and self.gcs_client:
-            return self._upload_to_gcs(file_data, unique_filename, folder)
+            return self._upload_to_gcs(file_path, unique_filename, folder)
         else:
-            return self._upload_to_local(file_data, unique_filename, folder)
+            return self._upload_to_local(file_path, unique_filename, folder)
     
-    def _upload_to_gcs(self, file_data: bytes, filename: str, folder: str) -> Tuple[str, str]:
+    def _upload_to_gcs(self, file_path: str, filename: str, folder: str) -> Tuple[str, str]:
         """Upload file to Google Cloud Storage"""
         try:
             bucket = self.gcs_client.bucket(self.bucket_name)
             blob_name = f"{folder}/{filename}"
             blob = bucket.blob(blob_name)
             
-            # Upload file
-            blob.upload_from_string(file_data, content_type=self._get_content_type(filename))
+            # Upload file in chunks straight from disk
+            blob.upload_from_filename(file_path, content_type=self._get_content_type(filename))
             
             # Make blob publicly readable
             blob.make_public()
@@ -76,26 +80,20 @@ class CloudStorageService:
         except Exception as e:
             print(f"Error uploading to GCS: {e}")
             # Fallback to local storage
-            return self._upload_to_local(file_data, filename, folder)
+            return self._upload_to_local(file_path, filename, folder)
     
-    def _upload_to_local(self, file_data: bytes, filename: str, folder: str) -> Tuple[str, str]:
+    def _upload_to_local(self, file_path: str, filename: str, folder: str) -> Tuple[str, str]:
         """Upload file to local storage"""
         try:
             # Determine local directory
-            if folder == "videos":
-                local_dir = self.local_video_dir
-            elif folder == "thumbnails":
-                local_dir = self.local_thumbnail_dir
-            else:
-                local_dir = "uploads"
+            local_dir = self._get_local_dir(folder)
             
             # Ensure directory exists
             os.makedirs(local_dir, exist_ok=True)
             
-            # Write file
-            file_path = os.path.join(local_dir, filename)
-            with open(file_path, 'wb') as f:
-                f.write(file_data)
+            # Copy file (kernel-side copy where the platform supports it)
+            destination = os.path.join(local_dir, filename)
+            shutil.copyfile(file_path, destination)
             
             # Return filename and local URL
             public_url = f"/{folder}/{filename}"
@@ -105,6 +103,57 @@ class CloudStorageService:
             print(f"Error uploading to local storage: {e}")
             raise
     
+    def _get_local_dir(self, folder: str) -> str:
+        """Map a storage folder to its local directory"""
+        if folder == "videos":
+            return self.local_video_dir
+        elif folder == "thumbnails":
+            return self.local_thumbnail_dir
+        elif folder == "hls":
+            return self.local_hls_dir
+        else:
+            return "uploads"
+    
+    def upload_tree(self, local_dir: str, folder: str = "hls") -> Tuple[str, str]:
+        """
+        Upload every file under local_dir, keeping relative paths, under a new
+        unique prefix. Returns (prefix, public_url_of_prefix).
+        """
+        prefix = str(uuid.uuid4())
+        
+        if self.use_cloud and self.gcs_client:
+            bucket = self.gcs_client.bucket(self.bucket_name)
+            for root, _, files in os.walk(local_dir):
+                for name in files:
+                    file_path = os.path.join(root, name)
+                    relative_path = os.path.relpath(file_path, local_dir).replace(os.sep, "/")
+                    blob = bucket.blob(f"{folder}/{prefix}/{relative_path}")
+                    blob.upload_from_filename(file_path, content_type=self._get_content_type(name))
+                    blob.make_public()
+            return prefix, f"https://storage.googleapis.com/{self.bucket_name}/{folder}/{prefix}"
+        
+        shutil.copytree(local_dir, os.path.join(self._get_local_dir(folder), prefix))
+        return prefix, f"/{folder}/{prefix}"
+    
+    def delete_tree(self, prefix: str, folder: str = "hls") -> bool:
+        """Delete everything uploaded under a prefix by upload_tree"""
+        try:
+            if self.use_cloud and self.gcs_client:
+                bucket = self.gcs_client.bucket(self.bucket_name)
+                blobs = list(bucket.list_blobs(prefix=f"{folder}/{prefix}/"))
+                for blob in blobs:
+                    blob.delete()
+                return bool(blobs)
+            
+            tree_path = os.path.join(self._get_local_dir(folder), prefix)
+            if os.path.isdir(tree_path):
+                shutil.rmtree(tree_path)
+                return True
+            return False
+        except Exception as e:
+            print(f"Error deleting tree: {e}")
+            return False
+    
     def delete_file(self, filename: str, folder: str = "videos") -> bool:
         """Delete file from storage"""
         try:
@@ -136,12 +185,7 @@ class CloudStorageService:
         """Delete file from local storage"""
         try:
             # Determine local directory
-            if folder == "videos":
-                local_dir = self.local_video_dir
-            elif folder == "thumbnails":
-                local_dir = self.local_thumbnail_dir
-            else:
-                local_dir = "uploads"
+            local_dir = self._get_local_dir(folder)
             
             file_path = os.path.join(local_dir, filename)
             if os.path.exists(file_path):
@@ -162,7 +206,9 @@ class CloudStorageService:
             'mov': 'video/quicktime',
             'jpg': 'image/jpeg',
             'jpeg': 'image/jpeg',
-            'png': 'image/png'
+            'png': 'image/png',
+            'm3u8': 'application/vnd.apple.mpegurl',
+            'm4s': 'video/iso.segment'
         }
         return content_types.get(extension, 'application/octet-stream')
     
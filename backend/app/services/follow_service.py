@@ -0,0 +1,125 @@
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional, Set
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.follow_mirror import FollowMirror, follow_mirror
+from app.core.metrics import metrics
+from app.core.pagination import Page, decode_cursor, encode_cursor, paginate
+from app.models.follow import Follow
+from app.models.user import User
+
+class FollowService:
+    """Follows and unfollows, their counts, and the lookups list pages need.
+
+    The follows row and both users' counters change in one transaction, so
+    follower_count and following_count always match the table. Membership
+    checks and follower lists read the Redis mirror (app.core.follow_mirror)
+    and fall back to the indexed queries here.
+    """
+
+    def __init__(self, db: AsyncSession, mirror: FollowMirror = follow_mirror):
+        self.db = db
+        self.mirror = mirror
+
+    async def follow(self, follower_id: int, followee_id: int) -> bool:
+        """Follow a user; False if already following"""
+        followed_at = datetime.now(timezone.utc)
+        self.db.add(Follow(follower_id=follower_id, followee_id=followee_id, created_at=followed_at))
+        try:
+            await self.db.flush()
+        except IntegrityError:
+            await self.db.rollback()
+            return False
+        await self._count(follower_id, followee_id, 1)
+        await self.db.commit()
+        self.mirror.followed(follower_id, followee_id, followed_at)
+        metrics.increment("follows.followed")
+        return True
+
+    async def unfollow(self, follower_id: int, followee_id: int) -> bool:
+        """Stop following a user; False if not following"""
+        result = await self.db.execute(
+            delete(Follow).where(Follow.follower_id == follower_id, Follow.followee_id == followee_id)
+        )
+        if result.rowcount == 0:
+            await self.db.rollback()
+            return False
+        await self._count(follower_id, followee_id, -1)
+        await self.db.commit()
+        self.mirror.unfollowed(follower_id, followee_id)
+        metrics.increment("follows.unfollowed")
+        return True
+
+    async def _count(self, follower_id: int, followee_id: int, delta: int) -> None:
+        # Both rows in id order, so A following B while B follows A can't deadlock
+        for user_id in sorted((follower_id, followee_id)):
+            if user_id == follower_id:
+                values = {"following_count": User.following_count + delta}
+            else:
+                values = {"follower_count": User.follower_count + delta}
+            await self.db.execute(update(User).where(User.id == user_id).values(**values))
+
+    async def is_following(self, follower_id: int, followee_id: int) -> bool:
+        return followee_id in await self.following_among(follower_id, [followee_id])
+
+    async def following_among(self, follower_id: int, user_ids: Iterable[int]) -> Set[int]:
+        """Which of user_ids the follower follows: one lookup for a whole page of creators"""
+        user_ids = list(dict.fromkeys(user_ids))
+        if not user_ids:
+            return set()
+        mirrored = self.mirror.following_among(follower_id, user_ids)
+        if mirrored is not None:
+            return mirrored
+        if self.mirror.enabled:
+            # Not mirrored yet: read the whole list once, from the primary key, and keep it
+            followee_ids = (await self.db.scalars(
+                select(Follow.followee_id).where(Follow.follower_id == follower_id)
+            )).all()
+            self.mirror.load_following(follower_id, followee_ids)
+            metrics.increment("follows.mirror_loaded")
+            return set(followee_ids) & set(user_ids)
+        result = await self.db.scalars(
+            select(Follow.followee_id).where(Follow.follower_id == follower_id, Follow.followee_id.in_(user_ids))
+        )
+        return set(result.all())
+
+    async def followers(self, user_id: int, page_size: int, cursor: Optional[str] = None) -> Page:
+        """A user's followers, newest first; items are Users.
+
+        Pages come from the mirror's sorted set when it is there, where the
+        cursor's time alone bounds the next page: a follow in the same
+        microsecond as the last one listed would be skipped.
+        """
+        before = decode_cursor(cursor)[0] if cursor is not None else None
+        entries = self.mirror.followers_page(user_id, page_size + 1, before)
+        if entries is None and self.mirror.enabled:
+            rows = (await self.db.execute(
+                select(Follow.follower_id, Follow.created_at).where(Follow.followee_id == user_id)
+            )).all()
+            self.mirror.load_followers(user_id, rows)
+            metrics.increment("follows.mirror_loaded")
+            entries = self.mirror.followers_page(user_id, page_size + 1, before)
+        if entries is None:
+            statement = select(Follow).where(Follow.followee_id == user_id)
+            page = await paginate(self.db, statement, Follow.created_at, Follow.follower_id, page_size, cursor=cursor)
+            return await self._users_page(page, [(follow.follower_id, follow.created_at) for follow in page.items])
+        has_next = len(entries) > page_size
+        entries = entries[:page_size]
+        next_cursor = encode_cursor(entries[-1][1], entries[-1][0]) if has_next else None
+        return await self._users_page(Page(entries, has_next, next_cursor), entries)
+
+    async def following(self, user_id: int, page_size: int, cursor: Optional[str] = None) -> Page:
+        """Whom a user follows, newest first; items are Users"""
+        statement = select(Follow).where(Follow.follower_id == user_id)
+        page = await paginate(self.db, statement, Follow.created_at, Follow.followee_id, page_size, cursor=cursor)
+        return await self._users_page(page, [(follow.followee_id, follow.created_at) for follow in page.items])
+
+    async def _users_page(self, page: Page, entries: List[tuple]) -> Page:
+        # One query for the page's users, kept in the page's order
+        user_ids = [user_id for user_id, _ in entries]
+        users = {}
+        if user_ids:
+            users = {user.id: user for user in await self.db.scalars(select(User).where(User.id.in_(user_ids)))}
+        page.items = [users[user_id] for user_id in user_ids if user_id in users]
+        return page
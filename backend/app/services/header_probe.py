@@ -0,0 +1,319 @@
+"""Container header inspection from the first bytes of an upload.
+
+Identifies MP4/MOV and WebM/Matroska by their magic bytes and reads the
+duration and frame size straight from the moov atom or the EBML Info and
+Tracks elements, without decoding anything. Used to turn away uploads
+that can never be processed while they are still streaming in.
+"""
+import os
+import struct
+from typing import Dict, List, Optional, Tuple
+from app.services import mp4
+from app.services.media_processing import InvalidVideoError
+
+# Top-level atoms that may open a QuickTime file written without an ftyp
+QUICKTIME_LEADING_ATOMS = {b"moov", b"mdat", b"wide", b"free", b"skip", b"pnot"}
+
+EBML_MAGIC = b"\x1a\x45\xdf\xa3"
+
+# Matroska element IDs (with their length marker bits, as they appear on disk)
+EBML_HEADER = 0x1A45DFA3
+EBML_DOCTYPE = 0x4282
+SEGMENT = 0x18538067
+INFO = 0x1549A966
+TIMECODE_SCALE = 0x2AD7B1
+DURATION = 0x4489
+TRACKS = 0x1654AE6B
+TRACK_ENTRY = 0xAE
+TRACK_VIDEO = 0xE0
+PIXEL_WIDTH = 0xB0
+PIXEL_HEIGHT = 0xBA
+CLUSTER = 0x1F43B675
+
+# Larger headers are left to the full probe rather than buffered in memory
+MAX_MOOV_SIZE = 16 * 1024 * 1024
+MAX_EBML_HEADER_SIZE = 1024 * 1024
+
+def sniff_container(head: bytes) -> Optional[str]:
+    """Container family from the first bytes of a file: mp4, mov, webm or None"""
+    if head.startswith(EBML_MAGIC):
+        return "webm"
+    if len(head) >= 12 and head[4:8] == b"ftyp":
+        return "mov" if head[8:12] == b"qt  " else "mp4"
+    if len(head) >= 8 and head[4:8] in QUICKTIME_LEADING_ATOMS:
+        return "mov"
+    return None
+
+def parse_moov(moov: bytes) -> Dict:
+    """Duration and largest track frame size from a complete moov atom (header included)"""
+    info = {"duration": None, "width": 0, "height": 0}
+    header_size = 16 if struct.unpack_from(">I", moov)[0] == 1 else 8
+    _walk_moov(memoryview(moov), header_size, len(moov), info)
+    return info
+
+def _walk_moov(data: memoryview, start: int, end: int, info: Dict) -> None:
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", data, offset)
+        header_size = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", data, offset + 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+        if size < header_size or offset + size > end:
+            raise InvalidVideoError("Corrupt MP4 header")
+        body = offset + header_size
+        if box_type in (b"trak", b"mdia", b"minf", b"stbl"):
+            _walk_moov(data, body, offset + size, info)
+        elif box_type == b"mvhd":
+            version = data[body]
+            if version == 1:
+                timescale, duration = struct.unpack_from(">IQ", data, body + 20)
+                unknown = 0xFFFFFFFFFFFFFFFF
+            else:
+                timescale, duration = struct.unpack_from(">II", data, body + 12)
+                unknown = 0xFFFFFFFF
+            if timescale and duration != unknown:
+                info["duration"] = duration / timescale
+        elif box_type == b"tkhd":
+            # Width and height close the box as 16.16 fixed point
+            width, height = (value >> 16 for value in struct.unpack_from(">II", data, offset + size - 8))
+            if width * height > info["width"] * info["height"]:
+                info["width"], info["height"] = width, height
+        offset += size
+
+def _read_vint(data: bytes, offset: int, keep_marker: bool) -> Optional[Tuple[int, int]]:
+    """Decode an EBML variable-length integer; returns (value, length) or None if truncated"""
+    if offset >= len(data):
+        return None
+    first = data[offset]
+    length = 1
+    while length <= 8 and not first & (0x80 >> (length - 1)):
+        length += 1
+    if length > 8:
+        raise InvalidVideoError("Corrupt WebM header")
+    if offset + length > len(data):
+        return None
+    value = first if keep_marker else first & (0xFF >> length)
+    for byte in data[offset + 1:offset + length]:
+        value = (value << 8) | byte
+    if not keep_marker and value == (1 << (7 * length)) - 1:
+        value = -1  # Unknown size, as used by live-recorded segments
+    return value, length
+
+def _iter_elements(data: bytes, start: int, end: int):
+    """Yield (id, body_start, body_end) for elements in data[start:end].
+
+    Stops at the first element that is not yet fully buffered; its body_end
+    is None so callers can tell they need more data.
+    """
+    offset = start
+    while offset < end:
+        element_id = _read_vint(data, offset, keep_marker=True)
+        if element_id is None:
+            yield None, offset, None
+            return
+        size = _read_vint(data, offset + element_id[1], keep_marker=False)
+        if size is None:
+            yield None, offset, None
+            return
+        body = offset + element_id[1] + size[1]
+        body_end = end if size[0] < 0 else body + size[0]
+        yield element_id[0], body, body_end if body_end <= len(data) else None
+        if body_end > end:
+            return
+        offset = body_end
+
+def _read_uint(data: bytes) -> int:
+    return int.from_bytes(data, "big")
+
+def parse_webm_header(data: bytes) -> Optional[Dict]:
+    """Doc type, duration and frame size from the start of a WebM/Matroska file.
+
+    Returns None while Info and Tracks have not both been seen, unless the
+    first Cluster (media data) has already started.
+    """
+    info = {"doctype": None, "duration": None, "width": 0, "height": 0}
+    saw_info = saw_tracks = False
+    for element_id, body, body_end in _iter_elements(data, 0, len(data)):
+        if element_id == EBML_HEADER and body_end is not None:
+            for child_id, child_body, child_end in _iter_elements(data, body, body_end):
+                if child_id == EBML_DOCTYPE and child_end is not None:
+                    info["doctype"] = bytes(data[child_body:child_end]).rstrip(b"\x00").decode("ascii", "replace")
+        elif element_id == SEGMENT:
+            for child_id, child_body, child_end in _iter_elements(data, body, len(data)):
+                if child_id == CLUSTER:
+                    return info
+                if child_end is None:
+                    return None
+                if child_id == INFO:
+                    _read_webm_info(data, child_body, child_end, info)
+                    saw_info = True
+                elif child_id == TRACKS:
+                    _read_webm_tracks(data, child_body, child_end, info)
+                    saw_tracks = True
+                if saw_info and saw_tracks:
+                    return info
+            return None
+        elif body_end is None:
+            return None
+    return None
+
+def _read_webm_info(data: bytes, start: int, end: int, info: Dict) -> None:
+    timecode_scale = 1000000  # Nanoseconds per timecode unit, Matroska default
+    duration = None
+    for element_id, body, body_end in _iter_elements(data, start, end):
+        if element_id == TIMECODE_SCALE:
+            timecode_scale = _read_uint(data[body:body_end])
+        elif element_id == DURATION:
+            fmt = ">f" if body_end - body == 4 else ">d"
+            duration = struct.unpack(fmt, data[body:body_end])[0]
+    if duration is not None:
+        info["duration"] = duration * timecode_scale / 1e9
+
+def _read_webm_tracks(data: bytes, start: int, end: int, info: Dict) -> None:
+    for element_id, body, body_end in _iter_elements(data, start, end):
+        if element_id != TRACK_ENTRY:
+            continue
+        for child_id, child_body, child_end in _iter_elements(data, body, body_end):
+            if child_id != TRACK_VIDEO:
+                continue
+            size = {PIXEL_WIDTH: 0, PIXEL_HEIGHT: 0}
+            for video_id, video_body, video_end in _iter_elements(data, child_body, child_end):
+                if video_id in size:
+                    size[video_id] = _read_uint(data[video_body:video_end])
+            if size[PIXEL_WIDTH] * size[PIXEL_HEIGHT] > info["width"] * info["height"]:
+                info["width"], info["height"] = size[PIXEL_WIDTH], size[PIXEL_HEIGHT]
+
+def check_header(info: Dict, max_duration: float, max_dimension: int) -> None:
+    """Raise InvalidVideoError for durations or frame sizes the pipeline would reject anyway"""
+    if info.get("duration") is not None and info["duration"] > max_duration:
+        raise InvalidVideoError(
+            f"Video duration ({info['duration']:.1f}s) exceeds maximum allowed duration ({max_duration}s)"
+        )
+    width, height = info.get("width", 0), info.get("height", 0)
+    if max(width, height) > max_dimension:
+        raise InvalidVideoError(
+            f"Video resolution {width}x{height} exceeds maximum of {max_dimension}px per side"
+        )
+
+class HeaderValidator:
+    """Incrementally inspect an upload as its chunks arrive.
+
+    Feed every chunk in order; an InvalidVideoError is raised as soon as
+    the header proves the upload unusable. MP4 media data is skipped over
+    rather than buffered, so moov is still checked when it trails mdat.
+    Once ``done`` is set the remaining chunks are ignored.
+    """
+
+    def __init__(self, allowed_formats: List[str], max_duration: float, max_dimension: int):
+        self.allowed_formats = allowed_formats
+        self.max_duration = max_duration
+        self.max_dimension = max_dimension
+        self.container: Optional[str] = None
+        self.info: Optional[Dict] = None
+        self.done = False
+        self._buffer = bytearray()
+        self._skip = 0
+
+    def feed(self, chunk: bytes) -> None:
+        if self.done:
+            return
+        if self._skip:
+            if self._skip >= len(chunk):
+                self._skip -= len(chunk)
+                return
+            chunk = chunk[self._skip:]
+            self._skip = 0
+        self._buffer.extend(chunk)
+
+        if self.container is None:
+            if len(self._buffer) < 12:
+                return
+            self.container = sniff_container(bytes(self._buffer[:12]))
+            if self.container is None or not self._allowed(self.container):
+                raise InvalidVideoError(
+                    f"Unsupported video container. Allowed formats: {', '.join(self.allowed_formats)}"
+                )
+
+        if self.container == "webm":
+            self._feed_webm()
+        else:
+            self._feed_mp4()
+
+    def finish(self) -> None:
+        """Call at end of stream: rejects uploads too short to even identify"""
+        if self.container is None:
+            raise InvalidVideoError("File is not a recognizable video")
+
+    def _allowed(self, container: str) -> bool:
+        # MP4 and MOV share the ISO base media format and the same decoders
+        family = {"mp4": {"mp4", "mov"}, "mov": {"mp4", "mov"}, "webm": {"webm"}}[container]
+        return bool(family & set(self.allowed_formats))
+
+    def _decide(self, info: Optional[Dict]) -> None:
+        self.info = info
+        self.done = True
+        self._buffer = bytearray()
+        if info is not None:
+            check_header(info, self.max_duration, self.max_dimension)
+
+    def _feed_webm(self) -> None:
+        info = parse_webm_header(bytes(self._buffer))
+        if info is not None:
+            if info["doctype"] not in ("webm", "matroska"):
+                raise InvalidVideoError("Unsupported video container")
+            self._decide(info)
+        elif len(self._buffer) > MAX_EBML_HEADER_SIZE:
+            self._decide(None)
+
+    def _feed_mp4(self) -> None:
+        buffer = self._buffer
+        while len(buffer) >= 8:
+            size, box_type = struct.unpack_from(">I4s", buffer)
+            header_size = 8
+            if size == 1:
+                if len(buffer) < 16:
+                    return
+                size = struct.unpack_from(">Q", buffer, 8)[0]
+                header_size = 16
+            if size == 0 and box_type != b"moov":
+                # Box runs to end of file and moov was not before it
+                self._decide(None)
+                return
+            if size and size < header_size:
+                raise InvalidVideoError("Corrupt MP4 header")
+            if box_type == b"moov":
+                if size == 0 or size > MAX_MOOV_SIZE:
+                    self._decide(None)
+                    return
+                if len(buffer) < size:
+                    return
+                self._decide(parse_moov(bytes(buffer[:size])))
+                return
+            # Skip over this box, including any part not received yet
+            if len(buffer) >= size:
+                del buffer[:size]
+            else:
+                self._skip = size - len(buffer)
+                buffer.clear()
+                return
+
+def probe_header_file(path: str) -> Optional[Dict]:
+    """Header info for a file already on disk, seeking past media data; None if undeterminable"""
+    with open(path, "rb") as f:
+        head = f.read(MAX_EBML_HEADER_SIZE)
+        container = sniff_container(head[:12])
+        if container is None:
+            raise InvalidVideoError("File is not a recognizable video")
+        if container == "webm":
+            return parse_webm_header(head)
+        file_size = os.path.getsize(path)
+        for box_type, offset, size, _ in mp4.iter_boxes(f, 0, file_size):
+            if box_type == b"moov":
+                if size > MAX_MOOV_SIZE:
+                    return None
+                f.seek(offset)
+                return parse_moov(f.read(size))
+    return None
@@ -0,0 +1,53 @@
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.like_counter import LikeCounter, like_counter
+from app.models.like import Like
+from app.models.video import Video
+
+class LikeService:
+    """Likes and unlikes; membership lives in the likes table, counts in the like counter"""
+
+    def __init__(self, db: AsyncSession, counter: LikeCounter = like_counter):
+        self.db = db
+        self.counter = counter
+
+    async def like(self, user_id: int, video_id: int) -> bool:
+        """Like a video; False if the user already had"""
+        self.db.add(Like(user_id=user_id, video_id=video_id))
+        try:
+            await self.db.flush()
+        except IntegrityError:
+            await self.db.rollback()
+            return False
+        await self._count(video_id, 1)
+        return True
+
+    async def unlike(self, user_id: int, video_id: int) -> bool:
+        """Take a like back; False if there was none"""
+        result = await self.db.execute(delete(Like).where(Like.user_id == user_id, Like.video_id == video_id))
+        if result.rowcount == 0:
+            await self.db.rollback()
+            return False
+        await self._count(video_id, -1)
+        return True
+
+    async def has_liked(self, user_id: int, video_id: int) -> bool:
+        return await self.db.get(Like, (user_id, video_id)) is not None
+
+    async def like_count(self, video_id: int) -> int:
+        """Flushed count plus what is still pending in Redis"""
+        flushed = await self.db.scalar(select(Video.like_count).where(Video.id == video_id))
+        return (flushed or 0) + self.counter.pending([video_id]).get(video_id, 0)
+
+    async def _count(self, video_id: int, delta: int) -> None:
+        # The membership change is flushed but not yet committed
+        if self.counter.enabled:
+            await self.db.commit()
+            if self.counter.increment(video_id, delta):
+                return
+        # No counter, or Redis is down: fall back to updating the (possibly hot) row
+        await self.db.execute(
+            update(Video).where(Video.id == video_id).values(like_count=Video.like_count + delta)
+        )
+        await self.db.commit()
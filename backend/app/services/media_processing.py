@@ -0,0 +1,605 @@
+"""Blocking OpenCV/PIL media operations.
+
+These run in the media process pool (see app.core.executors), so they are
+plain module-level functions taking and returning picklable values.
+"""
+import os
+import re
+import shutil
+import subprocess
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+import cv2
+from PIL import Image
+from app.core.executors import StageTimeoutError
+from app.schemas.video import MediaInfo
+
+class InvalidVideoError(ValueError):
+    """Raised for uploads that can never be processed, so retrying is pointless"""
+
+def get_video_duration(file_path: str) -> float:
+    """Get video duration using OpenCV"""
+    try:
+        cap = cv2.VideoCapture(file_path)
+        if not cap.isOpened():
+            raise ValueError("Could not open video file")
+
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        duration = frame_count / fps if fps > 0 else 0
+
+        cap.release()
+        return duration
+    except Exception as e:
+        raise ValueError(f"Error getting video duration: {str(e)}")
+
+def get_video_dimensions(file_path: str) -> Tuple[int, int]:
+    """Get video dimensions using OpenCV"""
+    try:
+        cap = cv2.VideoCapture(file_path)
+        if not cap.isOpened():
+            raise ValueError("Could not open video file")
+
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+        cap.release()
+        return width, height
+    except Exception as e:
+        raise ValueError(f"Error getting video dimensions: {str(e)}")
+
+def generate_thumbnail(video_path: str, output_path: str) -> str:
+    """Generate thumbnail from video using OpenCV"""
+    try:
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise ValueError("Could not open video file")
+
+        # Get frame at 1 second mark
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_number = int(fps) if fps > 0 else 30  # 1 second or frame 30
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+
+        ret, frame = cap.read()
+        if not ret:
+            # If we can't get frame at 1 second, get first frame
+            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = cap.read()
+
+        cap.release()
+
+        if ret:
+            save_thumbnail(frame, output_path)
+            return output_path
+        else:
+            raise ValueError("Could not extract frame from video")
+
+    except Exception as e:
+        raise ValueError(f"Error generating thumbnail: {str(e)}")
+
+def optimize_video(input_path: str, output_path: str, output_fourcc: str = "avc1") -> str:
+    """Optimize video for web delivery using OpenCV"""
+    try:
+        cap = cv2.VideoCapture(input_path)
+        if not cap.isOpened():
+            raise ValueError("Could not open video file")
+
+        # Get video properties
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+        # Calculate new dimensions (max 720p)
+        new_width, new_height = target_dimensions(width, height)
+
+        # Define codec and create VideoWriter
+        fourcc = cv2.VideoWriter_fourcc(*output_fourcc)
+        out = cv2.VideoWriter(output_path, fourcc, fps, (new_width, new_height))
+
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            # Resize frame
+            resized_frame = cv2.resize(frame, (new_width, new_height))
+            out.write(resized_frame)
+
+        cap.release()
+        out.release()
+
+        return output_path
+
+    except Exception as e:
+        raise ValueError(f"Error optimizing video: {str(e)}")
+
+def target_dimensions(width: int, height: int) -> Tuple[int, int]:
+    """Scale dimensions down to fit within 720p, preserving aspect ratio"""
+    max_width = 1280
+    max_height = 720
+
+    if width > max_width or height > max_height:
+        aspect_ratio = width / height
+        if aspect_ratio > max_width / max_height:
+            return max_width, int(max_width / aspect_ratio)
+        else:
+            return int(max_height * aspect_ratio), max_height
+    return width, height
+
+def save_thumbnail(frame, output_path: str) -> None:
+    """Resize a decoded BGR frame to thumbnail size (320x240 box) and save it as JPEG"""
+    # Convert BGR to RGB
+    frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+
+    height, width = frame_rgb.shape[:2]
+    aspect_ratio = width / height
+
+    if aspect_ratio > 1:
+        new_width = 320
+        new_height = int(320 / aspect_ratio)
+    else:
+        new_height = 240
+        new_width = int(240 * aspect_ratio)
+
+    resized_frame = cv2.resize(frame_rgb, (new_width, new_height))
+
+    # Convert to PIL Image and save
+    image = Image.fromarray(resized_frame)
+    image.save(output_path, "JPEG", quality=85)
+
+def _read_header(cap) -> Dict:
+    """Container-level properties of an opened capture; nothing is decoded"""
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+    return {
+        "fps": fps,
+        "frame_count": frame_count,
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "codec": "".join(chr((fourcc >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00 ") or None,
+        "duration": frame_count / fps if fps > 0 else 0,
+    }
+
+def probe_video(input_path: str) -> Dict:
+    """Read fps, frame count, dimensions, codec and duration from the container header"""
+    cap = cv2.VideoCapture(input_path)
+    if not cap.isOpened():
+        raise InvalidVideoError("Could not open video file")
+    try:
+        return _read_header(cap)
+    finally:
+        cap.release()
+
+def check_duration(duration: float, max_duration: float) -> None:
+    if duration > max_duration:
+        raise InvalidVideoError(
+            f"Video duration ({duration:.1f}s) exceeds maximum allowed duration ({max_duration}s)"
+        )
+
+def probe_and_transcode(
+    input_path: str,
+    output_path: str,
+    thumbnail_path: str,
+    max_duration: float,
+    output_fourcc: str = "avc1"
+) -> MediaInfo:
+    """Probe, optimize and thumbnail a video while decoding the source only once"""
+    cap = cv2.VideoCapture(input_path)
+    if not cap.isOpened():
+        raise InvalidVideoError("Could not open video file")
+
+    out = None
+    try:
+        header = _read_header(cap)
+        fps = header["fps"]
+        frame_count = header["frame_count"]
+        width = header["width"]
+        height = header["height"]
+        codec = header["codec"]
+
+        # Reject over-long videos from the container header, before decoding anything
+        duration = header["duration"]
+        check_duration(duration, max_duration)
+
+        new_width, new_height = target_dimensions(width, height)
+        needs_resize = (new_width, new_height) != (width, height)
+
+        out = cv2.VideoWriter(output_path, cv2.VideoWriter_fourcc(*output_fourcc), fps, (new_width, new_height))
+        if not out.isOpened():
+            raise ValueError(f"Could not open {output_fourcc} video writer")
+
+        # Thumbnail from the 1 second mark, falling back to the first frame
+        thumbnail_frame = int(fps) if fps > 0 else 30
+        first_frame = None
+        thumbnail_saved = False
+        decoded = 0
+
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            if decoded == 0:
+                first_frame = frame
+            if decoded == thumbnail_frame:
+                save_thumbnail(frame, thumbnail_path)
+                thumbnail_saved = True
+
+            out.write(cv2.resize(frame, (new_width, new_height)) if needs_resize else frame)
+            decoded += 1
+
+        if first_frame is None:
+            raise InvalidVideoError("Could not extract frame from video")
+        if not thumbnail_saved:
+            save_thumbnail(first_frame, thumbnail_path)
+
+        # Containers without a reliable frame count only reveal the length once decoded
+        if decoded != frame_count and fps > 0:
+            duration = decoded / fps
+            check_duration(duration, max_duration)
+
+        return MediaInfo(
+            duration=duration,
+            width=width,
+            height=height,
+            fps=fps,
+            codec=codec,
+            frame_count=decoded,
+            output_width=new_width,
+            output_height=new_height
+        )
+    finally:
+        cap.release()
+        if out is not None:
+            out.release()
+
+def _deadline(timeout: Optional[float]) -> Optional[float]:
+    return None if timeout is None else time.monotonic() + timeout
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    return None if deadline is None else max(deadline - time.monotonic(), 0)
+
+def run_ffmpeg(
+    command: List[str],
+    timeout: Optional[float] = None,
+    partial_outputs: Iterable[str] = ()
+) -> subprocess.CompletedProcess:
+    """Run an ffmpeg command, killing it if it overruns the timeout.
+
+    subprocess.run kills the child itself on expiry, so no orphaned ffmpeg
+    outlives the stage; what it had written so far in partial_outputs
+    (files or directories) is removed before StageTimeoutError is raised.
+    """
+    try:
+        return subprocess.run(command, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        for path in partial_outputs:
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            elif os.path.exists(path):
+                os.remove(path)
+        raise StageTimeoutError(f"ffmpeg timed out after {timeout:.0f}s")
+
+class Transcoder:
+    """Turns a source upload into the web-optimized MP4 plus a thumbnail.
+
+    Implementations are pickled into the media process pool, so they should
+    only hold plain configuration values.
+    """
+    name = "base"
+    # Seconds the transcoder bounds its own run to; None if only killing its process can stop it
+    timeout: Optional[float] = None
+
+    def transcode(self, input_path: str, output_path: str, thumbnail_path: str, max_duration: float) -> MediaInfo:
+        raise NotImplementedError
+
+class OpenCVTranscoder(Transcoder):
+    """Per-frame decode/resize/encode through OpenCV; video only, no audio"""
+    name = "opencv"
+
+    def __init__(self, output_fourcc: str = "avc1"):
+        self.output_fourcc = output_fourcc
+
+    def transcode(self, input_path: str, output_path: str, thumbnail_path: str, max_duration: float) -> MediaInfo:
+        return probe_and_transcode(input_path, output_path, thumbnail_path, max_duration, self.output_fourcc)
+
+class FFmpegTranscoder(Transcoder):
+    """Multi-threaded x264 + AAC via an ffmpeg subprocess; keeps the audio track"""
+    name = "ffmpeg"
+
+    def __init__(
+        self,
+        ffmpeg_binary: str = "ffmpeg",
+        preset: str = "veryfast",
+        crf: int = 23,
+        threads: int = 0,
+        audio_bitrate: str = "128k",
+        keyframe_interval: float = 2.0,
+        timeout: Optional[float] = None
+    ):
+        self.ffmpeg_binary = ffmpeg_binary
+        self.preset = preset
+        self.crf = crf
+        self.threads = threads  # 0 lets x264 pick based on core count
+        self.audio_bitrate = audio_bitrate
+        self.keyframe_interval = keyframe_interval
+        self.timeout = timeout
+
+    def transcode(self, input_path: str, output_path: str, thumbnail_path: str, max_duration: float) -> MediaInfo:
+        deadline = _deadline(self.timeout)
+        header = probe_video(input_path)
+        check_duration(header["duration"], max_duration)
+
+        new_width, new_height = target_dimensions(header["width"], header["height"])
+        # 4:2:0 chroma subsampling needs even dimensions
+        new_width, new_height = new_width - new_width % 2, new_height - new_height % 2
+        thumbnail_time = 1.0 if header["duration"] > 1.0 else 0.0
+
+        command = [
+            self.ffmpeg_binary, "-y", "-hide_banner", "-loglevel", "error", "-i", input_path,
+            # Web-optimized output, decoded once and fanned out to both outputs
+            "-map", "0:v:0", "-map", "0:a:0?",
+            "-vf", f"scale={new_width}:{new_height}",
+            "-c:v", "libx264", "-preset", self.preset, "-crf", str(self.crf),
+            "-threads", str(self.threads), "-pix_fmt", "yuv420p",
+            # Regular keyframes so a seek never has to decode far back
+            "-force_key_frames", f"expr:gte(t,n_forced*{self.keyframe_interval})",
+            "-c:a", "aac", "-b:a", self.audio_bitrate,
+            "-movflags", "+faststart", "-f", "mp4", output_path,
+            # Thumbnail fitted to the same 320x240 box as save_thumbnail
+            "-map", "0:v:0", "-ss", str(thumbnail_time), "-frames:v", "1",
+            "-vf", "scale='if(gt(iw,ih),320,-2)':'if(gt(iw,ih),-2,240)'",
+            "-q:v", "3", thumbnail_path,
+        ]
+        result = run_ffmpeg(command, _remaining(deadline), [output_path, thumbnail_path])
+        if result.returncode != 0:
+            raise ValueError(f"Error optimizing video: {result.stderr.strip()[-500:]}")
+        if not os.path.exists(thumbnail_path):
+            raise InvalidVideoError("Could not extract frame from video")
+
+        return MediaInfo(
+            duration=header["duration"],
+            width=header["width"],
+            height=header["height"],
+            fps=header["fps"],
+            codec=header["codec"],
+            frame_count=header["frame_count"],
+            output_width=new_width,
+            output_height=new_height
+        )
+
+def inspect_streams(input_path: str, ffmpeg_binary: str, timeout: Optional[float] = None) -> Dict:
+    """Container and stream details parsed from ffmpeg's input summary"""
+    result = run_ffmpeg([ffmpeg_binary, "-hide_banner", "-i", input_path], timeout)
+    info = {
+        "containers": [],
+        "duration": 0.0,
+        "bitrate_kbps": None,
+        "video_streams": [],
+        "audio_codecs": [],
+    }
+    input_match = re.search(r"^Input #0, ([^ ]+), from", result.stderr, re.MULTILINE)
+    if input_match:
+        info["containers"] = input_match.group(1).split(",")
+    duration_match = re.search(r"Duration: (\d+):(\d+):([\d.]+)", result.stderr)
+    if duration_match:
+        hours, minutes, seconds = duration_match.groups()
+        info["duration"] = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    bitrate_match = re.search(r"bitrate: (\d+) kb/s", result.stderr)
+    if bitrate_match:
+        info["bitrate_kbps"] = int(bitrate_match.group(1))
+    for line in result.stderr.splitlines():
+        video_match = re.search(r"Stream #\S+.*: Video: (\w+)(.*)", line)
+        if video_match:
+            size_match = re.search(r", (\d+)x(\d+)", video_match.group(2))
+            info["video_streams"].append({
+                "codec": video_match.group(1),
+                "yuv420p": re.search(r"\byuv420p\b", video_match.group(2)) is not None,
+                "width": int(size_match.group(1)) if size_match else 0,
+                "height": int(size_match.group(2)) if size_match else 0,
+            })
+            continue
+        audio_match = re.search(r"Stream #\S+.*: Audio: (\w+)", line)
+        if audio_match:
+            info["audio_codecs"].append(audio_match.group(1))
+    return info
+
+def is_web_ready(info: Dict, max_bitrate_kbps: int) -> bool:
+    """H.264 4:2:0 in MP4/MOV, within 720p, AAC or no audio, and a sane bitrate"""
+    if "mp4" not in info["containers"] and "mov" not in info["containers"]:
+        return False
+    if len(info["video_streams"]) != 1:
+        return False
+    video = info["video_streams"][0]
+    if video["codec"] != "h264" or not video["yuv420p"]:
+        return False
+    if target_dimensions(video["width"], video["height"]) != (video["width"], video["height"]):
+        return False
+    if any(codec != "aac" for codec in info["audio_codecs"]):
+        return False
+    return info["bitrate_kbps"] is not None and info["bitrate_kbps"] <= max_bitrate_kbps
+
+def remux_web_ready(
+    input_path: str,
+    output_path: str,
+    thumbnail_path: str,
+    max_duration: float,
+    max_bitrate_kbps: int,
+    ffmpeg_binary: str,
+    timeout: Optional[float] = None
+) -> Optional[MediaInfo]:
+    """Remux an upload that is already web-ready instead of re-encoding it.
+
+    Returns None when the input needs a full transcode. Both ffmpeg runs
+    together are bounded by `timeout`.
+    """
+    deadline = _deadline(timeout)
+    info = inspect_streams(input_path, ffmpeg_binary, _remaining(deadline))
+    if not is_web_ready(info, max_bitrate_kbps):
+        return None
+    check_duration(info["duration"], max_duration)
+    
+    header = probe_video(input_path)
+    thumbnail_time = 1.0 if info["duration"] > 1.0 else 0.0
+    command = [
+        ffmpeg_binary, "-y", "-hide_banner", "-loglevel", "error", "-i", input_path,
+        # Stream copy into a fresh MP4 with the moov atom up front
+        "-map", "0:v:0", "-map", "0:a:0?", "-c", "copy",
+        "-movflags", "+faststart", "-f", "mp4", output_path,
+        # Only the thumbnail frame gets decoded
+        "-map", "0:v:0", "-ss", str(thumbnail_time), "-frames:v", "1",
+        "-vf", "scale='if(gt(iw,ih),320,-2)':'if(gt(iw,ih),-2,240)'",
+        "-q:v", "3", thumbnail_path,
+    ]
+    result = run_ffmpeg(command, _remaining(deadline), [output_path, thumbnail_path])
+    if result.returncode != 0:
+        raise ValueError(f"Error remuxing video: {result.stderr.strip()[-500:]}")
+    
+    width, height = info["video_streams"][0]["width"], info["video_streams"][0]["height"]
+    return MediaInfo(
+        duration=info["duration"],
+        width=width,
+        height=height,
+        fps=header["fps"],
+        codec=header["codec"],
+        frame_count=header["frame_count"],
+        output_width=width,
+        output_height=height,
+        transcode_mode="remux"
+    )
+
+def get_transcoder(
+    name: str,
+    ffmpeg_binary: str = "ffmpeg",
+    preset: str = "veryfast",
+    crf: int = 23,
+    threads: int = 0,
+    output_fourcc: str = "avc1",
+    keyframe_interval: float = 2.0,
+    timeout: Optional[float] = None
+) -> Transcoder:
+    """Build the configured transcoder; "auto" prefers ffmpeg and falls back to OpenCV"""
+    if name == "ffmpeg" or (name == "auto" and ffmpeg_available(ffmpeg_binary)):
+        return FFmpegTranscoder(
+            ffmpeg_binary, preset=preset, crf=crf, threads=threads, keyframe_interval=keyframe_interval,
+            timeout=timeout
+        )
+    return OpenCVTranscoder(output_fourcc)
+
+def parse_ladder(spec: str) -> List[Tuple[int, int]]:
+    """Parse an HLS ladder spec like "240:400,480:1000" into (height, kbps) pairs, lowest first"""
+    ladder = []
+    for rung in spec.split(","):
+        rung = rung.strip()
+        if not rung:
+            continue
+        height, kbps = rung.split(":")
+        ladder.append((int(height), int(kbps)))
+    return sorted(ladder)
+
+def select_ladder(ladder: List[Tuple[int, int]], source_height: int) -> List[Tuple[int, int]]:
+    """Drop rungs that would upscale the source, keeping at least one rendition"""
+    if not ladder:
+        return []
+    rungs = [rung for rung in ladder if rung[0] <= source_height]
+    if not rungs:
+        rungs = [(source_height - source_height % 2, ladder[0][1])]
+    return rungs
+
+def ffmpeg_available(ffmpeg_binary: str) -> bool:
+    return shutil.which(ffmpeg_binary) is not None
+
+def has_audio_stream(input_path: str, ffmpeg_binary: str, timeout: Optional[float] = None) -> bool:
+    """Check for an audio track using ffmpeg's stream listing (no ffprobe needed)"""
+    result = run_ffmpeg([ffmpeg_binary, "-hide_banner", "-i", input_path], timeout)
+    return re.search(r"Stream #\S+.*: Audio:", result.stderr) is not None
+
+def parse_master_playlist(master_path: str) -> List[Dict]:
+    """Read rendition metadata back out of an HLS master playlist"""
+    renditions = []
+    with open(master_path) as f:
+        lines = [line.strip() for line in f if line.strip()]
+    for index, line in enumerate(lines):
+        if not line.startswith("#EXT-X-STREAM-INF:") or index + 1 >= len(lines):
+            continue
+        attributes = dict(re.findall(r'([A-Z-]+)=("[^"]*"|[^,]*)', line.split(":", 1)[1]))
+        width, height = attributes["RESOLUTION"].split("x")
+        playlist = lines[index + 1]
+        renditions.append({
+            "name": playlist.split("/")[0],
+            "width": int(width),
+            "height": int(height),
+            "bandwidth": int(attributes["BANDWIDTH"]),
+            "codecs": attributes.get("CODECS", "").strip('"') or None,
+            "playlist": playlist,
+        })
+    return renditions
+
+def package_hls(
+    input_path: str,
+    output_dir: str,
+    source_height: int,
+    ladder: List[Tuple[int, int]],
+    segment_duration: int,
+    ffmpeg_binary: str,
+    timeout: Optional[float] = None
+) -> List[Dict]:
+    """Encode an HLS ladder as fMP4 segments plus a master playlist in one ffmpeg run.
+
+    Writes output_dir/master.m3u8 and output_dir/<name>/{index.m3u8,init.mp4,seg_NNN.m4s},
+    the init segment named by -hls_fmp4_init_filename (with several renditions
+    ffmpeg suffixes it with the variant index, as init_0.mp4); returns the
+    rendition metadata parsed from the master playlist. Both
+    ffmpeg runs together are bounded by `timeout`; on expiry output_dir is
+    removed.
+    """
+    deadline = _deadline(timeout)
+    rungs = select_ladder(ladder, source_height)
+    if not rungs:
+        return []
+    audio = has_audio_stream(input_path, ffmpeg_binary, _remaining(deadline))
+    os.makedirs(output_dir, exist_ok=True)
+    
+    splits = "".join(f"[v{i}]" for i in range(len(rungs)))
+    filters = [f"[0:v]split={len(rungs)}{splits}"]
+    command = [ffmpeg_binary, "-y", "-hide_banner", "-loglevel", "error", "-i", input_path]
+    stream_map = []
+    for i, (height, kbps) in enumerate(rungs):
+        filters.append(f"[v{i}]scale=-2:{height}[v{i}out]")
+        command += [
+            "-map", f"[v{i}out]",
+            f"-c:v:{i}", "libx264",
+            f"-b:v:{i}", f"{kbps}k",
+            f"-maxrate:v:{i}", f"{int(kbps * 1.07)}k",
+            f"-bufsize:v:{i}", f"{kbps * 2}k",
+        ]
+        if audio:
+            command += ["-map", "0:a:0"]
+        stream_map.append(f"v:{i},a:{i},name:{height}p" if audio else f"v:{i},name:{height}p")
+    if audio:
+        command += ["-c:a", "aac", "-b:a", "96k", "-ac", "2"]
+    command += [
+        "-filter_complex", ";".join(filters),
+        "-preset", "veryfast",
+        "-pix_fmt", "yuv420p",
+        # Keyframes on segment boundaries so renditions can be switched between
+        "-force_key_frames", f"expr:gte(t,n_forced*{segment_duration})",
+        "-sc_threshold", "0",
+        "-f", "hls",
+        "-hls_time", str(segment_duration),
+        "-hls_playlist_type", "vod",
+        "-hls_segment_type", "fmp4",
+        "-hls_flags", "independent_segments",
+        "-hls_fmp4_init_filename", "init.mp4",
+        "-hls_segment_filename", os.path.join(output_dir, "%v", "seg_%03d.m4s"),
+        "-master_pl_name", "master.m3u8",
+        "-var_stream_map", " ".join(stream_map),
+        os.path.join(output_dir, "%v", "index.m3u8"),
+    ]
+    
+    result = run_ffmpeg(command, _remaining(deadline), [output_dir])
+    if result.returncode != 0:
+        raise ValueError(f"Error packaging HLS: {result.stderr.strip()[-500:]}")
+    
+    return parse_master_playlist(os.path.join(output_dir, "master.m3u8"))
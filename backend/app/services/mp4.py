@@ -0,0 +1,136 @@
+"""Minimal ISO BMFF (MP4/MOV) box handling.
+
+Enough to relocate the moov atom in front of the media data ("faststart")
+so browsers can begin playback from the first range request, and to check
+that layout in tests.
+"""
+import os
+import struct
+from typing import BinaryIO, Iterator, List, Tuple
+
+# Boxes whose payload is made of child boxes on the path down to the chunk offset tables
+CONTAINER_BOXES = {b"moov", b"trak", b"mdia", b"minf", b"stbl"}
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+def iter_boxes(f: BinaryIO, start: int, end: int) -> Iterator[Tuple[bytes, int, int, int]]:
+    """Yield (type, offset, size, header_size) for each box between start and end"""
+    offset = start
+    while offset + 8 <= end:
+        f.seek(offset)
+        size, box_type = struct.unpack(">I4s", f.read(8))
+        header_size = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header_size = 16
+        elif size == 0:
+            # Box extends to the end of the file
+            size = end - offset
+        if size < header_size:
+            raise ValueError(f"Invalid MP4 box size {size} at offset {offset}")
+        yield box_type, offset, size, header_size
+        offset += size
+
+def top_level_layout(path: str) -> List[bytes]:
+    """Top-level box types in file order, e.g. [b'ftyp', b'moov', b'mdat']"""
+    with open(path, "rb") as f:
+        return [box[0] for box in iter_boxes(f, 0, os.path.getsize(path))]
+
+def is_faststart(path: str) -> bool:
+    """True when moov precedes the first mdat (or the file has no mdat at all)"""
+    layout = top_level_layout(path)
+    if b"moov" not in layout:
+        return False
+    return b"mdat" not in layout or layout.index(b"moov") < layout.index(b"mdat")
+
+def validate_faststart(path: str) -> None:
+    """Raise ValueError describing the layout unless the file is faststart"""
+    if not is_faststart(path):
+        layout = ", ".join(box.decode("latin-1") for box in top_level_layout(path))
+        raise ValueError(f"moov atom is not ahead of mdat in {path} (layout: {layout})")
+
+def _shift_chunk_offsets(moov: bytearray, start: int, end: int, delta: int, shifted: Tuple[int, int]) -> None:
+    """Add delta to the stco/co64 entries inside moov[start:end] that fall in
+    the file range [shifted[0], shifted[1]), in place"""
+    offset = start
+    while offset + 8 <= end:
+        size, box_type = struct.unpack_from(">I4s", moov, offset)
+        header_size = 8
+        if size == 1:
+            size = struct.unpack_from(">Q", moov, offset + 8)[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+        if size < header_size:
+            raise ValueError(f"Invalid MP4 box size {size} inside moov")
+        body = offset + header_size
+        if box_type in CONTAINER_BOXES:
+            _shift_chunk_offsets(moov, body, offset + size, delta, shifted)
+        elif box_type in (b"stco", b"co64"):
+            # Full box: version/flags, entry count, then the offsets
+            entry_count = struct.unpack_from(">I", moov, body + 4)[0]
+            entry_format = ">I" if box_type == b"stco" else ">Q"
+            entry_size = struct.calcsize(entry_format)
+            for index in range(entry_count):
+                position = body + 8 + index * entry_size
+                value = struct.unpack_from(entry_format, moov, position)[0]
+                if not shifted[0] <= value < shifted[1]:
+                    continue
+                value += delta
+                if box_type == b"stco" and value > 0xFFFFFFFF:
+                    raise ValueError("Chunk offset overflows stco; file too large to relocate moov")
+                struct.pack_into(entry_format, moov, position, value)
+        offset += size
+
+def make_faststart(path: str) -> bool:
+    """Rewrite an MP4 in place so moov comes before mdat.
+
+    Returns False if the file was already faststart. Only chunk offset tables
+    reference absolute file positions, so moving moov means shifting those by
+    the size of moov for every byte it now precedes: the media between the
+    first mdat and moov. Data after moov keeps its position.
+    """
+    file_size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        boxes = list(iter_boxes(f, 0, file_size))
+        types = [box[0] for box in boxes]
+        if b"moov" not in types:
+            raise ValueError(f"No moov atom in {path}")
+        if b"mdat" not in types or types.index(b"moov") < types.index(b"mdat"):
+            return False
+        if b"moof" in types:
+            # Fragmented MP4 has no global offset tables to rewrite
+            return False
+
+        _, moov_offset, moov_size, moov_header_size = boxes[types.index(b"moov")]
+        first_mdat_offset = boxes[types.index(b"mdat")][1]
+        f.seek(moov_offset)
+        moov = bytearray(f.read(moov_size))
+        _shift_chunk_offsets(moov, moov_header_size, moov_size, moov_size, (first_mdat_offset, moov_offset))
+
+        temp_path = f"{path}.faststart"
+        try:
+            with open(temp_path, "wb") as out:
+                # Everything ahead of the media data (ftyp, free, ...) keeps its place
+                f.seek(0)
+                _copy_range(f, out, first_mdat_offset)
+                out.write(moov)
+                for box_type, offset, size, _ in boxes:
+                    if offset < first_mdat_offset or box_type == b"moov":
+                        continue
+                    f.seek(offset)
+                    _copy_range(f, out, size)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+    return True
+
+def _copy_range(src: BinaryIO, dst: BinaryIO, length: int) -> None:
+    remaining = length
+    while remaining > 0:
+        chunk = src.read(min(COPY_CHUNK_SIZE, remaining))
+        if not chunk:
+            break
+        dst.write(chunk)
+        remaining -= len(chunk)
@@ -1,24 +1,30 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
-from app.core.security import get_password_hash, verify_password
+from app.core.metrics import metrics
+from app.core.passwords import check_password, hash_password, password_hasher
+from app.core.response_cache import FEED_TAG, creator_tag, response_cache
+from app.core.security import principal_cache
 from typing import Optional
 
 class UserService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
 
-    def get_user_by_id(self, user_id: int) -> Optional[User]:
-        return self.db.query(User).filter(User.id == user_id).first()
+    async def get_user_by_id(self, user_id: int) -> Optional[User]:
+        return await self.db.get(User, user_id)
 
-    def get_user_by_email(self, email: str) -> Optional[User]:
-        return self.db.query(User).filter(User.email == email).first()
+    async def get_user_by_email(self, email: str) -> Optional[User]:
+        result = await self.db.execute(select(User).where(User.email == email))
+        return result.scalars().first()
 
-    def get_user_by_username(self, username: str) -> Optional[User]:
-        return self.db.query(User).filter(User.username == username).first()
+    async def get_user_by_username(self, username: str) -> Optional[User]:
+        result = await self.db.execute(select(User).where(User.username == username))
+        return result.scalars().first()
 
-    def create_user(self, user_data: UserCreate) -> User:
-        hashed_password = get_password_hash(user_data.password)
+    async def create_user(self, user_data: UserCreate) -> User:
+        hashed_password = await hash_password(user_data.password)
         db_user = User(
             email=user_data.email,
             username=user_data.username,
@@ -26,39 +32,49 @@ class UserService:
             hashed_password=hashed_password
         )
         self.db.add(db_user)
-        self.db.commit()
-        self.db.refresh(db_user)
+        await self.db.commit()
+        await self.db.refresh(db_user)
         return db_user
 
-    def update_user(self, user_id: int, user_data: UserUpdate) -> Optional[User]:
-        db_user = self.get_user_by_id(user_id)
+    async def update_user(self, user_id: int, user_data: UserUpdate) -> Optional[User]:
+        db_user = await self.get_user_by_id(user_id)
         if not db_user:
             return None
         
         update_data = user_data.dict(exclude_unset=True)
         if "password" in update_data:
-            update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+            update_data["hashed_password"] = await hash_password(update_data.pop("password"))
         
         for field, value in update_data.items():
             setattr(db_user, field, value)
         
-        self.db.commit()
-        self.db.refresh(db_user)
+        await self.db.commit()
+        await self.db.refresh(db_user)
+        principal_cache.invalidate(user_id)
+        if "username" in update_data:
+            # Cached video pages show the creator's username
+            await response_cache.invalidate_async(FEED_TAG, creator_tag(user_id))
         return db_user
 
-    def authenticate_user(self, email: str, password: str) -> Optional[User]:
-        user = self.get_user_by_email(email)
+    async def authenticate_user(self, email: str, password: str) -> Optional[User]:
+        user = await self.get_user_by_email(email)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await check_password(password, user.hashed_password):
             return None
+        if password_hasher.needs_rehash(user.hashed_password):
+            # Only now is the plain password at hand to upgrade a legacy or cheaper hash
+            user.hashed_password = await hash_password(password)
+            await self.db.commit()
+            metrics.increment("password.rehashed", shared=True)
         return user
 
-    def delete_user(self, user_id: int) -> bool:
-        db_user = self.get_user_by_id(user_id)
+    async def delete_user(self, user_id: int) -> bool:
+        db_user = await self.get_user_by_id(user_id)
         if not db_user:
             return False
         
-        self.db.delete(db_user)
-        self.db.commit()
+        await self.db.delete(db_user)
+        await self.db.commit()
+        principal_cache.invalidate(user_id)
         return True
@@ -0,0 +1,95 @@
+from typing import Optional
+import anyio
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.core.cache import PydanticSerializer, TwoTierCache
+from app.core.database import AsyncSessionLocal
+from app.core.redis_client import redis_bytes_client
+from app.models.video import Video
+from app.schemas.video import VideoProcessingStatus
+from config import (
+    VIDEO_LOCATION_CACHE_BACKEND,
+    VIDEO_LOCATION_LOCAL_SIZE,
+    VIDEO_LOCATION_LOCAL_TTL,
+    VIDEO_LOCATION_NEGATIVE_TTL,
+    VIDEO_LOCATION_TTL,
+)
+
+class VideoLocation(BaseModel):
+    """Where a publicly streamable video's media lives"""
+    video_id: int
+    filename: str
+    video_url: str
+    thumbnail_url: Optional[str] = None
+    hls_prefix: Optional[str] = None
+
+class VideoLocator:
+    """Resolve video ids to streamable locations without a query per request.
+
+    Lookups go through a two-tier cache (in process, then Redis) and only
+    then the database. Ids that are missing, private, deleted or still
+    processing are cached as well, with a shorter TTL.
+
+    A miss opens its own session from `session_factory` rather than using
+    the caller's: the cache shares one load between concurrent requests,
+    which must not run on a session another request owns.
+    """
+
+    def __init__(
+        self,
+        client=None,
+        name: str = "video_location",
+        ttl: int = VIDEO_LOCATION_TTL,
+        negative_ttl: int = VIDEO_LOCATION_NEGATIVE_TTL,
+        local_ttl: float = VIDEO_LOCATION_LOCAL_TTL,
+        local_size: int = VIDEO_LOCATION_LOCAL_SIZE,
+        session_factory: async_sessionmaker = AsyncSessionLocal
+    ):
+        self.session_factory = session_factory
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.cache = TwoTierCache(
+            name,
+            client=client,
+            ttl=ttl,
+            negative_ttl=negative_ttl,
+            l1_ttl=local_ttl,
+            l1_size=local_size,
+            serializer=PydanticSerializer(VideoLocation)
+        )
+
+    async def resolve(self, video_id: int) -> Optional[VideoLocation]:
+        """The location of a public, completed video, or None if it cannot be streamed"""
+        return await self.cache.get_or_load(video_id, lambda: self._query(video_id))
+
+    def invalidate(self, video_id: int) -> None:
+        """Forget a video after its visibility, status or media changed"""
+        self.cache.invalidate(video_id)
+
+    async def invalidate_async(self, video_id: int) -> None:
+        """invalidate, with the Redis round trip on a worker thread"""
+        await anyio.to_thread.run_sync(self.invalidate, video_id)
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+    async def _query(self, video_id: int) -> Optional[VideoLocation]:
+        async with self.session_factory() as db:
+            video = await db.scalar(select(Video).where(
+                Video.id == video_id,
+                Video.is_public == True,
+                Video.is_deleted == False,
+                Video.processing_status == VideoProcessingStatus.COMPLETED
+            ))
+        if not video:
+            return None
+        return VideoLocation(
+            video_id=video.id,
+            filename=video.filename,
+            video_url=video.video_url,
+            thumbnail_url=video.thumbnail_url,
+            hls_prefix=video.hls_prefix
+        )
+
+video_locator = VideoLocator(client=redis_bytes_client if VIDEO_LOCATION_CACHE_BACKEND == "redis" else None)
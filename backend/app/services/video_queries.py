@@ -0,0 +1,48 @@
+from typing import Optional
+from sqlalchemy import Select, literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from app.models.video import Video
+from app.schemas.video import VideoProcessingStatus
+
+class VideoQueries:
+    """Read-side queries shared by the video endpoints.
+
+    Every statement loads each video's creator in the same SELECT (a joined
+    many-to-one load), so serializing a page never lazy-loads users row by
+    row, which an async session could not do anyway.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def _videos(self) -> Select:
+        return select(Video).options(joinedload(Video.creator))
+
+    def public_videos(self, creator_id: Optional[int] = None) -> Select:
+        """Videos anyone may watch, optionally from one creator"""
+        # The status is inlined rather than bound so Postgres can match the
+        # partial ix_videos_public_feed index from a cached generic plan too
+        statement = self._videos().where(
+            Video.is_public == True,
+            Video.is_deleted == False,
+            Video.processing_status == literal(VideoProcessingStatus.COMPLETED.value, literal_execute=True)
+        )
+        if creator_id:
+            statement = statement.where(Video.creator_id == creator_id)
+        return statement
+
+    def user_videos(self, creator_id: int) -> Select:
+        """A creator's own videos, including private and unfinished ones"""
+        return self._videos().where(
+            Video.creator_id == creator_id,
+            Video.is_deleted == False
+        )
+
+    async def get_public_video(self, video_id: int) -> Optional[Video]:
+        result = await self.db.execute(self.public_videos().where(Video.id == video_id))
+        return result.scalars().first()
+
+    async def get_user_video(self, video_id: int, creator_id: int) -> Optional[Video]:
+        result = await self.db.execute(self.user_videos(creator_id).where(Video.id == video_id))
+        return result.scalars().first()
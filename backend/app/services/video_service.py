@@ -1,176 +1,187 @@
+import hashlib
 import os
+import shutil
+import time
 import uuid
-import asyncio
-from typing import Optional, Tuple
+from concurrent.futures import Executor
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import UploadFile, HTTPException
-import cv2
-from PIL import Image
 import aiofiles
+import anyio
 from app.models.video import Video
-from app.schemas.video import VideoCreate, VideoProcessingStatus
+from app.models.video_asset import VideoAsset
+from app.models.video_rendition import VideoRendition
+from app.schemas.video import VideoCreate, VideoProcessingStatus, MediaInfo
 from app.services.cloud_storage import CloudStorageService
-from config import DEBUG
+from app.services import header_probe, media_processing, mp4
+from app.services.media_processing import InvalidVideoError, Transcoder
+from app.services.video_locator import video_locator
+from app.core.executors import run_blocking
+from app.core.metrics import metrics
+from app.core.response_cache import response_cache
+from app.core.video_cache import video_cache
+from config import (
+    DEBUG,
+    FFMPEG_BINARY,
+    FFMPEG_CRF,
+    FFMPEG_PRESET,
+    FFMPEG_THREADS,
+    HLS_LADDER,
+    HLS_SEGMENT_DURATION,
+    UPLOAD_CHUNK_SIZE,
+    UPLOAD_SESSION_TTL,
+    VIDEO_FASTSTART_TIMEOUT,
+    VIDEO_KEYFRAME_INTERVAL,
+    VIDEO_MAX_DIMENSION,
+    VIDEO_PROBE_TIMEOUT,
+    VIDEO_THUMBNAIL_TIMEOUT,
+    VIDEO_TRANSCODE_TIMEOUT,
+    VIDEO_TRANSCODER,
+    VIDEO_FAST_PATH,
+    VIDEO_FAST_PATH_MAX_BITRATE_KBPS,
+)
 
 class VideoProcessingService:
-    def __init__(self):
+    def __init__(self, executor: Optional[Executor] = None, transcoder: Optional[Transcoder] = None):
         self.max_duration = 10.0  # 10 seconds (temporarily increased for testing)
         self.allowed_formats = ["mp4", "webm", "mov"]
         self.max_file_size = 100 * 1024 * 1024  # 100MB
+        self.max_dimension = VIDEO_MAX_DIMENSION  # Longest side, checked from the container header
+        self.incoming_dir = "uploads/incoming"  # Staged uploads awaiting processing
+        self.chunk_size = UPLOAD_CHUNK_SIZE
+        self.transcoder = transcoder or media_processing.get_transcoder(
+            VIDEO_TRANSCODER,
+            ffmpeg_binary=FFMPEG_BINARY,
+            preset=FFMPEG_PRESET,
+            crf=FFMPEG_CRF,
+            threads=FFMPEG_THREADS,
+            keyframe_interval=VIDEO_KEYFRAME_INTERVAL,
+            timeout=VIDEO_TRANSCODE_TIMEOUT
+        )
+        self.hls_ladder = media_processing.parse_ladder(HLS_LADDER)
+        self.fast_path = VIDEO_FAST_PATH
+        
+        # CPU-bound stages run in media processes (see _run_stage) unless an executor is given
+        self.executor = executor
+        self.stage_timeouts = {
+            "probe": VIDEO_PROBE_TIMEOUT,
+            "thumbnail": VIDEO_THUMBNAIL_TIMEOUT,
+            "transcode": VIDEO_TRANSCODE_TIMEOUT,
+            "faststart": VIDEO_FASTSTART_TIMEOUT,
+        }
         
         # Initialize cloud storage service
         self.storage_service = CloudStorageService()
     
     async def validate_video_file(self, file: UploadFile) -> Tuple[bool, str]:
         """Validate video file format, size, and duration"""
+        return self.validate_upload(file.filename, file.size)
+    
+    def validate_upload(self, filename: Optional[str], size: Optional[int]) -> Tuple[bool, str]:
+        """Check an upload's format and declared size before accepting any data"""
         # Check file extension
-        file_extension = file.filename.split('.')[-1].lower() if file.filename else ""
+        file_extension = filename.split('.')[-1].lower() if filename else ""
         if file_extension not in self.allowed_formats:
             return False, f"Unsupported format. Allowed formats: {', '.join(self.allowed_formats)}"
         
         # Check file size
-        if file.size and file.size > self.max_file_size:
+        if size and size > self.max_file_size:
             return False, f"File too large. Maximum size: {self.max_file_size // (1024*1024)}MB"
         
         return True, ""
     
+    def header_validator(self) -> header_probe.HeaderValidator:
+        """Streaming check of the container header against this service's limits"""
+        return header_probe.HeaderValidator(self.allowed_formats, self.max_duration, self.max_dimension)
+    
     async def get_video_duration(self, file_path: str) -> float:
         """Get video duration using OpenCV"""
-        try:
-            cap = cv2.VideoCapture(file_path)
-            if not cap.isOpened():
-                raise ValueError("Could not open video file")
-            
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
-            duration = frame_count / fps if fps > 0 else 0
-            
-            cap.release()
-            return duration
-        except Exception as e:
-            raise ValueError(f"Error getting video duration: {str(e)}")
+        return await self._run_stage("probe", media_processing.get_video_duration, file_path)
     
     async def get_video_dimensions(self, file_path: str) -> Tuple[int, int]:
         """Get video dimensions using OpenCV"""
-        try:
-            cap = cv2.VideoCapture(file_path)
-            if not cap.isOpened():
-                raise ValueError("Could not open video file")
-            
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            
-            cap.release()
-            return width, height
-        except Exception as e:
-            raise ValueError(f"Error getting video dimensions: {str(e)}")
+        return await self._run_stage("probe", media_processing.get_video_dimensions, file_path)
     
     async def generate_thumbnail(self, video_path: str, output_path: str) -> str:
         """Generate thumbnail from video using OpenCV"""
-        try:
-            cap = cv2.VideoCapture(video_path)
-            if not cap.isOpened():
-                raise ValueError("Could not open video file")
-            
-            # Get frame at 1 second mark
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            frame_number = int(fps) if fps > 0 else 30  # 1 second or frame 30
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
-            
-            ret, frame = cap.read()
-            if not ret:
-                # If we can't get frame at 1 second, get first frame
-                cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                ret, frame = cap.read()
-            
-            cap.release()
-            
-            if ret:
-                # Convert BGR to RGB
-                frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                
-                # Resize to standard thumbnail size (320x240)
-                height, width = frame_rgb.shape[:2]
-                aspect_ratio = width / height
-                
-                if aspect_ratio > 1:
-                    new_width = 320
-                    new_height = int(320 / aspect_ratio)
-                else:
-                    new_height = 240
-                    new_width = int(240 * aspect_ratio)
-                
-                resized_frame = cv2.resize(frame_rgb, (new_width, new_height))
-                
-                # Convert to PIL Image and save
-                image = Image.fromarray(resized_frame)
-                image.save(output_path, "JPEG", quality=85)
-                
-                return output_path
-            else:
-                raise ValueError("Could not extract frame from video")
-                
-        except Exception as e:
-            raise ValueError(f"Error generating thumbnail: {str(e)}")
+        return await self._run_stage("thumbnail", media_processing.generate_thumbnail, video_path, output_path)
     
     async def optimize_video(self, input_path: str, output_path: str) -> str:
         """Optimize video for web delivery using OpenCV"""
-        try:
-            cap = cv2.VideoCapture(input_path)
-            if not cap.isOpened():
-                raise ValueError("Could not open video file")
-            
-            # Get video properties
-            fps = cap.get(cv2.CAP_PROP_FPS)
-            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            
-            # Calculate new dimensions (max 720p)
-            max_width = 1280
-            max_height = 720
-            
-            if width > max_width or height > max_height:
-                aspect_ratio = width / height
-                if aspect_ratio > max_width / max_height:
-                    new_width = max_width
-                    new_height = int(max_width / aspect_ratio)
-                else:
-                    new_height = max_height
-                    new_width = int(max_height * aspect_ratio)
-            else:
-                new_width = width
-                new_height = height
-            
-            # Define codec and create VideoWriter
-            # Use H.264 codec for better browser compatibility
-            fourcc = cv2.VideoWriter_fourcc(*'avc1')
-            out = cv2.VideoWriter(output_path, fourcc, fps, (new_width, new_height))
-            
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                # Resize frame
-                resized_frame = cv2.resize(frame, (new_width, new_height))
-                out.write(resized_frame)
-            
-            cap.release()
-            out.release()
-            
-            return output_path
-            
-        except Exception as e:
-            raise ValueError(f"Error optimizing video: {str(e)}")
+        return await self._run_stage("transcode", media_processing.optimize_video, input_path, output_path)
     
-    async def process_video_upload(
+    async def probe_and_transcode(self, input_path: str, output_path: str, thumbnail_path: str) -> MediaInfo:
+        """Probe, optimize and thumbnail a video, decoding the source at most once.
+        
+        Uploads that are already web-ready are only remuxed. Whichever path
+        produced it, the output has its moov atom ahead of the media data.
+        """
+        media_info = None
+        if self.fast_path and media_processing.ffmpeg_available(FFMPEG_BINARY):
+            media_info = await self._run_stage(
+                "transcode",
+                media_processing.remux_web_ready,
+                input_path,
+                output_path,
+                thumbnail_path,
+                self.max_duration,
+                VIDEO_FAST_PATH_MAX_BITRATE_KBPS,
+                FFMPEG_BINARY,
+                self.stage_timeouts["transcode"],
+                isolated=False
+            )
+        if media_info is None:
+            # A transcoder that times itself (ffmpeg) shares the pool; OpenCV gets a process it can be killed in
+            media_info = await self._run_stage(
+                "transcode", self.transcoder.transcode, input_path, output_path, thumbnail_path, self.max_duration,
+                isolated=self.transcoder.timeout is None
+            )
+        
+        # OpenCV writes moov last; a no-op for ffmpeg outputs already written with +faststart.
+        # A linear pass over one file, so it cannot hang and shares the pool.
+        await self._run_stage("faststart", mp4.make_faststart, output_path, isolated=False)
+        return media_info
+    
+    async def package_hls(self, input_path: str, output_dir: str, source_height: int) -> List[Dict]:
+        """Encode the HLS ladder (fMP4 segments + master playlist); skipped when ffmpeg is unavailable"""
+        if not self.hls_ladder or not media_processing.ffmpeg_available(FFMPEG_BINARY):
+            return []
+        return await self._run_stage(
+            "transcode",
+            media_processing.package_hls,
+            input_path,
+            output_dir,
+            source_height,
+            self.hls_ladder,
+            HLS_SEGMENT_DURATION,
+            FFMPEG_BINARY,
+            self.stage_timeouts["transcode"],
+            isolated=False
+        )
+    
+    async def _run_stage(self, stage: str, func, *args, isolated: bool = True):
+        """Run a blocking media stage off the event loop.
+
+        Stages run in a single-use process that a timeout can kill, unless
+        isolated=False says they bound their own run time and can share the
+        media pool (see run_blocking).
+        """
+        return await run_blocking(
+            func, *args, timeout=self.stage_timeouts[stage], stage=stage, executor=self.executor, isolated=isolated
+        )
+    
+    async def create_pending_video(
         self, 
         file: UploadFile, 
         video_data: VideoCreate, 
         creator_id: int,
-        db: Session
+        db: AsyncSession
     ) -> Video:
-        """Process video upload with validation, optimization, and thumbnail generation"""
+        """Validate and stage an upload, recording it as a pending video for the workers"""
         
         # Validate file
         is_valid, error_message = await self.validate_video_file(file)
@@ -180,130 +191,501 @@ class VideoProcessingService:
         # Generate unique filename
         file_extension = file.filename.split('.')[-1].lower()
         unique_filename = f"{uuid.uuid4()}.{file_extension}"
-        temp_path = f"temp_{unique_filename}"
-        thumbnail_filename = None  # Initialize for cleanup
+        source_path = os.path.join(self.incoming_dir, unique_filename)
         
         try:
-            # Read file content
-            content = await file.read()
+            # Stage the upload for background processing, hashing it on the way in
+            file_size, content_hash = await self.spool_upload(file, source_path)
             
-            # Save temporarily for processing
-            temp_file_path = os.path.join("uploads", temp_path)
-            os.makedirs("uploads", exist_ok=True)
-            async with aiofiles.open(temp_file_path, 'wb') as f:
-                await f.write(content)
+            return await self._register_upload(
+                source_path, file.filename, file_size, content_hash, video_data, creator_id, db
+            )
             
-            # Get video properties
-            duration = await self.get_video_duration(temp_file_path)
-            if duration > self.max_duration:
-                os.remove(temp_file_path)
-                raise HTTPException(
-                    status_code=400, 
-                    detail=f"Video duration ({duration:.1f}s) exceeds maximum allowed duration ({self.max_duration}s)"
-                )
+        except Exception as e:
+            if os.path.exists(source_path):
+                os.remove(source_path)
             
-            width, height = await self.get_video_dimensions(temp_file_path)
+            if isinstance(e, HTTPException):
+                raise
+            raise HTTPException(status_code=500, detail=f"Video upload failed: {str(e)}")
+    
+    async def _register_upload(
+        self,
+        source_path: str,
+        original_filename: str,
+        file_size: int,
+        content_hash: str,
+        video_data: VideoCreate,
+        creator_id: int,
+        db: AsyncSession
+    ) -> Video:
+        """register_upload on a request's session, finishing a deduplicated upload on a worker thread"""
+        video = await db.run_sync(lambda session: self.register_upload(
+            source_path, original_filename, file_size, content_hash, video_data, creator_id, session
+        ))
+        if video.processing_status == VideoProcessingStatus.COMPLETED:
+            await anyio.to_thread.run_sync(self.finish_attach, video, source_path)
+        return video
+    
+    def register_upload(
+        self,
+        source_path: str,
+        original_filename: str,
+        file_size: int,
+        content_hash: str,
+        video_data: VideoCreate,
+        creator_id: int,
+        db: Session
+    ) -> Video:
+        """Record a fully staged upload as a pending video, or complete it from an identical asset.
+        
+        Synchronous, sharing the asset helpers with the workers; request
+        handlers call it on their AsyncSession through run_sync. A video
+        completed from an asset still needs finish_attach.
+        """
+        # Create video record; media properties are filled in by the worker
+        video = Video(
+            title=video_data.title,
+            description=video_data.description,
+            filename=os.path.basename(source_path),
+            original_filename=original_filename,
+            file_size=file_size,
+            duration=0.0,
+            width=0,
+            height=0,
+            format=source_path.split('.')[-1].lower(),
+            video_url="",
+            processing_status=VideoProcessingStatus.PENDING,
+            source_path=source_path,
+            content_hash=content_hash,
+            creator_id=creator_id
+        )
+        
+        db.add(video)
+        db.commit()
+        db.refresh(video)
+        
+        # Identical content was processed before; reuse it instead of queueing a transcode
+        asset = self.find_asset(content_hash, db)
+        if asset is not None:
+            self.attach_asset(video, asset, db)
+        
+        return video
+    
+    def resumable_part_path(self, upload_id: str) -> str:
+        """Where the chunks of a resumable upload are assembled"""
+        return os.path.join(self.incoming_dir, f"{upload_id}.part")
+    
+    async def start_resumable_upload(self, upload_id: str, filename: str, size: int) -> None:
+        """Validate a resumable upload and preallocate its file so chunks can land at any offset"""
+        is_valid, error_message = self.validate_upload(filename, size)
+        if not is_valid:
+            raise HTTPException(status_code=400, detail=error_message)
+        
+        self.purge_stale_parts()
+        os.makedirs(self.incoming_dir, exist_ok=True)
+        async with aiofiles.open(self.resumable_part_path(upload_id), 'wb') as f:
+            await f.truncate(size)
+    
+    async def write_chunk(self, upload_id: str, start: int, end: int, chunks: AsyncIterator[bytes]) -> None:
+        """Stream one chunk of a resumable upload into place at bytes start..end (inclusive).
+        
+        Chunks for different ranges may be written concurrently; each request
+        writes through its own file handle and only touches its own range.
+        Raises InvalidVideoError if the first chunk shows an unusable upload.
+        """
+        part_path = self.resumable_part_path(upload_id)
+        if not os.path.exists(part_path):
+            raise HTTPException(status_code=404, detail="Upload not found")
+        
+        expected = end - start + 1
+        written = 0
+        # The chunk at offset 0 carries the container header; reject doomed uploads on the first request
+        validator = self.header_validator() if start == 0 else None
+        async with aiofiles.open(part_path, 'r+b') as f:
+            await f.seek(start)
+            async for chunk in chunks:
+                written += len(chunk)
+                if written > expected:
+                    raise HTTPException(status_code=400, detail="Chunk is longer than its Content-Range")
+                if validator is not None:
+                    validator.feed(chunk)
+                await f.write(chunk)
+        if written != expected:
+            raise HTTPException(status_code=400, detail="Chunk is shorter than its Content-Range")
+    
+    async def finish_resumable_upload(
+        self,
+        upload_id: str,
+        original_filename: str,
+        video_data: VideoCreate,
+        creator_id: int,
+        db: AsyncSession
+    ) -> Video:
+        """Check and hash the assembled upload, then record it as a pending video.
+        
+        Raises InvalidVideoError if the container header rules the upload out.
+        """
+        part_path = self.resumable_part_path(upload_id)
+        if not os.path.exists(part_path):
+            raise HTTPException(status_code=404, detail="Upload not found")
+        
+        # Chunks arrived in any order, so the header could not be checked as a stream
+        info = await anyio.to_thread.run_sync(header_probe.probe_header_file, part_path)
+        if info is not None:
+            header_probe.check_header(info, self.max_duration, self.max_dimension)
+        
+        file_extension = original_filename.split('.')[-1].lower()
+        source_path = os.path.join(self.incoming_dir, f"{uuid.uuid4()}.{file_extension}")
+        file_size, content_hash = await self.hash_file(part_path)
+        os.replace(part_path, source_path)
+        
+        try:
+            return await self._register_upload(
+                source_path, original_filename, file_size, content_hash, video_data, creator_id, db
+            )
+        except Exception:
+            self.discard_source(source_path)
+            raise
+    
+    def abort_resumable_upload(self, upload_id: str) -> None:
+        """Drop the partially assembled file of a cancelled upload"""
+        self.discard_source(self.resumable_part_path(upload_id))
+    
+    def purge_stale_parts(self) -> None:
+        """Remove assembly files of resumable uploads whose sessions have expired"""
+        if not os.path.isdir(self.incoming_dir):
+            return
+        cutoff = time.time() - UPLOAD_SESSION_TTL
+        for name in os.listdir(self.incoming_dir):
+            path = os.path.join(self.incoming_dir, name)
+            try:
+                if name.endswith(".part") and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+            except OSError:
+                # Finished or purged by another request in the meantime
+                pass
+    
+    async def hash_file(self, path: str) -> Tuple[int, str]:
+        """Size and SHA-256 hex digest of a file, read in chunks"""
+        total = 0
+        digest = hashlib.sha256()
+        async with aiofiles.open(path, 'rb') as f:
+            while True:
+                chunk = await f.read(self.chunk_size)
+                if not chunk:
+                    break
+                total += len(chunk)
+                digest.update(chunk)
+        return total, digest.hexdigest()
+    
+    async def spool_upload(self, file: UploadFile, destination: str) -> Tuple[int, str]:
+        """Copy an upload to disk in fixed-size chunks, aborting once it exceeds max_file_size
+        or its container header shows it can never be processed.
+        
+        Returns the size and SHA-256 hex digest of the upload.
+        """
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        total = 0
+        digest = hashlib.sha256()
+        validator = self.header_validator()
+        async with aiofiles.open(destination, 'wb') as f:
+            while True:
+                chunk = await file.read(self.chunk_size)
+                if not chunk:
+                    break
+                total += len(chunk)
+                if total > self.max_file_size:
+                    raise HTTPException(
+                        status_code=413,
+                        detail=f"File too large. Maximum size: {self.max_file_size // (1024*1024)}MB"
+                    )
+                try:
+                    validator.feed(chunk)
+                except InvalidVideoError as e:
+                    raise HTTPException(status_code=400, detail=str(e))
+                digest.update(chunk)
+                await f.write(chunk)
+        try:
+            validator.finish()
+        except InvalidVideoError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return total, digest.hexdigest()
+    
+    def find_asset(self, content_hash: Optional[str], db: Session) -> Optional[VideoAsset]:
+        """Look up already processed media by upload content hash"""
+        if not content_hash:
+            return None
+        return db.query(VideoAsset).filter(VideoAsset.content_hash == content_hash).first()
+    
+    def attach_asset(self, video: Video, asset: VideoAsset, db: Session) -> bool:
+        """Point a video at an existing asset instead of processing it again.
+        
+        Returns False if the asset was released concurrently and the video
+        still needs processing. A video deleted meanwhile needs nothing more:
+        it takes no reference and True is returned. Only the database is
+        touched, so request handlers can run it through run_sync; callers
+        follow a True result with finish_attach.
+        """
+        # Only take a reference while the asset is still live; release_asset deletes at zero
+        referenced = db.query(VideoAsset).filter(
+            VideoAsset.id == asset.id,
+            VideoAsset.ref_count > 0
+        ).update({VideoAsset.ref_count: VideoAsset.ref_count + 1}, synchronize_session=False)
+        if not referenced:
+            db.rollback()
+            return False
+        if not self.lock_live_video(video, db):
+            db.rollback()
+            db.refresh(video)
+            return True
+        
+        # Renditions describe the shared HLS ladder, so copy them from a video already using it
+        donor = db.query(Video).filter(Video.asset_id == asset.id, Video.id != video.id).first()
+        
+        video.asset_id = asset.id
+        video.filename = asset.filename
+        video.duration = asset.duration
+        video.width = asset.width
+        video.height = asset.height
+        video.fps = asset.fps
+        video.codec = asset.codec
+        video.transcode_mode = asset.transcode_mode
+        video.thumbnail_url = asset.thumbnail_url
+        video.video_url = asset.video_url
+        video.hls_prefix = asset.hls_prefix
+        video.renditions = [
+            VideoRendition(
+                name=rendition.name,
+                width=rendition.width,
+                height=rendition.height,
+                bandwidth=rendition.bandwidth,
+                codecs=rendition.codecs,
+                playlist=rendition.playlist
+            )
+            for rendition in (donor.renditions if donor else [])
+        ]
+        video.processing_status = VideoProcessingStatus.COMPLETED
+        video.processing_error = None
+        video.source_path = None
+        
+        db.commit()
+        db.refresh(video)
+        return True
+    
+    def finish_attach(self, video: Video, source_path: str) -> None:
+        """The Redis and disk work after attach_asset returned True"""
+        if video.processing_status == VideoProcessingStatus.COMPLETED:
+            # It may have been looked up (and cached as missing) while pending
+            video_locator.invalidate(video.id)
+            response_cache.invalidate_video(video.id, video.creator_id)
+            metrics.increment("video_processing.deduplicated", shared=True)
+        self.discard_source(source_path)
+    
+    def lock_live_video(self, video: Video, db: Session) -> bool:
+        """Lock a video's row until the transaction ends; False if it was deleted.
+        
+        delete_video takes the same lock, so a deletion either commits before
+        this check or waits and then sees the asset committed alongside it.
+        """
+        live = db.query(Video.id).filter(
+            Video.id == video.id,
+            Video.is_deleted == False
+        ).with_for_update().first()
+        return live is not None
+    
+    def release_asset(self, asset_id: int, db: Session) -> Optional[Tuple[str, Optional[str], Optional[str]]]:
+        """Drop one reference to an asset.
+        
+        Once nothing uses it the asset is deleted and its media returned, as
+        delete_media_files arguments, for the caller to remove.
+        """
+        db.query(VideoAsset).filter(VideoAsset.id == asset_id).update(
+            {VideoAsset.ref_count: VideoAsset.ref_count - 1}, synchronize_session=False
+        )
+        db.commit()
+        
+        asset = db.query(VideoAsset).filter(VideoAsset.id == asset_id).first()
+        if asset is None or asset.ref_count > 0:
+            return None
+        filename, thumbnail_url, hls_prefix = asset.filename, asset.thumbnail_url, asset.hls_prefix
+        
+        # Conditional delete: an upload attaching concurrently will have bumped the count
+        deleted = db.query(VideoAsset).filter(
+            VideoAsset.id == asset_id,
+            VideoAsset.ref_count <= 0
+        ).delete(synchronize_session=False)
+        db.commit()
+        return (filename, thumbnail_url, hls_prefix) if deleted else None
+    
+    def delete_media_files(self, filename: str, thumbnail_url: Optional[str], hls_prefix: Optional[str]) -> None:
+        """Remove an optimized video, its HLS ladder and thumbnail from storage"""
+        try:
+            # Delete video file
+            self.storage_service.delete_file(filename, "videos")
             
-            # Optimize video
-            optimized_filename = f"optimized_{unique_filename}"
-            optimized_path = os.path.join("uploads", optimized_filename)
-            await self.optimize_video(temp_file_path, optimized_path)
+            # Delete HLS ladder
+            if hls_prefix:
+                self.storage_service.delete_tree(hls_prefix, "hls")
+            
+            # Delete thumbnail file
+            if thumbnail_url:
+                thumbnail_filename = thumbnail_url.split('/')[-1]
+                self.storage_service.delete_file(thumbnail_filename, "thumbnails")
+        except Exception as e:
+            # Log error but don't fail the deletion
+            print(f"Error deleting video files: {str(e)}")
+    
+    async def process_pending_video(self, video: Video, db: Session) -> Video:
+        """Optimize a staged upload, generate its thumbnail and mark it completed.
+        
+        Raises InvalidVideoError for uploads that can never succeed; any other
+        exception is treated as transient and may be retried by the worker.
+        """
+        source_path = video.source_path
+        if not source_path or not os.path.exists(source_path):
+            raise InvalidVideoError("Uploaded source file is missing")
+        
+        # An identical upload may have finished processing since this one was queued
+        asset = self.find_asset(video.content_hash, db)
+        if asset is not None and self.attach_asset(video, asset, db):
+            self.finish_attach(video, source_path)
+            return video
+        
+        unique_filename = os.path.splitext(os.path.basename(source_path))[0]
+        # Optimized output is always H.264 MP4, whatever container was uploaded
+        optimized_path = os.path.join("uploads", f"optimized_{unique_filename}.mp4")
+        thumbnail_path = os.path.join("uploads", f"temp_{uuid.uuid4()}.jpg")
+        hls_dir = os.path.join("uploads", f"hls_{uuid.uuid4()}")
+        
+        try:
+            # Probe, optimize and thumbnail in a single decode pass
+            media_info = await self.probe_and_transcode(source_path, optimized_path, thumbnail_path)
             
-            # Read optimized video content
-            with open(optimized_path, 'rb') as f:
-                optimized_content = f.read()
+            # Package the adaptive bitrate ladder
+            renditions = await self.package_hls(source_path, hls_dir, media_info.height)
+            hls_prefix = None
+            if renditions:
+                hls_prefix, _ = self.storage_service.upload_tree(hls_dir, "hls")
             
             # Upload optimized video to cloud storage
             video_filename, video_url = self.storage_service.upload_file(
-                optimized_content, file_extension, "videos"
+                optimized_path, "mp4", "videos"
             )
             
-            # Generate thumbnail
-            thumbnail_filename = f"{uuid.uuid4()}.jpg"
-            thumbnail_path = os.path.join("uploads", f"temp_{thumbnail_filename}")
-            await self.generate_thumbnail(optimized_path, thumbnail_path)
-            
-            # Read thumbnail content and upload
-            with open(thumbnail_path, 'rb') as f:
-                thumbnail_content = f.read()
-            
+            # Upload thumbnail
             thumbnail_filename, thumbnail_url = self.storage_service.upload_file(
-                thumbnail_content, "jpg", "thumbnails"
+                thumbnail_path, "jpg", "thumbnails"
             )
             
-            # Create video record in database
-            video = Video(
-                title=video_data.title,
-                description=video_data.description,
-                filename=video_filename,
-                original_filename=file.filename,
-                file_size=len(content),
-                duration=duration,
-                width=width,
-                height=height,
-                format=file_extension,
-                thumbnail_url=thumbnail_url,
-                video_url=video_url,
-                processing_status=VideoProcessingStatus.COMPLETED,
-                creator_id=creator_id
-            )
+            # Update video record in database
+            video.filename = video_filename
+            video.duration = media_info.duration
+            video.width = media_info.width
+            video.height = media_info.height
+            video.fps = media_info.fps
+            video.codec = media_info.codec
+            video.transcode_mode = media_info.transcode_mode
+            video.thumbnail_url = thumbnail_url
+            video.video_url = video_url
+            video.hls_prefix = hls_prefix
+            video.renditions = [VideoRendition(**rendition) for rendition in renditions]
+            video.processing_status = VideoProcessingStatus.COMPLETED
+            video.processing_error = None
+            video.source_path = None
+            if video.content_hash:
+                # Register the output so later uploads of the same bytes can reuse it
+                video.asset = VideoAsset(
+                    content_hash=video.content_hash,
+                    filename=video_filename,
+                    video_url=video_url,
+                    thumbnail_url=thumbnail_url,
+                    hls_prefix=hls_prefix,
+                    duration=media_info.duration,
+                    width=media_info.width,
+                    height=media_info.height,
+                    fps=media_info.fps,
+                    codec=media_info.codec,
+                    transcode_mode=media_info.transcode_mode,
+                    ref_count=1
+                )
             
-            db.add(video)
-            db.commit()
+            if not self.lock_live_video(video, db):
+                # Deleted while processing: nothing will reference the new output
+                db.rollback()
+                self.delete_media_files(video_filename, thumbnail_url, hls_prefix)
+                self.discard_source(source_path)
+                return video
+            
+            try:
+                db.commit()
+            except IntegrityError:
+                # An identical upload registered its asset first; keep that copy and drop ours
+                db.rollback()
+                self.delete_media_files(video_filename, thumbnail_url, hls_prefix)
+                asset = self.find_asset(video.content_hash, db)
+                if asset is None or not self.attach_asset(video, asset, db):
+                    raise
+                self.finish_attach(video, source_path)
+                return video
             db.refresh(video)
+            video_locator.invalidate(video.id)
+            response_cache.invalidate_video(video.id, video.creator_id)
             
-            # Clean up temp files
-            if os.path.exists(temp_file_path):
-                os.remove(temp_file_path)
-            if os.path.exists(optimized_path):
-                os.remove(optimized_path)
-            if os.path.exists(thumbnail_path):
-                os.remove(thumbnail_path)
+            # The staged upload is no longer needed
+            self.discard_source(source_path)
             
-            return video
+            metrics.increment(f"video_processing.{media_info.transcode_mode}", shared=True)
             
-        except Exception as e:
-            # Clean up files on error
-            temp_file_path = os.path.join("uploads", temp_path)
-            optimized_path = os.path.join("uploads", f"optimized_{unique_filename}")
-            
-            cleanup_files = [temp_file_path, optimized_path]
-            if thumbnail_filename:
-                thumbnail_path = os.path.join("uploads", f"temp_{thumbnail_filename}")
-                cleanup_files.append(thumbnail_path)
+            return video
             
-            for file_path in cleanup_files:
+        finally:
+            # Clean up temp files
+            for file_path in [optimized_path, thumbnail_path]:
                 if os.path.exists(file_path):
                     os.remove(file_path)
-            
-            raise HTTPException(status_code=500, detail=f"Video processing failed: {str(e)}")
+            shutil.rmtree(hls_dir, ignore_errors=True)
+    
+    def discard_source(self, source_path: Optional[str]) -> None:
+        """Remove a staged upload once it has been processed or given up on"""
+        if source_path and os.path.exists(source_path):
+            os.remove(source_path)
     
-    async def delete_video(self, video_id: int, creator_id: int, db: Session) -> bool:
+    async def delete_video(self, video_id: int, creator_id: int, db: AsyncSession) -> bool:
         """Delete video and associated files"""
-        video = db.query(Video).filter(
+        # Locked against a worker finishing it meanwhile (see lock_live_video)
+        video = await db.scalar(select(Video).where(
             Video.id == video_id,
             Video.creator_id == creator_id,
             Video.is_deleted == False
-        ).first()
+        ).with_for_update())
         
         if not video:
             return False
         
         # Mark as deleted in database
         video.is_deleted = True
-        db.commit()
+        await db.commit()
+        # Redis, disk and storage calls below run on worker threads, off the event loop
+        await anyio.to_thread.run_sync(self.forget_deleted_video, video)
         
-        # Delete files from cloud storage
-        try:
-            # Delete video file
-            self.storage_service.delete_file(video.filename, "videos")
-            
-            # Delete thumbnail file
-            if video.thumbnail_url:
-                thumbnail_filename = video.thumbnail_url.split('/')[-1]
-                self.storage_service.delete_file(thumbnail_filename, "thumbnails")
-        except Exception as e:
-            # Log error but don't fail the deletion
-            print(f"Error deleting video files: {str(e)}")
+        # Shared media is only deleted along with its last reference
+        media = (video.filename, video.thumbnail_url, video.hls_prefix)
+        if video.asset_id is not None:
+            media = await db.run_sync(lambda session: self.release_asset(video.asset_id, session))
+        if media is not None:
+            await anyio.to_thread.run_sync(self.delete_media_files, *media)
         
         return True
+    
+    def forget_deleted_video(self, video: Video) -> None:
+        """Stop serving a video just marked deleted and drop its staged upload"""
+        video_locator.invalidate(video.id)
+        response_cache.invalidate_video(video.id, video.creator_id)
+        
+        # Drop the staged upload if processing never finished
+        self.discard_source(video.source_path)
+        
+        # Stop serving it from memory even if the file outlives it as a shared asset
+        if video.filename:
+            video_cache.invalidate(os.path.join(self.storage_service.local_video_dir, video.filename))
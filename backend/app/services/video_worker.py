@@ -0,0 +1,234 @@
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal, engine
+from app.core.executors import shutdown_media_executor
+from app.core.job_queue import JobQueue, RedisJobQueue, VideoJob, get_job_queue
+from app.models.video import Video
+from app.schemas.video import VideoProcessingStatus
+from app.services.video_service import VideoProcessingService, InvalidVideoError
+from config import (
+    VIDEO_WORKER_CONCURRENCY,
+    VIDEO_JOB_MAX_ATTEMPTS,
+    VIDEO_JOB_RETRY_DELAY,
+    VIDEO_WORKER_HEARTBEAT_TTL,
+    VIDEO_WORKER_DRAIN_TIMEOUT,
+    VIDEO_PROCESSING_LEASE,
+)
+
+class VideoWorker:
+    """Consumes video jobs and moves videos through processing to completed/failed"""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        worker_id: Optional[str] = None,
+        session_factory: Callable[[], Session] = SessionLocal,
+        video_service: Optional[VideoProcessingService] = None,
+        max_attempts: int = VIDEO_JOB_MAX_ATTEMPTS,
+        retry_delay: float = VIDEO_JOB_RETRY_DELAY,
+        lease_timeout: float = VIDEO_PROCESSING_LEASE,
+    ):
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.session_factory = session_factory
+        self.video_service = video_service or VideoProcessingService()
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.lease_timeout = lease_timeout
+
+    def run(self, stop_event) -> None:
+        """Process jobs until stop_event is set; the job in hand is always finished first"""
+        heartbeat = threading.Thread(target=self._heartbeat_loop, args=(stop_event,), daemon=True)
+        heartbeat.start()
+        while not stop_event.is_set():
+            job = self.queue.dequeue(self.worker_id, timeout=1.0)
+            if job is None:
+                continue
+            try:
+                self.handle_job(job)
+            finally:
+                self.queue.ack(self.worker_id, job)
+
+    def _heartbeat_loop(self, stop_event) -> None:
+        # Keep the job assigned to this worker while a long transcode is running
+        interval = max(VIDEO_WORKER_HEARTBEAT_TTL / 3, 1)
+        while not stop_event.wait(interval):
+            try:
+                self.queue.heartbeat(self.worker_id)
+            except Exception as e:
+                print(f"Video worker heartbeat failed: {str(e)}")
+
+    def handle_job(self, job: VideoJob) -> None:
+        db = self.session_factory()
+        try:
+            video = self._claim(job, db)
+            if video is None:
+                return
+
+            try:
+                asyncio.run(self.video_service.process_pending_video(video, db))
+            except InvalidVideoError as e:
+                db.rollback()
+                self._mark_failed(video, db, str(e))
+            except Exception as e:
+                db.rollback()
+                if job.attempts + 1 < self.max_attempts:
+                    video.processing_status = VideoProcessingStatus.PENDING
+                    video.processing_error = str(e)
+                    db.commit()
+                    self.queue.retry(job.next_attempt(), self.retry_delay * (2 ** job.attempts))
+                else:
+                    self._mark_failed(video, db, str(e))
+        finally:
+            db.close()
+
+    def _claim(self, job: VideoJob, db: Session) -> Optional[Video]:
+        """Take the job's video for processing; None if it needs nothing from this job.
+
+        A redelivered job only shows that a worker's heartbeat lapsed, not
+        that the worker stopped, so a PROCESSING video is taken over only
+        once its lease (processing_started_at + lease_timeout) has run out.
+        Until then the job waits in the queue, in case the holder did die.
+        """
+        now = datetime.now(timezone.utc)
+        # One conditional UPDATE, so two workers holding the same job cannot both win
+        claimed = db.query(Video).filter(
+            Video.id == job.video_id,
+            Video.is_deleted == False,
+            Video.processing_status.notin_([VideoProcessingStatus.COMPLETED, VideoProcessingStatus.FAILED]),
+            or_(
+                Video.processing_status != VideoProcessingStatus.PROCESSING,
+                Video.processing_started_at == None,
+                Video.processing_started_at < now - timedelta(seconds=self.lease_timeout)
+            )
+        ).update({
+            Video.processing_status: VideoProcessingStatus.PROCESSING,
+            Video.processing_started_at: now,
+            Video.processing_attempts: func.coalesce(Video.processing_attempts, 0) + 1
+        }, synchronize_session=False)
+        db.commit()
+
+        video = db.query(Video).filter(Video.id == job.video_id).first()
+        if claimed:
+            return video
+        if video and not video.is_deleted and video.processing_status == VideoProcessingStatus.PROCESSING:
+            started_at = video.processing_started_at
+            if started_at.tzinfo is None:
+                started_at = started_at.replace(tzinfo=timezone.utc)  # SQLite hands back naive UTC
+            remaining = (started_at - now).total_seconds() + self.lease_timeout
+            self.queue.retry(job, max(remaining, 1))
+        # Otherwise already settled or deleted, e.g. a job redelivered after crash recovery
+        return None
+
+    def _mark_failed(self, video: Video, db: Session, error: str) -> None:
+        video.processing_status = VideoProcessingStatus.FAILED
+        video.processing_error = error
+        db.commit()
+        self.video_service.discard_source(video.source_path)
+
+def _run_worker_process(worker_id: str, stop_event) -> None:
+    """Entry point for pooled worker processes"""
+    # The parent decides when to drain; SIGTERM sent straight to a child drains just that child
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    # Connections inherited from the parent must not be shared across processes
+    engine.dispose(close=False)
+    try:
+        VideoWorker(get_job_queue(), worker_id=worker_id).run(stop_event)
+    finally:
+        shutdown_media_executor()
+
+class VideoWorkerPool:
+    """Runs a fixed number of video workers and drains them gracefully on stop.
+
+    Workers are separate processes when the queue is shared (Redis); with the
+    in-memory queue they run as threads of the current process.
+    """
+
+    def __init__(self, concurrency: int = VIDEO_WORKER_CONCURRENCY, queue: Optional[JobQueue] = None):
+        self.concurrency = concurrency
+        self.queue = queue or get_job_queue()
+        self.use_processes = isinstance(self.queue, RedisJobQueue)
+        self.stop_event = multiprocessing.Event() if self.use_processes else threading.Event()
+        self.workers: List = []
+        self.recovery: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        recovered = self.queue.recover_stale()
+        if recovered:
+            print(f"Recovered {recovered} video job(s) abandoned by crashed workers")
+
+        prefix = f"{socket.gethostname()}-{os.getpid()}"
+        for index in range(self.concurrency):
+            worker_id = f"{prefix}-{index}"
+            if self.use_processes:
+                # Not daemonic: each worker owns a media process pool of its own
+                worker = multiprocessing.Process(
+                    target=_run_worker_process, args=(worker_id, self.stop_event)
+                )
+            else:
+                worker = threading.Thread(
+                    target=VideoWorker(self.queue, worker_id=worker_id).run, args=(self.stop_event,), daemon=True
+                )
+            worker.start()
+            self.workers.append(worker)
+
+        self.recovery = threading.Thread(target=self._recovery_loop, daemon=True)
+        self.recovery.start()
+
+    def _recovery_loop(self) -> None:
+        # Requeue work abandoned by workers that died since the pool started.
+        # One loop per pool rather than per worker; requeueing moves each job
+        # atomically, so pools on other hosts running it too is harmless.
+        interval = max(VIDEO_WORKER_HEARTBEAT_TTL / 3, 1)
+        while not self.stop_event.wait(interval):
+            try:
+                recovered = self.queue.recover_stale()
+                if recovered:
+                    print(f"Recovered {recovered} video job(s) abandoned by crashed workers")
+            except Exception as e:
+                print(f"Video job recovery failed: {str(e)}")
+
+    def stop(self, timeout: float = VIDEO_WORKER_DRAIN_TIMEOUT) -> None:
+        """Stop taking new jobs and wait for in-flight ones to finish"""
+        self.stop_event.set()
+        if self.recovery is not None:
+            self.recovery.join(timeout)
+            self.recovery = None
+        for worker in self.workers:
+            worker.join(timeout)
+        for worker in self.workers:
+            if self.use_processes and worker.is_alive():
+                # Its job stays in the processing list and is recovered on next start
+                worker.terminate()
+        self.workers = []
+
+def main():
+    """Run a standalone worker pool: python -m app.services.video_worker"""
+    pool = VideoWorkerPool()
+    stopping = threading.Event()
+
+    def request_stop(signum, frame):
+        stopping.set()
+
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+    pool.start()
+    print(f"Started {pool.concurrency} video worker(s)")
+    while not stopping.wait(1):
+        pass
+    print("Draining video workers...")
+    pool.stop()
+
+if __name__ == "__main__":
+    main()
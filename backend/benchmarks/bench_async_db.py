@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Load test database-bound endpoints under concurrent requests.
+
+Compares three ways of serving GET /videos/{id}:
+
+    blocking    async def with the sync Session, as the endpoints were; every
+                query stalls the event loop, so requests run one at a time
+    threadpool  def with the sync Session; Starlette runs it on its worker
+                threads, so concurrency is capped by that pool (40 threads)
+    async       async def with an AsyncSession, as the endpoints are now
+
+Each request issues the same lookup plus a simulated server-side delay
+(a SQLite function that sleeps in the driver's thread), standing in for
+query time and the round trip to Postgres. Requests are driven through the
+ASGI interface with httpx, so the numbers exclude the HTTP server itself.
+With short delays both non-blocking variants are bound by the CPU cost of
+the SQLite drivers instead; the thread cap shows once the database time
+dominates, as it does for real queries over the network.
+
+Usage (from backend/):
+    python -m benchmarks.bench_async_db [--requests 1000] [--concurrency 100] [--latency-ms 100]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+import httpx
+from fastapi import Depends, FastAPI, HTTPException
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import Base
+from app.models.user import User
+from app.models.video import Video
+from app.models.video_asset import VideoAsset  # noqa: F401 - registers the table
+from app.models.video_rendition import VideoRendition  # noqa: F401 - registers the table
+from app.schemas.video import Video as VideoSchema
+from app.services.video_queries import VideoQueries
+
+def register_delay(dbapi_connection, connection_record):
+    dbapi_connection.create_function("delay", 1, lambda ms: time.sleep(ms / 1000) or 0)
+
+def build_app(session_factory, async_session_factory, latency_ms: float) -> FastAPI:
+    app = FastAPI()
+
+    def get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    def sync_lookup(video_id: int, db: Session) -> VideoSchema:
+        db.execute(text("SELECT delay(:ms)"), {"ms": latency_ms})
+        video = db.query(Video).filter(Video.id == video_id, Video.is_public == True).first()
+        if not video:
+            raise HTTPException(status_code=404, detail="Video not found")
+        return VideoSchema.from_model(video)
+
+    @app.get("/blocking/{video_id}")
+    async def blocking(video_id: int, db: Session = Depends(get_db)):
+        return sync_lookup(video_id, db)
+
+    @app.get("/threadpool/{video_id}")
+    def threadpool(video_id: int, db: Session = Depends(get_db)):
+        return sync_lookup(video_id, db)
+
+    @app.get("/async/{video_id}")
+    async def async_(video_id: int, db: AsyncSession = Depends(get_async_db)):
+        await db.execute(text("SELECT delay(:ms)"), {"ms": latency_ms})
+        video = await VideoQueries(db).get_public_video(video_id)
+        if not video:
+            raise HTTPException(status_code=404, detail="Video not found")
+        return VideoSchema.from_model(video)
+
+    return app
+
+def populate(session_factory):
+    db = session_factory()
+    user = User(email="bench@example.com", username="bench", hashed_password="x")
+    db.add(user)
+    db.commit()
+    db.add(Video(
+        title="Bench", filename="bench.mp4", original_filename="bench.mp4", file_size=1000000,
+        duration=5.0, width=1280, height=720, format="mp4", video_url="/static/videos/bench.mp4",
+        processing_status="completed", is_public=True, creator_id=user.id
+    ))
+    db.commit()
+    db.close()
+
+async def load(app: FastAPI, path: str, requests: int, concurrency: int):
+    latencies = []
+    remaining = iter(range(requests))
+
+    async def client_loop(client):
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await client.get(path)
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return elapsed, latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=100, help="simulated time per request spent in the database")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        url = f"{temp_dir}/bench.db"
+        # Pools as large as the client concurrency, so only the serving model differs
+        pool = {"pool_size": args.concurrency, "max_overflow": 0}
+        engine = create_engine(f"sqlite:///{url}", connect_args={"check_same_thread": False}, **pool)
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{url}", **pool)
+        for listened in (engine, async_engine.sync_engine):
+            event.listen(listened, "connect", register_delay)
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        populate(session_factory)
+        app = build_app(session_factory, async_sessionmaker(async_engine, expire_on_commit=False), args.latency_ms)
+
+        print(f"{args.requests} requests, {args.concurrency} concurrent, {args.latency_ms:g}ms in the database each")
+        print(f"{'variant':>10} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+
+        async def run():
+            for name in ("blocking", "threadpool", "async"):
+                # Warm up first so opening pooled connections is not measured
+                await load(app, f"/{name}/1", args.concurrency, args.concurrency)
+                elapsed, latencies = await load(app, f"/{name}/1", args.requests, args.concurrency)
+                latencies.sort()
+                p95 = latencies[int(len(latencies) * 0.95) - 1]
+                print(f"{name:>10} {args.requests / elapsed:>8.0f} {statistics.median(latencies):>8.1f} {p95:>8.1f}")
+            await async_engine.dispose()
+
+        asyncio.run(run())
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
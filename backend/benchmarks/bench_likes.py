@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Load test sustained likes on a single video.
+
+Compares two ways of counting likes, both inserting the likes row:
+
+    direct   UPDATE videos SET like_count = like_count + 1 per like, so every
+             like queues on the same row lock until its transaction commits
+    counter  the write-behind like counter: INCRBY on one of the video's
+             Redis shards, with a LikeFlusher applying the deltas in batches
+
+Each variant sends likes from distinct users at the given concurrency for
+a fixed time, with the flusher running in the background, then checks that
+the stored count matches the likes that succeeded. The default SQLite
+database serializes every write, likes rows included, so the difference
+there is small; pass a Postgres URL to see the row-lock contention.
+Without --redis-url the counter runs on fakeredis in process.
+
+Usage (from backend/):
+    python -m benchmarks.bench_likes [--duration 10] [--concurrency 50] [--database-url postgresql://...] [--redis-url redis://...]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from sqlalchemy import create_engine, event, insert, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.database import Base, async_database_url
+from app.core.like_counter import LikeCounter, LikeFlusher
+from app.models.like import Like  # noqa: F401 - registers the table
+from app.models.user import User
+from app.models.video import Video
+from app.models.video_asset import VideoAsset  # noqa: F401 - registers the table
+from app.models.video_rendition import VideoRendition  # noqa: F401 - registers the table
+from app.services.like_service import LikeService
+
+def use_wal(dbapi_connection, connection_record):
+    # Readers no longer block the writer, and writers wait their turn instead of failing
+    dbapi_connection.execute("PRAGMA journal_mode=WAL")
+    dbapi_connection.execute("PRAGMA busy_timeout=30000")
+
+def populate(session_factory, users: int) -> int:
+    db = session_factory()
+    creator = User(email="bench-creator@example.com", username="bench-creator", hashed_password="x")
+    db.add(creator)
+    db.commit()
+    video = Video(
+        title="Viral", filename="viral.mp4", original_filename="viral.mp4", file_size=1000000,
+        duration=5.0, width=1280, height=720, format="mp4", video_url="/static/videos/viral.mp4",
+        processing_status="completed", is_public=True, creator_id=creator.id
+    )
+    db.add(video)
+    db.execute(insert(User), [
+        {"email": f"bench-fan{index}@example.com", "username": f"bench-fan{index}", "hashed_password": "x"}
+        for index in range(users)
+    ])
+    db.commit()
+    video_id = video.id
+    db.close()
+    return video_id
+
+async def load(async_session_factory, counter, video_id, user_ids, duration, concurrency):
+    latencies = []
+    users = iter(user_ids)
+    deadline = time.perf_counter() + duration
+
+    async def client_loop():
+        for user_id in users:
+            if time.perf_counter() >= deadline:
+                return
+            started = time.perf_counter()
+            async with async_session_factory() as db:
+                await LikeService(db, counter).like(user_id, video_id)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    return time.perf_counter() - started, latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=10, help="seconds per variant")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--users", type=int, default=200000, help="distinct likers created up front")
+    parser.add_argument("--flush-interval", type=float, default=1)
+    parser.add_argument("--database-url", help="sync SQLAlchemy URL; default a temporary SQLite file")
+    parser.add_argument("--redis-url", help="default fakeredis in process")
+    args = parser.parse_args()
+
+    if args.redis_url:
+        import redis
+        client = redis.from_url(args.redis_url, decode_responses=True)
+    else:
+        import fakeredis
+        client = fakeredis.FakeRedis(decode_responses=True)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        url = args.database_url or f"sqlite:///{temp_dir}/bench.db"
+        pool = {"pool_size": args.concurrency, "max_overflow": 0}
+        engine = create_engine(url, **({} if url.startswith("sqlite") else pool))
+        async_engine = create_async_engine(async_database_url(url), **pool)
+        if url.startswith("sqlite"):
+            for listened in (engine, async_engine.sync_engine):
+                event.listen(listened, "connect", use_wal)
+        session_factory = sessionmaker(bind=engine)
+        async_session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+
+        print(f"likes on one video for {args.duration:g}s each, {args.concurrency} concurrent")
+        print(f"{'variant':>8} {'likes/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'stored':>8}")
+
+        async def run():
+            for name, counter in (("direct", LikeCounter()), ("counter", LikeCounter(client))):
+                for key in client.scan_iter("likes:*"):
+                    client.delete(key)
+                Base.metadata.drop_all(bind=engine)
+                Base.metadata.create_all(bind=engine)
+                video_id = populate(session_factory, args.users)
+                db = session_factory()
+                user_ids = db.scalars(select(User.id).where(User.username.like("bench-fan%"))).all()
+                db.close()
+
+                flusher = None
+                if counter.enabled:
+                    flusher = LikeFlusher(counter, interval=args.flush_interval, session_factory=session_factory)
+                    flusher.start()
+                elapsed, latencies = await load(
+                    async_session_factory, counter, video_id, user_ids, args.duration, args.concurrency
+                )
+                if flusher:
+                    flusher.stop()  # flushes once more on the way out
+
+                db = session_factory()
+                stored = db.get(Video, video_id).like_count
+                db.close()
+                latencies.sort()
+                p99 = latencies[int(len(latencies) * 0.99) - 1]
+                check = "" if stored == len(latencies) else f"  MISMATCH: {len(latencies)} liked"
+                print(f"{name:>8} {len(latencies) / elapsed:>8.0f} {statistics.median(latencies):>8.1f} "
+                      f"{p99:>8.1f} {stored:>8}{check}")
+            await async_engine.dispose()
+
+        asyncio.run(run())
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Load test password checks on login at a fixed p99 latency target.
+
+Compares two ways of verifying the password in an async login endpoint:
+
+    inline  the slow hash runs on the event loop, as verify_password did;
+            logins run one at a time and stall every other request
+    pool    the hash runs in a PasswordHashPool, as logins do now
+
+Each variant is offered logins at increasing fixed rates, up to past what
+the hashing CPUs can sustain, and reports the completed login rate, login
+p99, and the p99 of a trivial endpoint requested alongside (how long the
+event loop was unavailable to everything else). The last column marks
+runs whose login p99 meets the target; the best rate among them is the
+throughput at that latency. With one core both variants hash at the same
+rate and only the ping column differs; with more, the pool scales with
+its workers. Requests go through the ASGI interface with httpx, so the
+numbers exclude the HTTP server itself.
+
+Usage (from backend/):
+    python -m benchmarks.bench_login [--scheme bcrypt] [--rounds 12] [--workers 4] [--p99-ms 500] [--duration 3]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+import httpx
+from fastapi import FastAPI, HTTPException
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.passwords import Argon2Scheme, BcryptScheme, PasswordHasher, PasswordHashPool
+from app.schemas.user import UserLogin
+
+# Offered load as fractions of what the hashing threads can sustain
+LOAD_LEVELS = (0.25, 0.5, 0.75, 0.9, 1.0, 1.25)
+
+def build_app(hasher: PasswordHasher, pool: PasswordHashPool) -> FastAPI:
+    app = FastAPI()
+    stored = hasher.hash("benchpassword")
+
+    @app.post("/inline/login")
+    async def inline(credentials: UserLogin):
+        if not hasher.verify(credentials.password, stored):
+            raise HTTPException(status_code=401)
+        return {"ok": True}
+
+    @app.post("/pool/login")
+    async def pooled(credentials: UserLogin):
+        if not await pool.run(hasher.verify, credentials.password, stored):
+            raise HTTPException(status_code=401)
+        return {"ok": True}
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    return app
+
+def p99(latencies):
+    if not latencies:
+        return float("nan")
+    latencies = sorted(latencies)
+    return latencies[max(int(len(latencies) * 0.99) - 1, 0)]
+
+async def load(app: FastAPI, variant: str, rate: float, duration: float):
+    """Open loop: requests start on a fixed schedule whether or not earlier
+    ones have finished, and latency counts from the scheduled start, so
+    time spent waiting behind a blocked event loop is not hidden."""
+    logins, pings = [], []
+    rejected = 0
+    body = {"email": "bench@example.com", "password": "benchpassword"}
+
+    async def timed(client, scheduled, request, latencies):
+        nonlocal rejected
+        response = await request(client)
+        if response.status_code == 503:
+            rejected += 1
+            return
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - scheduled) * 1000)
+
+    async def schedule(client, interval, request, latencies):
+        tasks = []
+        first = time.perf_counter()
+        for index in range(int(duration / interval)):
+            scheduled = first + index * interval
+            await asyncio.sleep(max(scheduled - time.perf_counter(), 0))
+            tasks.append(asyncio.ensure_future(timed(client, scheduled, request, latencies)))
+        await asyncio.gather(*tasks)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        started = time.perf_counter()
+        await asyncio.gather(
+            schedule(client, 1 / rate, lambda c: c.post(f"/{variant}/login", json=body), logins),
+            schedule(client, 0.01, lambda c: c.get("/ping"), pings)
+        )
+        elapsed = time.perf_counter() - started
+    return len(logins) / elapsed, p99(logins), p99(pings), rejected
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scheme", choices=("bcrypt", "argon2"), default="bcrypt")
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt work factor")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="hashing threads for the pool variant")
+    parser.add_argument("--max-pending", type=int, default=64, help="pool admission limit; excess logins get 503")
+    parser.add_argument("--p99-ms", type=float, default=500, help="login latency target")
+    parser.add_argument("--duration", type=float, default=3, help="seconds per load level")
+    args = parser.parse_args()
+
+    scheme = BcryptScheme(rounds=args.rounds) if args.scheme == "bcrypt" else Argon2Scheme()
+    hasher = PasswordHasher(scheme)
+    pool = PasswordHashPool(workers=args.workers, max_pending=args.max_pending)
+    app = build_app(hasher, pool)
+
+    started = time.perf_counter()
+    hasher.hash("calibrate")
+    hash_seconds = time.perf_counter() - started
+    capacity = min(args.workers, os.cpu_count() or 1) / hash_seconds
+    print(f"{args.scheme}: {hash_seconds * 1000:.0f}ms per hash, {args.workers} pool workers, "
+          f"~{capacity:.0f} logins/s of CPU, p99 target {args.p99_ms:g}ms")
+    print(f"{'variant':>8} {'offered':>8} {'logins/s':>9} {'p99 ms':>8} {'ping p99':>9} {'503s':>6} {'target':>7}")
+
+    async def run():
+        for variant in ("inline", "pool"):
+            best = 0.0
+            for level in LOAD_LEVELS:
+                offered = capacity * level
+                rate, login_p99, ping_p99, rejected = await load(app, variant, offered, args.duration)
+                met = login_p99 <= args.p99_ms
+                if met:
+                    best = max(best, rate)
+                print(f"{variant:>8} {offered:>8.1f} {rate:>9.1f} {login_p99:>8.0f} {ping_p99:>9.0f} "
+                      f"{rejected:>6} {'yes' if met else 'no':>7}")
+            print(f"{variant:>8} throughput at p99 <= {args.p99_ms:g}ms: {best:.1f} logins/s")
+
+    asyncio.run(run())
+    pool.shutdown()
+
+if __name__ == "__main__":
+    main()
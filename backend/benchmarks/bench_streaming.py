@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark local video streaming responses.
+
+Compares the previous 8KB generator-based StreamingResponse with
+RangeFileResponse, reading in large chunks, handing ranges to the server
+as zero-copy sendfile calls and slicing them from the hot-video cache. Responses are driven through the ASGI
+interface directly, so the numbers exclude the HTTP server itself; the
+zero-copy variant performs the os.sendfile() a supporting server would;
+uvicorn is not one, so under it responses take the chunked path.
+Its sink is /dev/null, so it shows the per-call cost rather than socket
+throughput.
+
+Usage (from backend/):
+    python -m benchmarks.bench_streaming [--size-mb 64] [--streams 8] [--range]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from starlette.responses import StreamingResponse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.file_response import RangeFileResponse, ZEROCOPY_EXTENSION
+from app.core.video_cache import HotVideoCache
+from config import STREAM_CHUNK_SIZE
+
+def legacy_response(file_path: str, start: int, end: int) -> StreamingResponse:
+    """The generator _stream_local_video used before RangeFileResponse"""
+    def file_generator():
+        with open(file_path, 'rb') as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = f.read(min(8192, remaining))  # 8KB chunks
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+    return StreamingResponse(file_generator(), status_code=206, media_type="video/mp4")
+
+async def drain(response, zerocopy: bool, sink_fd: int) -> int:
+    """Run a response against a sink that discards the body; returns bytes delivered"""
+    delivered = 0
+
+    async def send(message):
+        nonlocal delivered
+        if message["type"] == ZEROCOPY_EXTENSION:
+            offset, remaining = message["offset"], message["count"]
+            while remaining > 0:
+                sent = os.sendfile(sink_fd, message["file"], offset, remaining)
+                offset += sent
+                remaining -= sent
+            delivered += message["count"]
+        elif message["type"] == "http.response.body":
+            delivered += len(message.get("body", b""))
+
+    async def receive():
+        # Only consulted by StreamingResponse to notice disconnects
+        await asyncio.sleep(3600)
+        return {"type": "http.disconnect"}
+
+    scope = {"type": "http", "asgi": {"spec_version": "2.4"}, "extensions": {ZEROCOPY_EXTENSION: {}} if zerocopy else {}}
+    await response(scope, receive, send)
+    return delivered
+
+async def run_variant(name: str, file_path: str, streams: int, byte_range, sink_fd: int):
+    size = os.path.getsize(file_path)
+    start, end = byte_range or (0, size - 1)
+    headers = {"range": f"bytes={start}-{end}"} if byte_range else {}
+
+    cache = None
+    if name == "cached":
+        # Warm the cache so every measured stream is a hit
+        cache = HotVideoCache(max_bytes=size, max_file_bytes=size)
+        stat = os.stat(file_path)
+        cache.load(file_path, stat.st_size, stat.st_mtime_ns)
+
+    def build():
+        if name == "legacy-8KB":
+            return legacy_response(file_path, start, end)
+        return RangeFileResponse(file_path, headers, media_type="video/mp4", chunk_size=STREAM_CHUNK_SIZE, cache=cache)
+
+    zerocopy = name == "zerocopy"
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    delivered = await asyncio.gather(*(drain(build(), zerocopy, sink_fd) for _ in range(streams)))
+    cpu, wall = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    total = sum(delivered)
+    return {
+        "mb_per_s": total / wall / 1e6,
+        "cpu_ms_per_stream": cpu / streams * 1000,
+        "cpu_ms_per_mb": cpu / (total / 1e6) * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=64, help="size of the file being streamed")
+    parser.add_argument("--streams", type=int, default=8, help="concurrent streams per variant")
+    parser.add_argument("--range", action="store_true", help="request the middle half of the file instead of all of it")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = os.path.join(temp_dir, "video.mp4")
+        with open(file_path, "wb") as f:
+            for _ in range(args.size_mb):
+                f.write(os.urandom(1024 * 1024))
+        size = os.path.getsize(file_path)
+        byte_range = (size // 4, size * 3 // 4 - 1) if args.range else None
+
+        print(f"{args.streams} streams of {args.size_mb}MB{' (ranged)' if args.range else ''}, "
+              f"chunk size {STREAM_CHUNK_SIZE // 1024}KB")
+        print(f"{'variant':>12} {'MB/s':>10} {'CPU ms/stream':>14} {'CPU ms/MB':>10}")
+        with open(os.devnull, "wb") as sink:
+            for name in ("legacy-8KB", "chunked", "zerocopy", "cached"):
+                result = asyncio.run(run_variant(name, file_path, args.streams, byte_range, sink.fileno()))
+                print(f"{name:>12} {result['mb_per_s']:>10.0f} {result['cpu_ms_per_stream']:>14.1f} "
+                      f"{result['cpu_ms_per_mb']:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Benchmark the video transcoder backends on synthetic clips.
+
+Compares frames per second and output size of the OpenCV per-frame
+re-encode against the ffmpeg/x264 subprocess transcoder.
+
+Usage (from backend/):
+    python -m benchmarks.bench_transcoders [--seconds 5] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.media_processing import FFmpegTranscoder, OpenCVTranscoder, ffmpeg_available
+from config import FFMPEG_BINARY, FFMPEG_PRESET, FFMPEG_CRF, FFMPEG_THREADS
+
+CLIP_SIZES = [(640, 480), (1280, 720), (1920, 1080)]
+
+def create_clip(path: str, width: int, height: int, seconds: float, fps: int = 30):
+    """Write a synthetic clip with motion and noise so encoders have real work to do"""
+    out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'mp4v'), fps, (width, height))
+    rng = np.random.default_rng(42)
+    for frame_num in range(int(seconds * fps)):
+        frame = rng.integers(0, 40, (height, width, 3), dtype=np.uint8)
+        center = (int(frame_num / (seconds * fps) * width), height // 2)
+        cv2.circle(frame, center, height // 8, (0, 255, 0), -1)
+        cv2.putText(frame, f"Frame {frame_num}", (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
+        out.write(frame)
+    out.release()
+
+def run(transcoder, source: str, temp_dir: str, repeat: int):
+    output = os.path.join(temp_dir, f"out_{transcoder.name}.mp4")
+    thumbnail = os.path.join(temp_dir, f"thumb_{transcoder.name}.jpg")
+    timings = []
+    media_info = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        media_info = transcoder.transcode(source, output, thumbnail, max_duration=float("inf"))
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    return {
+        "fps": media_info.frame_count / best,
+        "seconds": best,
+        "size_kb": os.path.getsize(output) / 1024,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0, help="clip length")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per backend; the best is reported")
+    parser.add_argument("--fourcc", default="mp4v", help="OpenCV output codec (avc1 needs an H.264-enabled build)")
+    args = parser.parse_args()
+
+    transcoders = [OpenCVTranscoder(args.fourcc)]
+    if ffmpeg_available(FFMPEG_BINARY):
+        transcoders.append(FFmpegTranscoder(FFMPEG_BINARY, preset=FFMPEG_PRESET, crf=FFMPEG_CRF, threads=FFMPEG_THREADS))
+    else:
+        print(f"ffmpeg not found ({FFMPEG_BINARY}); benchmarking OpenCV only")
+
+    print(f"{'clip':>10} {'backend':>8} {'fps':>8} {'seconds':>8} {'size KB':>9}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for width, height in CLIP_SIZES:
+            source = os.path.join(temp_dir, f"source_{width}x{height}.mp4")
+            create_clip(source, width, height, args.seconds)
+            for transcoder in transcoders:
+                result = run(transcoder, source, temp_dir, args.repeat)
+                print(f"{width}x{height:<5} {transcoder.name:>8} {result['fps']:>8.1f} "
+                      f"{result['seconds']:>8.2f} {result['size_kb']:>9.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark building a page of the public video feed.
+
+Compares the listing code as it was (OFFSET page, creator lazy-loaded per
+row, each row copied into a dict and validated again) with the shared
+VideoQueries/keyset pagination/VideoSchema.from_model path. Every page
+uses a fresh session, as a request would, so lazy loads are not hidden by
+the identity map. Runs against a throwaway SQLite database, so absolute
+numbers are lower than over a network connection to Postgres, where each
+extra query also pays a round trip.
+
+The model's feed indexes let the ordered query read rows in index order;
+--no-feed-index drops them, so every page sorts the whole table again.
+
+Usage (from backend/):
+    python -m benchmarks.bench_video_listing [--videos 20000] [--users 2000] [--page-size 100] [--no-feed-index]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.core.pagination import paginate
+from app.models.user import User
+from app.models.video import Video
+from app.models.video_asset import VideoAsset  # noqa: F401 - registers the table
+from app.models.video_rendition import VideoRendition  # noqa: F401 - registers the table
+from app.schemas.video import Video as VideoSchema
+from app.services.video_queries import VideoQueries
+
+def legacy_page(db, page, page_size):
+    """get_videos before the shared query layer"""
+    query = db.query(Video).filter(
+        Video.is_public == True,
+        Video.is_deleted == False,
+        Video.processing_status == "completed"
+    )
+    total = query.count()
+    videos = query.offset((page - 1) * page_size).limit(page_size).all()
+    schemas = []
+    for video in videos:
+        video_dict = {
+            "id": video.id,
+            "title": video.title,
+            "description": video.description,
+            "filename": video.filename,
+            "original_filename": video.original_filename,
+            "file_size": video.file_size,
+            "duration": video.duration,
+            "width": video.width,
+            "height": video.height,
+            "format": video.format,
+            "fps": video.fps,
+            "codec": video.codec,
+            "transcode_mode": video.transcode_mode,
+            "thumbnail_url": video.thumbnail_url,
+            "video_url": video.video_url,
+            "processing_status": video.processing_status,
+            "processing_error": video.processing_error,
+            "is_public": video.is_public,
+            "is_deleted": video.is_deleted,
+            "creator_id": video.creator_id,
+            "created_at": video.created_at,
+            "updated_at": video.updated_at,
+            "creator_username": video.creator.username if video.creator else None,
+            "hls_url": f"/videos/{video.id}/hls/master.m3u8" if video.hls_prefix else None
+        }
+        schemas.append(VideoSchema(**video_dict))
+    return schemas, total
+
+async def current_page(db, page, page_size, cursor):
+    result = await paginate(db, VideoQueries(db).public_videos(), Video.created_at, Video.id, page_size, cursor=cursor)
+    return [VideoSchema.from_model(video) for video in result.items], result.next_cursor
+
+def populate(session_factory, videos, users):
+    db = session_factory()
+    db.add_all(User(email=f"user{i}@example.com", username=f"user{i}", hashed_password="x") for i in range(users))
+    db.commit()
+    start = datetime(2026, 1, 1)
+    db.bulk_insert_mappings(Video, [
+        {
+            "title": f"Video {i}",
+            "filename": f"{i}.mp4",
+            "original_filename": f"{i}.mp4",
+            "file_size": 1000000,
+            "duration": 5.0,
+            "width": 1280,
+            "height": 720,
+            "format": "mp4",
+            "video_url": f"/static/videos/{i}.mp4",
+            "thumbnail_url": f"/static/thumbnails/{i}.jpg",
+            "processing_status": "completed",
+            "is_public": True,
+            "is_deleted": False,
+            "creator_id": i % users + 1,
+            "created_at": start + timedelta(seconds=i),
+        }
+        for i in range(videos)
+    ])
+    db.commit()
+    db.close()
+
+async def walk_current(async_session_factory, pages, page_size):
+    cursor, timings = None, []
+    for page in range(1, pages + 1):
+        async with async_session_factory() as db:
+            started = time.perf_counter()
+            _, cursor = await current_page(db, page, page_size, cursor)
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=int, default=20000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--pages", type=int, default=20, help="consecutive pages walked from the start")
+    parser.add_argument("--no-feed-index", action="store_true", help="drop the (created_at DESC, id DESC) feed indexes")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        engine = create_engine(f"sqlite:///{temp_dir}/bench.db")
+        Base.metadata.create_all(bind=engine)
+        session_factory = sessionmaker(bind=engine)
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{temp_dir}/bench.db")
+        async_session_factory = async_sessionmaker(async_engine, expire_on_commit=False)
+        populate(session_factory, args.videos, args.users)
+        if args.no_feed_index:
+            with engine.begin() as conn:
+                for index in ("ix_videos_public_feed", "ix_videos_creator_feed"):
+                    conn.execute(text(f"DROP INDEX {index}"))
+
+        statements = []
+        for listened in (engine, async_engine.sync_engine):
+            event.listen(listened, "before_cursor_execute", lambda *a: statements.append(a[2]))
+
+        print(f"{args.videos} videos by {args.users} users, {args.pages} pages of {args.page_size}"
+              f"{' (no feed index)' if args.no_feed_index else ''}")
+        print(f"{'variant':>10} {'queries/page':>13} {'ms/page':>9} {'ms last page':>13}")
+        for name in ("legacy", "current"):
+            timings = []
+            del statements[:]
+            if name == "legacy":
+                for page in range(1, args.pages + 1):
+                    db = session_factory()
+                    started = time.perf_counter()
+                    legacy_page(db, page, args.page_size)
+                    timings.append((time.perf_counter() - started) * 1000)
+                    db.close()
+            else:
+                timings = asyncio.run(walk_current(async_session_factory, args.pages, args.page_size))
+            print(f"{name:>10} {len(statements) / args.pages:>13.1f} {sum(timings) / len(timings):>9.1f} "
+                  f"{timings[-1]:>13.1f}")
+        asyncio.run(async_engine.dispose())
+
+if __name__ == "__main__":
+    main()
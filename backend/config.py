@@ -5,12 +5,34 @@ load_dotenv()
 
 # Database Configuration
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://annhoward@localhost:5432/microvideoblog")
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", "")  # defaults to DATABASE_URL with its asyncio driver
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
 
 # JWT Configuration
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))  # verified tokens kept in process, each until it expires
+PRINCIPAL_CACHE_TTL = int(os.getenv("PRINCIPAL_CACHE_TTL", "60"))  # seconds an authenticated user's row is reused
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")  # bearer token scrapers send to /metrics; empty turns the endpoint off
+
+# Password Hashing Configuration
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "bcrypt")  # bcrypt or argon2; older hashes are replaced at login
+PASSWORD_BCRYPT_ROUNDS = int(os.getenv("PASSWORD_BCRYPT_ROUNDS", "12"))  # log2 of the work factor
+PASSWORD_ARGON2_TIME_COST = int(os.getenv("PASSWORD_ARGON2_TIME_COST", "3"))  # passes over memory
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv("PASSWORD_ARGON2_MEMORY_COST", "65536"))  # KiB per hash
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv("PASSWORD_ARGON2_PARALLELISM", "4"))  # lanes per hash
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))  # hashing threads
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))  # running or queued before 503
+
+# Rate Limiting Configuration ("<count>/<second|minute|hour|day>", optionally " burst <n>"; "off" disables one)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "redis")  # redis, memory (per process) or off
+RATE_LIMIT_AUTH = os.getenv("RATE_LIMIT_AUTH", "10/minute")  # login, register and reset requests per client IP
+RATE_LIMIT_UPLOAD = os.getenv("RATE_LIMIT_UPLOAD", "20/hour burst 5")  # new uploads per user
+RATE_LIMIT_STREAM = os.getenv("RATE_LIMIT_STREAM", "600/minute burst 120")  # stream and HLS requests per client IP
+RATE_LIMIT_LOCAL_KEYS = int(os.getenv("RATE_LIMIT_LOCAL_KEYS", "100000"))  # buckets kept in process without Redis
+RATE_LIMIT_TRUST_FORWARDED_FOR = os.getenv("RATE_LIMIT_TRUST_FORWARDED_FOR", "False").lower() == "true"  # only behind a proxy
+UPLOAD_MAX_QUEUE_DEPTH = int(os.getenv("UPLOAD_MAX_QUEUE_DEPTH", "200"))  # queued processing jobs before uploads get 503, 0 disables
 
 # Email Configuration (for password reset)
 SMTP_SERVER = os.getenv("SMTP_SERVER", "smtp.gmail.com")
@@ -23,6 +45,81 @@ GCS_BUCKET_NAME = os.getenv("GCS_BUCKET_NAME", "microvideoblog-dev")
 GCS_PROJECT_ID = os.getenv("GCS_PROJECT_ID", "multiverseschool")
 USE_CLOUD_STORAGE = os.getenv("USE_CLOUD_STORAGE", "False").lower() == "true"
 
+# Upload Configuration
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))  # bytes buffered per read/write
+
+# Resumable Upload Configuration
+UPLOAD_SESSION_BACKEND = os.getenv("UPLOAD_SESSION_BACKEND", "redis")  # redis or memory
+UPLOAD_SESSION_TTL = int(os.getenv("UPLOAD_SESSION_TTL", str(24 * 3600)))  # seconds since the last chunk
+RESUMABLE_CHUNK_SIZE = int(os.getenv("RESUMABLE_CHUNK_SIZE", str(8 * 1024 * 1024)))  # largest chunk per PUT
+
+# Streaming Configuration
+STREAM_CHUNK_SIZE = int(os.getenv("STREAM_CHUNK_SIZE", str(1024 * 1024)))  # bytes per read when sendfile is unavailable, as under uvicorn
+VIDEO_CACHE_MAX_BYTES = int(os.getenv("VIDEO_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))  # hot video memory budget, 0 disables
+VIDEO_CACHE_MAX_FILE_BYTES = int(os.getenv("VIDEO_CACHE_MAX_FILE_BYTES", str(16 * 1024 * 1024)))  # larger files are never cached
+VIDEO_LOCATION_CACHE_BACKEND = os.getenv("VIDEO_LOCATION_CACHE_BACKEND", "redis")  # redis or memory
+VIDEO_LOCATION_TTL = int(os.getenv("VIDEO_LOCATION_TTL", "300"))  # seconds a resolved location is shared in Redis
+VIDEO_LOCATION_NEGATIVE_TTL = int(os.getenv("VIDEO_LOCATION_NEGATIVE_TTL", "30"))  # seconds an unknown id stays unknown
+VIDEO_LOCATION_LOCAL_TTL = float(os.getenv("VIDEO_LOCATION_LOCAL_TTL", "5"))  # seconds, bounds staleness in other processes
+VIDEO_LOCATION_LOCAL_SIZE = int(os.getenv("VIDEO_LOCATION_LOCAL_SIZE", "10000"))  # ids kept in process
+
+# Cache Configuration (app.core.cache)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "redis")  # redis or memory
+CACHE_TTL = int(os.getenv("CACHE_TTL", "300"))  # seconds an entry is fresh
+CACHE_L1_TTL = float(os.getenv("CACHE_L1_TTL", "5"))  # seconds, bounds staleness in other processes
+CACHE_L1_SIZE = int(os.getenv("CACHE_L1_SIZE", "10000"))  # entries kept in process per cache
+
+# Response Cache Configuration (public feed and video pages)
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "redis")  # redis, fakeredis (in process, for tests) or off
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", "60"))  # seconds, bounds staleness if an invalidation is missed
+RESPONSE_CACHE_TTL_JITTER = float(os.getenv("RESPONSE_CACHE_TTL_JITTER", "0.2"))  # up to this fraction added, spreads expiries
+
+# Likes Configuration
+LIKE_COUNTER_BACKEND = os.getenv("LIKE_COUNTER_BACKEND", "redis")  # redis, fakeredis (in process, for tests) or off (row updates)
+LIKE_COUNTER_SHARDS = int(os.getenv("LIKE_COUNTER_SHARDS", "8"))  # Redis keys a video's likes are spread over
+LIKE_FLUSH_INTERVAL = float(os.getenv("LIKE_FLUSH_INTERVAL", "5"))  # seconds between flushes to the database
+LIKE_FLUSH_BATCH = int(os.getenv("LIKE_FLUSH_BATCH", "500"))  # videos per UPDATE batch
+RUN_LIKE_FLUSHER_IN_API = os.getenv("RUN_LIKE_FLUSHER_IN_API", "True").lower() == "true"
+
+# Follows Configuration
+FOLLOW_MIRROR_BACKEND = os.getenv("FOLLOW_MIRROR_BACKEND", "redis")  # redis, fakeredis (in process, for tests) or off (database only)
+FOLLOW_MIRROR_TTL = int(os.getenv("FOLLOW_MIRROR_TTL", "86400"))  # seconds an idle user's follow sets stay in Redis
+FOLLOW_LOOKUP_MAX_IDS = int(os.getenv("FOLLOW_LOOKUP_MAX_IDS", "100"))  # user ids per "which of these do I follow" lookup
+
+# Video Processing Configuration
+VIDEO_PROCESSING_CONCURRENCY = int(os.getenv("VIDEO_PROCESSING_CONCURRENCY", "2"))  # OpenCV/PIL processes
+VIDEO_PROBE_TIMEOUT = float(os.getenv("VIDEO_PROBE_TIMEOUT", "15"))  # seconds
+VIDEO_THUMBNAIL_TIMEOUT = float(os.getenv("VIDEO_THUMBNAIL_TIMEOUT", "30"))  # seconds
+VIDEO_TRANSCODE_TIMEOUT = float(os.getenv("VIDEO_TRANSCODE_TIMEOUT", "300"))  # seconds
+VIDEO_MAX_DIMENSION = int(os.getenv("VIDEO_MAX_DIMENSION", "4096"))  # px, longest side accepted at upload
+
+# Transcoder Configuration
+VIDEO_TRANSCODER = os.getenv("VIDEO_TRANSCODER", "auto")  # auto, ffmpeg or opencv
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+FFMPEG_PRESET = os.getenv("FFMPEG_PRESET", "veryfast")  # x264 speed/size trade-off
+FFMPEG_CRF = int(os.getenv("FFMPEG_CRF", "23"))  # x264 quality, lower is better
+FFMPEG_THREADS = int(os.getenv("FFMPEG_THREADS", "0"))  # 0 = one per core
+VIDEO_KEYFRAME_INTERVAL = float(os.getenv("VIDEO_KEYFRAME_INTERVAL", "2"))  # seconds between keyframes, bounds seek latency
+VIDEO_FASTSTART_TIMEOUT = float(os.getenv("VIDEO_FASTSTART_TIMEOUT", "30"))  # seconds
+
+# Skip-transcode fast path for uploads that are already web-ready
+VIDEO_FAST_PATH = os.getenv("VIDEO_FAST_PATH", "True").lower() == "true"
+VIDEO_FAST_PATH_MAX_BITRATE_KBPS = int(os.getenv("VIDEO_FAST_PATH_MAX_BITRATE_KBPS", "5000"))
+
+# Adaptive Bitrate Streaming Configuration
+HLS_LADDER = os.getenv("HLS_LADDER", "240:400,480:1000,720:2500")  # height:video kbps, empty disables HLS
+HLS_SEGMENT_DURATION = int(os.getenv("HLS_SEGMENT_DURATION", "2"))  # seconds
+
+# Video Processing Queue Configuration
+VIDEO_QUEUE_BACKEND = os.getenv("VIDEO_QUEUE_BACKEND", "redis")  # redis or memory
+VIDEO_WORKER_CONCURRENCY = int(os.getenv("VIDEO_WORKER_CONCURRENCY", "2"))
+VIDEO_JOB_MAX_ATTEMPTS = int(os.getenv("VIDEO_JOB_MAX_ATTEMPTS", "3"))
+VIDEO_JOB_RETRY_DELAY = float(os.getenv("VIDEO_JOB_RETRY_DELAY", "5"))  # seconds, doubled per attempt
+VIDEO_WORKER_HEARTBEAT_TTL = int(os.getenv("VIDEO_WORKER_HEARTBEAT_TTL", "30"))  # seconds
+VIDEO_WORKER_DRAIN_TIMEOUT = float(os.getenv("VIDEO_WORKER_DRAIN_TIMEOUT", "60"))  # seconds
+VIDEO_PROCESSING_LEASE = float(os.getenv("VIDEO_PROCESSING_LEASE", "1800"))  # seconds; must outlast a whole processing run
+RUN_VIDEO_WORKERS_IN_API = os.getenv("RUN_VIDEO_WORKERS_IN_API", "True").lower() == "true"
+
 # Application Configuration
 DEBUG = os.getenv("DEBUG", "True").lower() == "true"
 HOST = os.getenv("HOST", "0.0.0.0")
@@ -84,12 +84,8 @@ async def test_video_processing():
         print("\nTesting cloud storage service...")
         storage_service = CloudStorageService()
         
-        # Read test video content
-        with open(test_video_path, 'rb') as f:
-            video_content = f.read()
-        
-        # Upload to storage
-        filename, url = storage_service.upload_file(video_content, 'mp4', 'videos')
+        # Upload to storage straight from disk
+        filename, url = storage_service.upload_file(test_video_path, 'mp4', 'videos')
         print(f"Uploaded video: {filename}")
         print(f"Public URL: {url}")
         
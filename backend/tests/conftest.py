@@ -0,0 +1,94 @@
+import os
+import pytest
+
+# Keep caches in process: public responses in fakeredis, the rest in each cache's local tier
+os.environ.setdefault("RESPONSE_CACHE_BACKEND", "fakeredis")
+os.environ.setdefault("CACHE_BACKEND", "memory")
+os.environ.setdefault("RATE_LIMIT_BACKEND", "memory")
+os.environ.setdefault("LIKE_COUNTER_BACKEND", "fakeredis")
+os.environ.setdefault("FOLLOW_MIRROR_BACKEND", "fakeredis")
+# Tests flush the like counter themselves, against their own databases
+os.environ.setdefault("RUN_LIKE_FLUSHER_IN_API", "False")
+# Cheapest bcrypt cost, so sign-ups and logins in tests stay fast
+os.environ.setdefault("PASSWORD_BCRYPT_ROUNDS", "4")
+
+# Imported after the settings above, which config reads once
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
+from app.core.database import get_async_db, get_db, Base
+
+class TestDatabase:
+    """A test module's own SQLite file, with sync and async sessions on it.
+
+    Declare one as `database` at module level; the module_database fixture
+    creates its tables, points the app's get_db and get_async_db (plus any
+    extra `overrides`) and the video locator at it for the module's tests,
+    and removes the file afterwards. The engines exist from import, so modules can listen on them.
+    """
+
+    __test__ = False
+
+    def __init__(self, filename: str, overrides: dict = None):
+        self.filename = filename
+        self.overrides = overrides or {}
+        self.engine = create_engine(f"sqlite:///./{filename}", connect_args={"check_same_thread": False})
+        self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.async_engine = create_async_engine(f"sqlite+aiosqlite:///./{filename}", poolclass=NullPool)
+        self.AsyncSessionLocal = async_sessionmaker(self.async_engine, autoflush=False, expire_on_commit=False)
+
+    def override_get_db(self):
+        db = self.SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db(self):
+        async with self.AsyncSessionLocal() as db:
+            yield db
+
+    def dependency_overrides(self) -> dict:
+        return {get_db: self.override_get_db, get_async_db: self.override_get_async_db, **self.overrides}
+
+@pytest.fixture(scope="module", autouse=True)
+def module_database(request):
+    """Set up the test module's TestDatabase, if it declares one"""
+    database = getattr(request.module, "database", None)
+    if not isinstance(database, TestDatabase):
+        yield None
+        return
+    from app.main import app
+    from app.services.video_locator import video_locator
+    Base.metadata.create_all(bind=database.engine)
+    overrides = database.dependency_overrides()
+    app.dependency_overrides.update(overrides)
+    # The locator opens its own sessions rather than using get_async_db's
+    session_factory, video_locator.session_factory = video_locator.session_factory, database.AsyncSessionLocal
+    yield database
+    video_locator.session_factory = session_factory
+    for dependency in overrides:
+        app.dependency_overrides.pop(dependency, None)
+    Base.metadata.drop_all(bind=database.engine)
+    database.engine.dispose()
+    if os.path.exists(database.filename):
+        os.remove(database.filename)
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Each test starts from empty caches, whatever database it uses"""
+    from app.core.cache import caches
+    from app.core.follow_mirror import follow_mirror
+    from app.core.like_counter import like_counter
+    from app.core.response_cache import response_cache
+    from app.core.rate_limit import rate_limiter
+    from app.core.security import token_cache
+    for client in (response_cache.client, like_counter.client, follow_mirror.client):
+        if client is not None:
+            client.flushdb()
+    for cache in list(caches.values()):
+        cache.clear()
+    token_cache.clear()
+    rate_limiter.local.clear()
+    yield
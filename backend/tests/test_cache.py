@@ -0,0 +1,174 @@
+import asyncio
+import threading
+import fakeredis
+import pytest
+from pydantic import BaseModel
+from app.core.cache import PickleSerializer, PydanticSerializer, TwoTierCache, cached
+
+class Point(BaseModel):
+    x: int
+    y: int
+
+class CountingLoader:
+    """An async loader that counts its calls and can be held open"""
+
+    def __init__(self, values=None, delay=0.0):
+        self.values = list(values or ["value"])
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return self.values[min(self.calls, len(self.values)) - 1]
+
+@pytest.fixture
+def redis():
+    return fakeredis.FakeRedis()
+
+def test_reads_through_local_then_shared_tier(redis):
+    loader = CountingLoader()
+    cache = TwoTierCache("tiers", client=redis, ttl=60)
+
+    assert asyncio.run(cache.get_or_load(1, loader)) == "value"
+    assert asyncio.run(cache.get_or_load(1, loader)) == "value"
+    # Another process: empty local tier, same Redis
+    other = TwoTierCache("tiers", client=redis, ttl=60)
+    assert asyncio.run(other.get_or_load(1, loader)) == "value"
+    assert loader.calls == 1
+    assert redis.ttl("tiers:1") == 60
+
+    stats, other_stats = cache.stats(), other.stats()
+    assert (stats["l1"]["hits"], stats["l1"]["misses"], stats["origin"]["misses"]) == (1, 1, 1)
+    assert (other_stats["l1"]["misses"], other_stats["l2"]["hits"]) == (1, 1)
+
+def test_concurrent_misses_share_one_load():
+    loader = CountingLoader(delay=0.05)
+    cache = TwoTierCache("flight", ttl=60)
+
+    async def burst():
+        return await asyncio.gather(*(cache.get_or_load("hot", loader) for _ in range(20)))
+
+    assert asyncio.run(burst()) == ["value"] * 20
+    assert loader.calls == 1
+    assert cache.stats()["coalesced"] == 19
+
+def test_loads_are_not_shared_across_event_loops():
+    loader = CountingLoader(delay=0.05)
+    cache = TwoTierCache("loops", ttl=60)
+    results = []
+
+    def in_own_loop():
+        results.append(asyncio.run(cache.get_or_load("key", loader)))
+
+    threads = [threading.Thread(target=in_own_loop) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ["value", "value"]
+
+def test_cancelled_caller_does_not_cancel_the_shared_load():
+    loader = CountingLoader(delay=0.05)
+    cache = TwoTierCache("cancel", ttl=60)
+
+    async def run():
+        first = asyncio.ensure_future(cache.get_or_load("key", loader))
+        second = asyncio.ensure_future(cache.get_or_load("key", loader))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "value"
+    assert loader.calls == 1
+
+def test_stale_entries_are_served_while_refreshing(redis):
+    loader = CountingLoader(values=["old", "new"], delay=0.01)
+    # Fresh for no time at all, then usable stale for a minute
+    cache = TwoTierCache("stale", client=redis, ttl=0, stale_ttl=60)
+
+    async def run():
+        first = await cache.get_or_load("key", loader)
+        second = await cache.get_or_load("key", loader)
+        await asyncio.sleep(0.05)  # the background refresh completes
+        third = await cache.get_or_load("key", loader)
+        return first, second, third
+
+    assert asyncio.run(run()) == ("old", "old", "new")
+    assert cache.stats()["stale_served"] == 2
+
+def test_missing_values_are_cached_for_the_negative_ttl(redis):
+    loader = CountingLoader(values=[None])
+    cache = TwoTierCache("negative", client=redis, ttl=300, negative_ttl=30, stale_ttl=60)
+
+    assert asyncio.run(cache.get_or_load(7, loader)) is None
+    assert asyncio.run(TwoTierCache("negative", client=redis).get_or_load(7, loader)) is None
+    assert loader.calls == 1
+    assert redis.ttl("negative:7") == 30
+
+def test_failed_loads_reach_every_waiter_and_are_not_cached():
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("database unavailable")
+
+    cache = TwoTierCache("errors", ttl=60)
+
+    async def burst():
+        return await asyncio.gather(*(cache.get_or_load("key", failing) for _ in range(3)), return_exceptions=True)
+
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(burst()))
+    assert len(calls) == 1
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get_or_load("key", failing))
+    assert len(calls) == 2
+
+def test_invalidate_drops_both_tiers(redis):
+    loader = CountingLoader(values=["old", "new"])
+    cache = TwoTierCache("invalidate", client=redis, ttl=60)
+
+    assert asyncio.run(cache.get_or_load("key", loader)) == "old"
+    cache.invalidate("key")
+    assert redis.get("invalidate:key") is None
+    assert asyncio.run(cache.get_or_load("key", loader)) == "new"
+
+def test_local_tier_is_a_bounded_lru():
+    cache = TwoTierCache("lru", ttl=60, l1_size=2)
+    for key in ("a", "b"):
+        cache.set(key, key)
+    asyncio.run(cache.get_or_load("a", CountingLoader()))  # a is now most recent
+    cache.set("c", "c")
+
+    loader = CountingLoader(values=["reloaded"])
+    assert asyncio.run(cache.get_or_load("b", loader)) == "reloaded"
+    assert asyncio.run(cache.get_or_load("a", loader)) == "reloaded"  # evicted by b
+    assert cache.stats()["entries"] == 2
+
+@pytest.mark.parametrize("serializer, value", [
+    (PickleSerializer(), {"ids": (1, 2), "ratio": 0.5}),
+    (PydanticSerializer(Point), Point(x=1, y=2)),
+])
+def test_serializers_round_trip_through_redis(redis, serializer, value):
+    TwoTierCache("serialized", client=redis, serializer=serializer).set("key", value)
+    other = TwoTierCache("serialized", client=redis, serializer=serializer)
+    assert asyncio.run(other.get_or_load("key", CountingLoader(values=["unused"]))) == value
+
+def test_decorator_caches_by_key():
+    cache = TwoTierCache("decorated", ttl=60)
+
+    class Lookups:
+        def __init__(self):
+            self.calls = 0
+
+        @cached(cache, key=lambda self, user_id: f"user:{user_id}")
+        async def get(self, user_id: int):
+            self.calls += 1
+            return {"id": user_id}
+
+    lookups = Lookups()
+    assert asyncio.run(lookups.get(1)) == asyncio.run(lookups.get(1)) == {"id": 1}
+    assert asyncio.run(lookups.get(2)) == {"id": 2}
+    assert lookups.calls == 2
+    assert Lookups.get.cache is cache
@@ -0,0 +1,58 @@
+import os
+from datetime import datetime
+import pytest
+from sqlalchemy import create_engine
+from app.core.database import Base
+from app.core.pagination import encode_cursor, page_statement
+from app.models.user import User  # noqa: F401 - registers the table
+from app.models.video import Video
+from app.models.video_asset import VideoAsset  # noqa: F401 - registers the table
+from app.models.video_rendition import VideoRendition  # noqa: F401 - registers the table
+from app.services.video_queries import VideoQueries
+
+# Test database setup
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test_feed_indexes.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+
+queries = VideoQueries(None)  # only builds statements here
+CURSOR = encode_cursor(datetime(2026, 1, 1), 42)
+
+# (listing statement, index it must be served from)
+ACCESS_PATHS = {
+    "public feed": (queries.public_videos(), "ix_videos_public_feed"),
+    "public feed of one creator": (queries.public_videos(creator_id=7), "ix_videos_creator_feed"),
+    "own videos": (queries.user_videos(7), "ix_videos_creator_feed"),
+}
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+    if os.path.exists("test_feed_indexes.db"):
+        os.remove("test_feed_indexes.db")
+
+def query_plan(statement):
+    """SQLite's EXPLAIN QUERY PLAN detail lines for a statement"""
+    compiled = statement.compile(dialect=engine.dialect, compile_kwargs={"render_postcompile": True})
+    # The plan does not depend on the bound values
+    parameters = (None,) * len(compiled.positiontup)
+    with engine.connect() as conn:
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {compiled.string}", parameters).all()
+    return [row[-1] for row in rows]
+
+@pytest.mark.parametrize("path", ACCESS_PATHS)
+@pytest.mark.parametrize("position", [{}, {"cursor": CURSOR}, {"page": 3}], ids=["first", "cursor", "offset"])
+def test_feed_pages_are_read_in_index_order(path, position):
+    statement, index = ACCESS_PATHS[path]
+    plan = query_plan(page_statement(statement, Video.created_at, Video.id, 20, **position))
+
+    videos = [line for line in plan if " videos " in f"{line} "]
+    assert videos and all(f"USING INDEX {index}" in line for line in videos), plan
+    # The index already yields (created_at DESC, id DESC); no sort of the matches
+    assert not any("TEMP B-TREE" in line for line in plan), plan
+
+def test_cursor_pages_seek_into_the_index():
+    statement, index = ACCESS_PATHS["public feed"]
+    plan = query_plan(page_statement(statement, Video.created_at, Video.id, 20, cursor=CURSOR))
+    assert any(line.startswith(f"SEARCH videos USING INDEX {index} (created_at<?)") for line in plan), plan
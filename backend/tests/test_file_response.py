@@ -0,0 +1,137 @@
+import asyncio
+import os
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from app.core.file_response import RangeFileResponse, RangeNotSatisfiable, parse_range_header
+
+DATA = bytes(range(256)) * 40  # 10240 bytes with recognizable offsets
+
+@pytest.fixture(scope="module")
+def video_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("stream") / "video.mp4"
+    path.write_bytes(DATA)
+    return str(path)
+
+@pytest.fixture(scope="module")
+def client(video_path):
+    async def endpoint(request):
+        return RangeFileResponse(video_path, request.headers, media_type="video/mp4", method=request.method, chunk_size=1000)
+
+    app = Starlette(routes=[Route("/video", endpoint, methods=["GET", "HEAD"])])
+    return TestClient(app)
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-99", [(0, 99)]),
+    ("bytes=100-", [(100, 10239)]),
+    ("bytes=-500", [(9740, 10239)]),
+    ("bytes=-99999", [(0, 10239)]),
+    ("bytes=9000-99999", [(9000, 10239)]),
+    ("bytes=0-9, 5-19, 20-29, 100-109", [(0, 29), (100, 109)]),
+    ("bytes=20000-, 0-0", [(0, 0)]),
+    ("items=0-9", None),
+    ("bytes=abc-def", None),
+    ("bytes=100-50", None),
+])
+def test_parse_range_header(header, expected):
+    assert parse_range_header(header, len(DATA)) == expected
+
+@pytest.mark.parametrize("header", ["bytes=20000-", "bytes=10240-10300", "bytes=-0"])
+def test_parse_range_header_unsatisfiable(header):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range_header(header, len(DATA))
+
+def test_full_response_has_validators(client):
+    response = client.get("/video")
+    assert response.status_code == 200
+    assert response.content == DATA
+    assert response.headers["content-length"] == str(len(DATA))
+    assert response.headers["accept-ranges"] == "bytes"
+    assert response.headers["etag"].startswith('"')
+    assert "last-modified" in response.headers
+
+def test_single_and_suffix_ranges(client):
+    response = client.get("/video", headers={"Range": "bytes=1000-2999"})
+    assert response.status_code == 206
+    assert response.content == DATA[1000:3000]
+    assert response.headers["content-range"] == f"bytes 1000-2999/{len(DATA)}"
+
+    response = client.get("/video", headers={"Range": "bytes=-100"})
+    assert response.status_code == 206
+    assert response.content == DATA[-100:]
+    assert response.headers["content-range"] == f"bytes {len(DATA) - 100}-{len(DATA) - 1}/{len(DATA)}"
+
+def test_multi_range_is_multipart(client):
+    response = client.get("/video", headers={"Range": "bytes=0-9,500-509"})
+    assert response.status_code == 206
+    content_type = response.headers["content-type"]
+    assert content_type.startswith("multipart/byteranges; boundary=")
+    boundary = content_type.split("boundary=")[1].encode()
+    assert int(response.headers["content-length"]) == len(response.content)
+
+    parts = response.content.split(b"--" + boundary)
+    assert parts[-1] == b"--\r\n"
+    bodies = [part.split(b"\r\n\r\n", 1) for part in parts[1:-1]]
+    assert b"Content-Range: bytes 0-9/10240" in bodies[0][0]
+    assert bodies[0][1] == DATA[0:10] + b"\r\n"
+    assert b"Content-Range: bytes 500-509/10240" in bodies[1][0]
+    assert bodies[1][1] == DATA[500:510] + b"\r\n"
+
+def test_unsatisfiable_range_is_416(client):
+    response = client.get("/video", headers={"Range": "bytes=20000-30000"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(DATA)}"
+    assert response.content == b""
+
+def test_conditional_requests(client):
+    validators = client.get("/video").headers
+    etag, last_modified = validators["etag"], validators["last-modified"]
+
+    response = client.get("/video", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert client.get("/video", headers={"If-None-Match": f'W/{etag}, "other"'}).status_code == 304
+    assert client.get("/video", headers={"If-None-Match": '"stale"'}).status_code == 200
+    assert client.get("/video", headers={"If-Modified-Since": last_modified}).status_code == 304
+    assert client.get("/video", headers={"If-Modified-Since": "Thu, 01 Jan 1970 00:00:00 GMT"}).status_code == 200
+
+def test_if_range_only_honours_current_validators(client):
+    validators = client.get("/video").headers
+    etag, last_modified = validators["etag"], validators["last-modified"]
+
+    for current in (etag, last_modified):
+        response = client.get("/video", headers={"Range": "bytes=0-9", "If-Range": current})
+        assert response.status_code == 206
+        assert response.content == DATA[:10]
+
+    # The client's copy changed (or only has a weak tag): send the whole file
+    for stale in ('"stale"', f"W/{etag}", "Thu, 01 Jan 1970 00:00:00 GMT"):
+        response = client.get("/video", headers={"Range": "bytes=0-9", "If-Range": stale})
+        assert response.status_code == 200
+        assert response.content == DATA
+
+def test_head_sends_headers_only(client):
+    response = client.head("/video", headers={"Range": "bytes=0-99"})
+    assert response.status_code == 206
+    assert response.headers["content-length"] == "100"
+    assert response.content == b""
+
+def test_zero_copy_extension_is_used_when_offered(video_path):
+    response = RangeFileResponse(video_path, {"range": "bytes=100-199,-50"}, media_type="video/mp4")
+    messages = []
+
+    async def send(message):
+        if message["type"] == "http.response.zerocopysend":
+            # Resolve what the server would sendfile() so the body can be checked
+            message = {**message, "data": os.pread(message["file"], message["count"], message["offset"])}
+        messages.append(message)
+
+    scope = {"type": "http", "extensions": {"http.response.zerocopysend": {}}}
+    asyncio.run(response(scope, None, send))
+
+    zerocopy = [message for message in messages if message["type"] == "http.response.zerocopysend"]
+    assert [(message["offset"], message["count"]) for message in zerocopy] == [(100, 100), (len(DATA) - 50, 50)]
+    assert [message["data"] for message in zerocopy] == [DATA[100:200], DATA[-50:]]
+    assert messages[-1]["more_body"] is False
@@ -0,0 +1,156 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.follow_mirror import FollowMirror, follow_mirror
+from app.core.security import create_access_token
+from app.models.follow import Follow
+from app.models.user import User
+from app.services.follow_service import FollowService
+from tests.conftest import TestDatabase
+
+database = TestDatabase("test_follows.db")
+TestingSessionLocal, AsyncTestingSessionLocal = database.SessionLocal, database.AsyncSessionLocal
+
+@pytest.fixture
+def users():
+    """Five users as (id, auth headers) pairs"""
+    db = TestingSessionLocal()
+    created = [User(email=f"user{index}@example.com", username=f"user{index}", hashed_password="x") for index in range(5)]
+    db.add_all(created)
+    db.commit()
+    yield [(user.id, {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}) for user in created]
+    for model in (Follow, User):
+        db.query(model).delete()
+    db.commit()
+    db.close()
+
+def counts(user_id):
+    db = TestingSessionLocal()
+    user = db.get(User, user_id)
+    db.close()
+    return user.follower_count, user.following_count
+
+def follow(follower_id, followee_id, mirror=follow_mirror):
+    async def run():
+        async with AsyncTestingSessionLocal() as db:
+            return await FollowService(db, mirror).follow(follower_id, followee_id)
+    return asyncio.run(run())
+
+def test_follow_and_unfollow_keep_counts(users):
+    client = TestClient(app)
+    (creator, _), (fan, fan_headers), (other, other_headers) = users[:3]
+
+    assert client.post(f"/users/{creator}/follow", headers=fan_headers).json() == {
+        "user_id": creator, "following": True, "follower_count": 1
+    }
+    assert client.post(f"/users/{creator}/follow", headers=fan_headers).json()["follower_count"] == 1
+    assert client.post(f"/users/{creator}/follow", headers=other_headers).json()["follower_count"] == 2
+    assert client.post(f"/users/{other}/follow", headers=fan_headers).status_code == 200
+    assert counts(creator) == (2, 0)
+    assert counts(fan) == (0, 2)
+
+    assert client.delete(f"/users/{creator}/follow", headers=fan_headers).json() == {
+        "user_id": creator, "following": False, "follower_count": 1
+    }
+    assert client.delete(f"/users/{creator}/follow", headers=fan_headers).json()["follower_count"] == 1
+    assert counts(fan) == (0, 1)
+
+    profile = client.get(f"/users/{creator}").json()
+    assert (profile["follower_count"], profile["following_count"]) == (1, 0)
+    assert client.get("/auth/me", headers=fan_headers).json()["following_count"] == 1
+
+def test_cannot_follow_yourself_or_nobody(users):
+    client = TestClient(app)
+    (user_id, headers) = users[0]
+    assert client.post(f"/users/{user_id}/follow", headers=headers).status_code == 400
+    assert client.post("/users/999999/follow", headers=headers).status_code == 404
+    assert client.post(f"/users/{user_id}/follow").status_code == 403
+    assert counts(user_id) == (0, 0)
+
+def test_lookup_answers_a_whole_page_at_once(users):
+    client = TestClient(app)
+    (fan, headers), *creators = users
+    for creator, _ in creators[:2]:
+        follow(fan, creator)
+    ids = [creator for creator, _ in creators] + [creators[0][0]]
+
+    # The first lookup loads the mirror from the database; the rest are one SMISMEMBER
+    for _ in range(2):
+        response = client.get("/users/me/following/lookup", params={"ids": ids}, headers=headers)
+        assert response.json() == {"following": [creators[0][0], creators[1][0]]}
+    assert follow_mirror.client.sismember(follow_mirror.following_key(fan), creators[0][0])
+
+    # Later follows keep the loaded mirror current
+    follow(fan, creators[2][0])
+    response = client.get("/users/me/following/lookup", params={"ids": ids}, headers=headers)
+    assert creators[2][0] in response.json()["following"]
+    assert client.get("/users/me/following/lookup", params={"ids": list(range(1, 200))}, headers=headers).status_code == 422
+
+def test_follower_lists_page_newest_first(users):
+    client = TestClient(app)
+    (creator, _), *fans = users
+    for fan, _ in fans:
+        follow(fan, creator)
+    newest_first = [fan for fan, _ in reversed(fans)]
+
+    def all_pages(path):
+        ids, cursor = [], None
+        while True:
+            params = {"page_size": 3, **({"cursor": cursor} if cursor else {})}
+            page = client.get(path, params=params).json()
+            ids += [user["id"] for user in page["users"]]
+            cursor = page["next_cursor"]
+            if not page["has_next"]:
+                return ids
+
+    assert all_pages(f"/users/{creator}/followers") == newest_first
+    assert follow_mirror.client.zcard(follow_mirror.followers_key(creator)) == len(fans) + 1
+    assert all_pages(f"/users/{creator}/followers") == newest_first
+
+    # Unfollows leave the mirrored list too
+    client.delete(f"/users/{creator}/follow", headers=fans[1][1])
+    assert all_pages(f"/users/{creator}/followers") == [fan for fan in newest_first if fan != fans[1][0]]
+    assert all_pages(f"/users/{fans[0][0]}/following") == [creator]
+    assert client.get(f"/users/{creator}/followers", params={"cursor": "nope"}).status_code == 400
+
+def test_lookups_fall_back_to_the_database(users):
+    class DownRedis:
+        def __getattr__(self, name):
+            raise ConnectionError("Redis is down")
+
+    (fan, _), (creator, _), (other, _) = users[:3]
+    down = FollowMirror(DownRedis())
+    assert follow(fan, creator, mirror=down)
+    assert counts(creator) == (1, 0)
+
+    async def lookups(mirror):
+        async with AsyncTestingSessionLocal() as db:
+            service = FollowService(db, mirror)
+            followers = await service.followers(creator, 10)
+            return await service.following_among(fan, [creator, other]), [user.id for user in followers.items]
+
+    for mirror in (down, FollowMirror()):
+        assert asyncio.run(lookups(mirror)) == ({creator}, [fan])
+
+def test_mirrors_expire_however_often_they_are_read(users):
+    client = TestClient(app)
+    (creator, _), (fan, headers) = users[:2]
+    follow(fan, creator)
+    client.get("/users/me/following/lookup", params={"ids": [creator]}, headers=headers)
+    client.get(f"/users/{creator}/followers")
+    keys = (follow_mirror.following_key(fan), follow_mirror.followers_key(creator))
+    for key in keys:
+        follow_mirror.client.expire(key, 5)
+
+    # Neither reads nor later writes push back the expiry set by the load
+    for _ in range(3):
+        client.get("/users/me/following/lookup", params={"ids": [creator]}, headers=headers)
+        client.get(f"/users/{creator}/followers")
+    follow(fan, users[2][0])
+    follow(users[3][0], creator)
+    assert all(0 < follow_mirror.client.ttl(key) <= 5 for key in keys)
+
+    # A write to a mirror nobody has loaded still gives it an expiry
+    follow(users[4][0], users[3][0])
+    assert follow_mirror.client.ttl(follow_mirror.followers_key(users[3][0])) > 5
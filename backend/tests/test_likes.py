@@ -0,0 +1,169 @@
+import asyncio
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.like_counter import DIRTY_KEY, LikeCounter, like_counter
+from app.core.security import create_access_token
+from app.models.like import Like
+from app.models.user import User
+from app.models.video import Video
+from app.services.like_service import LikeService
+from tests.conftest import TestDatabase
+
+database = TestDatabase("test_likes.db")
+TestingSessionLocal, AsyncTestingSessionLocal = database.SessionLocal, database.AsyncSessionLocal
+
+@pytest.fixture
+def video():
+    db = TestingSessionLocal()
+    creator = User(email="creator@example.com", username="creator", hashed_password="x")
+    db.add(creator)
+    db.commit()
+    video = Video(
+        title="Liked",
+        filename="liked.mp4",
+        original_filename="liked.mp4",
+        file_size=1000,
+        duration=5.0,
+        width=640,
+        height=360,
+        format="mp4",
+        video_url="/static/videos/liked.mp4",
+        processing_status="completed",
+        creator_id=creator.id
+    )
+    db.add(video)
+    db.commit()
+    db.refresh(video)
+    db.close()
+    yield video
+    db = TestingSessionLocal()
+    for model in (Like, Video, User):
+        db.query(model).delete()
+    db.commit()
+    db.close()
+
+def create_users(count):
+    db = TestingSessionLocal()
+    users = [User(email=f"fan{index}@example.com", username=f"fan{index}", hashed_password="x") for index in range(count)]
+    db.add_all(users)
+    db.commit()
+    headers = [{"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"} for user in users]
+    db.close()
+    return headers
+
+def stored_like_count(video_id):
+    db = TestingSessionLocal()
+    count = db.get(Video, video_id).like_count
+    db.close()
+    return count
+
+def test_likes_are_counted_once_per_user(video):
+    client = TestClient(app)
+    first, second = create_users(2)
+
+    assert client.post(f"/videos/{video.id}/like", headers=first).json() == {
+        "video_id": video.id, "liked": True, "like_count": 1
+    }
+    assert client.post(f"/videos/{video.id}/like", headers=first).json()["like_count"] == 1
+    assert client.post(f"/videos/{video.id}/like", headers=second).json()["like_count"] == 2
+    assert client.delete(f"/videos/{video.id}/like", headers=first).json() == {
+        "video_id": video.id, "liked": False, "like_count": 1
+    }
+    assert client.delete(f"/videos/{video.id}/like", headers=first).json()["like_count"] == 1
+
+    # Nothing has reached the row yet; responses add the pending count
+    assert stored_like_count(video.id) == 0
+    assert client.get(f"/videos/{video.id}").json()["like_count"] == 1
+    # Likes drop the video's cached page
+    assert client.get(f"/videos/{video.id}").headers["X-Cache"] == "HIT"
+    client.post(f"/videos/{video.id}/like", headers=first)
+    assert client.get(f"/videos/{video.id}").json()["like_count"] == 2
+    client.delete(f"/videos/{video.id}/like", headers=first)
+    assert client.get(f"/videos/{video.id}").json()["like_count"] == 1
+
+    assert like_counter.flush(TestingSessionLocal) == 1
+    assert stored_like_count(video.id) == 1
+    assert like_counter.pending([video.id]) == {}
+    assert client.get("/videos/my-videos", headers=second).status_code == 200
+    assert client.get("/videos/?page_size=5&include_total=true").json()["videos"][0]["like_count"] == 1
+
+def test_only_visible_videos_can_be_liked(video):
+    (headers,) = create_users(1)
+    client = TestClient(app)
+    assert client.post("/videos/999999/like", headers=headers).status_code == 404
+    assert client.post(f"/videos/{video.id}/like").status_code == 403
+
+def test_concurrent_likes_on_one_video_are_all_counted(video):
+    create_users(40)
+    db = TestingSessionLocal()
+    user_ids = [user.id for user in db.query(User).filter(User.username.like("fan%"))]
+    db.close()
+
+    async def like(user_id):
+        async with AsyncTestingSessionLocal() as db:
+            return await LikeService(db).like(user_id, video.id)
+
+    async def like_all():
+        return await asyncio.gather(*(like(user_id) for user_id in user_ids))
+
+    assert all(asyncio.run(like_all()))
+    # Spread over the shards rather than one key
+    assert len(like_counter.client.keys(f"likes:{video.id}:*")) > 1
+    like_counter.flush(TestingSessionLocal)
+    assert stored_like_count(video.id) == 40
+
+def test_likes_during_a_flush_wait_for_the_next_one(video, monkeypatch):
+    counter = LikeCounter(fakeredis.FakeRedis(decode_responses=True), shards=1)
+    counter.increment(video.id, 3)
+    read_shards = counter._read_shards
+
+    def read_then_like(video_ids, take=False):
+        values = read_shards(video_ids, take)
+        counter.increment(video.id, 2)  # lands between taking the shards and the update
+        return values
+
+    monkeypatch.setattr(counter, "_read_shards", read_then_like)
+    counter.flush(TestingSessionLocal)
+    monkeypatch.undo()
+    assert stored_like_count(video.id) == 3
+    assert counter.pending([video.id]) == {video.id: 2}
+    counter.flush(TestingSessionLocal)
+    assert stored_like_count(video.id) == 5
+
+def test_failed_flush_keeps_the_deltas(video):
+    counter = LikeCounter(fakeredis.FakeRedis(decode_responses=True))
+    counter.increment(video.id, 4)
+
+    def broken_session():
+        raise RuntimeError("database unavailable")
+
+    with pytest.raises(RuntimeError):
+        counter.flush(broken_session)
+    assert counter.client.sismember(DIRTY_KEY, video.id)
+    assert counter.pending([video.id]) == {video.id: 4}
+    counter.flush(TestingSessionLocal)
+    assert stored_like_count(video.id) == 4
+
+def test_flushed_deltas_are_not_applied_again(video):
+    counter = LikeCounter(fakeredis.FakeRedis(decode_responses=True))
+    counter.increment(video.id, 4)
+    counter.flush(TestingSessionLocal)
+    assert counter.client.keys(f"likes:{video.id}:*") == []
+
+    # A video marked dirty again, e.g. by a flusher that died after its commit
+    counter.client.sadd(DIRTY_KEY, video.id)
+    assert counter.flush(TestingSessionLocal) == 0
+    assert stored_like_count(video.id) == 4
+
+def test_redis_outage_updates_the_row_directly(video, monkeypatch):
+    class DownRedis:
+        def __getattr__(self, name):
+            raise ConnectionError("Redis is down")
+
+    monkeypatch.setattr(like_counter, "client", DownRedis())
+    (headers,) = create_users(1)
+    response = TestClient(app).post(f"/videos/{video.id}/like", headers=headers)
+    assert response.json()["like_count"] == 1
+    assert stored_like_count(video.id) == 1
@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.main import app
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.core.security import create_access_token
+from app.models.user import User
+from app.models.video import Video
+from tests.conftest import TestDatabase
+
+database = TestDatabase("test_pagination.db")
+TestingSessionLocal = database.SessionLocal
+
+statements = []
+
+@event.listens_for(database.engine, "before_cursor_execute")
+@event.listens_for(database.async_engine.sync_engine, "before_cursor_execute")
+def record_statement(conn, cursor, statement, parameters, context, executemany):
+    statements.append(statement)
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(app)
+
+@pytest.fixture(scope="module")
+def feed(client):
+    """23 public videos, some sharing a timestamp, plus a private one; ids newest first"""
+    db = TestingSessionLocal()
+    creator = User(email="pages@example.com", username="pages", hashed_password="x")
+    db.add(creator)
+    db.commit()
+    start = datetime(2026, 1, 1, 12, 0, 0)
+    for index in range(24):
+        db.add(Video(
+            title=f"Video {index}",
+            filename=f"{index}.mp4",
+            original_filename=f"{index}.mp4",
+            file_size=1000,
+            duration=5.0,
+            width=640,
+            height=360,
+            format="mp4",
+            video_url=f"/static/videos/{index}.mp4",
+            processing_status="completed",
+            is_public=index != 5,
+            creator_id=creator.id,
+            # Every group of three shares a timestamp, so ties are broken by id
+            created_at=start + timedelta(minutes=index // 3)
+        ))
+    db.commit()
+    rows = db.query(Video).filter(Video.is_public == True).order_by(Video.created_at.desc(), Video.id.desc()).all()
+    expected = [video.id for video in rows]
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(creator.id)})}"}
+    db.close()
+    return expected, headers
+
+def test_cursor_round_trip():
+    created_at = datetime(2026, 1, 1, 12, 30, 15, 123456)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+    for token in ("not-a-cursor", "", encode_cursor(created_at, 42)[:-3]):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(token)
+
+def test_cursor_walk_visits_every_video_once(client, feed):
+    expected, _ = feed
+    seen, cursor, pages = [], None, 0
+    while True:
+        params = {"page_size": 5, **({"cursor": cursor} if cursor else {})}
+        del statements[:]
+        body = client.get("/videos/", params=params).json()
+        # One videos query per page: no count, and the cursor seeks instead of skipping rows
+        video_queries = [statement for statement in statements if "FROM videos" in statement]
+        assert len(video_queries) == 1
+        assert "count(" not in video_queries[0].lower()
+        assert ("(videos.created_at, videos.id) <" in video_queries[0]) == (cursor is not None)
+        assert body["total"] is None
+        seen.extend(video["id"] for video in body["videos"])
+        pages += 1
+        if not body["has_next"]:
+            assert body["next_cursor"] is None
+            break
+        cursor = body["next_cursor"]
+    assert seen == expected
+    assert pages == 5
+
+def test_page_numbers_still_work(client, feed):
+    expected, _ = feed
+    body = client.get("/videos/", params={"page": 3, "page_size": 5, "include_total": True}).json()
+    assert [video["id"] for video in body["videos"]] == expected[10:15]
+    assert body["total"] == len(expected)
+    assert body["has_next"]
+    # A page-number client can switch to the cursor from any page
+    body = client.get("/videos/", params={"page_size": 5, "cursor": body["next_cursor"]}).json()
+    assert [video["id"] for video in body["videos"]] == expected[15:20]
+
+    body = client.get("/videos/", params={"page": 5, "page_size": 5}).json()
+    assert [video["id"] for video in body["videos"]] == expected[20:]
+    assert not body["has_next"]
+
+def test_my_videos_and_bad_cursor(client, feed):
+    expected, headers = feed
+    body = client.get("/videos/my-videos", headers=headers, params={"page_size": 30, "include_total": True}).json()
+    # The owner also sees their private video
+    assert body["total"] == len(expected) + 1
+    assert not body["has_next"]
+
+    assert client.get("/videos/", params={"cursor": "garbage"}).status_code == 400
+
+def test_creators_are_loaded_with_the_page(client, feed):
+    db = TestingSessionLocal()
+    for index in range(3):
+        creator = User(email=f"other{index}@example.com", username=f"other{index}", hashed_password="x")
+        db.add(creator)
+        db.flush()
+        db.add(Video(
+            title=f"Other {index}",
+            filename=f"other{index}.mp4",
+            original_filename=f"other{index}.mp4",
+            file_size=1000,
+            duration=5.0,
+            width=640,
+            height=360,
+            format="mp4",
+            video_url=f"/static/videos/other{index}.mp4",
+            processing_status="completed",
+            creator_id=creator.id,
+            created_at=datetime(2027, 1, 1, 0, index)
+        ))
+    db.commit()
+    db.close()
+
+    del statements[:]
+    body = client.get("/videos/", params={"page_size": 10}).json()
+    assert [video["creator_username"] for video in body["videos"][:4]] == ["other2", "other1", "other0", "pages"]
+    # The page and every creator on it come back in a single statement
+    assert len(statements) == 1
@@ -0,0 +1,124 @@
+import asyncio
+import hashlib
+import threading
+import time
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from app.main import app
+from app.core.passwords import (
+    LEGACY_SALT,
+    Argon2Scheme,
+    BcryptScheme,
+    PasswordHasher,
+    PasswordHashPool,
+    password_pool,
+)
+from app.models.user import User
+from tests.conftest import TestDatabase
+
+database = TestDatabase("test_passwords.db")
+TestingSessionLocal = database.SessionLocal
+
+def stored_hash(email):
+    db = TestingSessionLocal()
+    hashed = db.query(User).filter(User.email == email).one().hashed_password
+    db.close()
+    return hashed
+
+@pytest.mark.parametrize("scheme", [
+    BcryptScheme(rounds=4),
+    Argon2Scheme(time_cost=1, memory_cost=1024, parallelism=1),
+])
+def test_hashes_round_trip(scheme):
+    hasher = PasswordHasher(scheme)
+    hashed = hasher.hash("correct horse")
+    assert hashed.startswith(scheme.prefixes)
+    assert hasher.verify("correct horse", hashed)
+    assert not hasher.verify("wrong horse", hashed)
+    assert not hasher.needs_rehash(hashed)
+
+def test_passwords_past_the_bcrypt_limit_are_accepted():
+    hasher = PasswordHasher(BcryptScheme(rounds=4))
+    password = "x" * 100
+    assert hasher.verify(password, hasher.hash(password))
+
+def test_older_schemes_verify_and_need_rehash():
+    legacy = hashlib.sha256(("secret" + LEGACY_SALT).encode()).hexdigest()
+    cheap = PasswordHasher(BcryptScheme(rounds=4)).hash("secret")
+    argon2 = PasswordHasher(Argon2Scheme(time_cost=1, memory_cost=1024, parallelism=1)).hash("secret")
+    hasher = PasswordHasher(BcryptScheme(rounds=5))
+    for hashed in (legacy, cheap, argon2):
+        assert hasher.verify("secret", hashed)
+        assert not hasher.verify("other", hashed)
+        assert hasher.needs_rehash(hashed)
+
+def test_legacy_hash_is_upgraded_at_login():
+    db = TestingSessionLocal()
+    legacy = hashlib.sha256(("oldpassword" + LEGACY_SALT).encode()).hexdigest()
+    db.add(User(email="legacy@example.com", username="legacy", hashed_password=legacy))
+    db.commit()
+    db.close()
+    client = TestClient(app)
+    credentials = {"email": "legacy@example.com", "password": "oldpassword"}
+
+    assert client.post("/auth/login", json=credentials).status_code == 200
+    upgraded = stored_hash("legacy@example.com")
+    assert upgraded.startswith("$2b$04$")
+
+    # The new hash is left alone on the next login
+    assert client.post("/auth/login", json=credentials).status_code == 200
+    assert stored_hash("legacy@example.com") == upgraded
+    assert client.post("/auth/login", json={**credentials, "password": "wrong"}).status_code == 401
+
+def test_pool_turns_callers_away_when_full():
+    pool = PasswordHashPool(workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def run():
+        busy = asyncio.ensure_future(pool.run(release.wait))
+        await asyncio.sleep(0.01)
+        assert pool.pending() == 1
+        with pytest.raises(HTTPException) as rejected:
+            await pool.run(time.sleep, 0)
+        release.set()
+        await busy
+        return rejected.value
+
+    rejected = asyncio.run(run())
+    pool.shutdown()
+    assert rejected.status_code == 503
+    assert rejected.headers["Retry-After"] == "1"
+    assert pool.pending() == 0
+
+def test_hashing_does_not_block_the_event_loop():
+    pool = PasswordHashPool(workers=2)
+    hasher = PasswordHasher(BcryptScheme(rounds=10))
+    ticks = []
+
+    async def ticker(done):
+        while not done.is_set():
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.005)
+
+    async def run():
+        done = asyncio.Event()
+        ticking = asyncio.ensure_future(ticker(done))
+        await asyncio.gather(pool.run(hasher.hash, "a"), pool.run(hasher.hash, "b"))
+        done.set()
+        await ticking
+
+    asyncio.run(run())
+    pool.shutdown()
+    # A hash at this cost takes tens of milliseconds; the loop kept ticking throughout
+    assert len(ticks) >= 3
+    assert max(b - a for a, b in zip(ticks, ticks[1:])) < 0.02
+
+def test_login_rejected_while_hash_pool_is_full(monkeypatch):
+    TestClient(app).post("/auth/register", json={
+        "email": "busy@example.com", "username": "busy", "password": "testpassword123"
+    })
+    monkeypatch.setattr(password_pool, "max_pending", 0)
+    response = TestClient(app).post("/auth/login", json={"email": "busy@example.com", "password": "testpassword123"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
@@ -0,0 +1,91 @@
+import asyncio
+import time
+from datetime import timedelta
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.main import app
+from app.core.security import TokenCache, create_access_token, load_principal, token_cache
+from app.models.user import User
+from app.schemas.user import UserUpdate
+from app.services.user_service import UserService
+from tests.conftest import TestDatabase
+
+database = TestDatabase("test_principal_cache.db")
+TestingSessionLocal, AsyncTestingSessionLocal = database.SessionLocal, database.AsyncSessionLocal
+
+user_queries = []
+
+@event.listens_for(database.async_engine.sync_engine, "before_cursor_execute")
+def record_query(conn, cursor, statement, parameters, context, executemany):
+    if "FROM users" in statement:
+        user_queries.append(statement)
+
+client = TestClient(app)
+
+def register_and_login(email, username):
+    client.post("/auth/register", json={"email": email, "username": username, "password": "testpassword123"})
+    response = client.post("/auth/login", json={"email": email, "password": "testpassword123"})
+    return response.json()["access_token"]
+
+def run_user_service(method, *args):
+    async def run():
+        async with AsyncTestingSessionLocal() as db:
+            return await getattr(UserService(db), method)(*args)
+    return asyncio.run(run())
+
+def test_authenticated_requests_reuse_the_verified_user():
+    token = register_and_login("cached@example.com", "cacheduser")
+    headers = {"Authorization": f"Bearer {token}"}
+    user_id = int(client.get("/auth/me", headers=headers).json()["id"])
+
+    del user_queries[:]
+    for _ in range(5):
+        assert client.get("/videos/my-videos", headers=headers).status_code == 200
+    assert user_queries == []
+
+    # Updating the user drops the cached row
+    run_user_service("update_user", user_id, UserUpdate(full_name="Renamed"))
+    del user_queries[:]
+    assert client.get("/videos/my-videos", headers=headers).status_code == 200
+    assert len(user_queries) == 1
+
+def test_concurrent_loads_share_one_query_on_their_own_session():
+    db = TestingSessionLocal()
+    user = User(email="shared@example.com", username="shareduser", hashed_password="x")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    db.close()
+
+    async def load_together():
+        return await asyncio.gather(*(load_principal(user.id, database.async_engine) for _ in range(5)))
+
+    del user_queries[:]
+    principals = asyncio.run(load_together())
+    assert [principal.username for principal in principals] == ["shareduser"] * 5
+    assert len(user_queries) == 1
+
+def test_deleted_user_is_rejected():
+    token = register_and_login("deleted@example.com", "deleteduser")
+    headers = {"Authorization": f"Bearer {token}"}
+    user_id = int(client.get("/auth/me", headers=headers).json()["id"])
+    assert client.get("/videos/my-videos", headers=headers).status_code == 200
+
+    assert run_user_service("delete_user", user_id)
+    assert client.get("/videos/my-videos", headers=headers).status_code == 401
+
+def test_expired_token_is_rejected():
+    token = create_access_token({"sub": "1"}, expires_delta=timedelta(seconds=-1))
+    assert client.get("/videos/my-videos", headers={"Authorization": f"Bearer {token}"}).status_code == 401
+    assert token_cache.get(token) is None
+
+def test_token_cache_is_a_bounded_lru_until_expiry():
+    cache = TokenCache(max_size=2)
+    cache.put("a", "1", time.time() + 60)
+    cache.put("b", "2", time.time() + 60)
+    assert cache.get("a") == "1"  # a is now most recent
+    cache.put("c", "3", time.time() + 60)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == ("1", None, "3")
+
+    cache.put("expired", "4", time.time() - 1)
+    assert cache.get("expired") is None
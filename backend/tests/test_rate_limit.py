@@ -0,0 +1,122 @@
+import asyncio
+import time
+import fakeredis
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api import videos
+from app.core import rate_limit as rate_limit_module
+from app.core.job_queue import InMemoryJobQueue, VideoJob, get_job_queue
+from app.core.rate_limit import RateLimit, RateLimiter, rate_limit, require_upload_capacity
+from app.core.security import create_access_token
+from app.core.upload_sessions import InMemoryUploadSessionStore, get_upload_session_store
+from app.models.user import User
+from app.schemas.user import Principal
+from tests.conftest import TestDatabase
+
+job_queue = InMemoryJobQueue()
+sessions = InMemoryUploadSessionStore()
+
+database = TestDatabase("test_rate_limit.db", overrides={
+    get_job_queue: lambda: job_queue,
+    get_upload_session_store: lambda: sessions
+})
+TestingSessionLocal = database.SessionLocal
+
+@pytest.fixture
+def limits(monkeypatch):
+    """Route limits small enough to exhaust in a test"""
+    monkeypatch.setitem(rate_limit_module.ROUTE_LIMITS, "auth", RateLimit(2, 60))
+    monkeypatch.setitem(rate_limit_module.ROUTE_LIMITS, "upload", RateLimit(1, 3600))
+    return rate_limit_module.ROUTE_LIMITS
+
+def test_parse_limits():
+    limit = RateLimit.parse("10/minute burst 20")
+    assert (limit.count, limit.period, limit.burst) == (10, 60, 20)
+    assert RateLimit.parse("5/second").burst == 5
+    assert RateLimit.parse("off") is None
+    with pytest.raises(ValueError):
+        RateLimit.parse("10/fortnight")
+
+def test_redis_buckets_are_shared_between_processes():
+    redis = fakeredis.FakeRedis(decode_responses=True)
+    first, second = RateLimiter(redis), RateLimiter(redis)
+    limit = RateLimit(2, 60)
+
+    assert first.take("auth", "ip:1", limit).allowed
+    assert second.take("auth", "ip:1", limit).allowed
+    refused = first.take("auth", "ip:1", limit)
+    assert not refused.allowed
+    assert refused.retry_after == pytest.approx(30, abs=0.5)
+    # Other clients and scopes have their own buckets
+    assert second.take("auth", "ip:2", limit).allowed
+    assert second.take("stream", "ip:1", limit).allowed
+    assert 0 < redis.pttl("ratelimit:auth:ip:1") <= 121000
+
+def test_buckets_refill_over_time():
+    limiter = RateLimiter()
+    limit = RateLimit(50, 1, burst=1)
+    assert limiter.take("stream", "ip:1", limit).allowed
+    assert not limiter.take("stream", "ip:1", limit).allowed
+    time.sleep(0.03)
+    assert limiter.take("stream", "ip:1", limit).allowed
+
+def test_redis_outage_limits_in_process():
+    class DownRedis:
+        def register_script(self, script):
+            def run(keys, args):
+                raise ConnectionError("Redis is down")
+            return run
+
+    limiter = RateLimiter(DownRedis())
+    limit = RateLimit(1, 60)
+    assert limiter.take("auth", "ip:1", limit).allowed
+    assert not limiter.take("auth", "ip:1", limit).allowed
+
+def test_login_is_limited_per_client_ip(limits):
+    client = TestClient(app)
+    credentials = {"email": "nobody@example.com", "password": "wrong"}
+    assert [client.post("/auth/login", json=credentials).status_code for _ in range(2)] == [401, 401]
+
+    refused = client.post("/auth/login", json=credentials)
+    assert refused.status_code == 429
+    assert refused.headers["retry-after"] == "30"
+    # Login, registration and password resets draw on the same bucket
+    assert client.post("/auth/request-password-reset", json={"email": "nobody@example.com"}).status_code == 429
+
+def test_uploads_are_limited_per_user(limits):
+    limited = rate_limit("upload", per_user=True)
+    alice, bob = Principal(id=1, username="alice", is_active=True), Principal(id=2, username="bob", is_active=True)
+
+    asyncio.run(limited(current_user=alice))
+    with pytest.raises(HTTPException) as refused:
+        asyncio.run(limited(current_user=alice))
+    assert refused.value.status_code == 429
+    assert int(refused.value.headers["Retry-After"]) == 3600
+    asyncio.run(limited(current_user=bob))
+
+def test_uploads_are_shed_when_the_queue_is_backed_up(monkeypatch, tmp_path):
+    monkeypatch.setattr(rate_limit_module, "UPLOAD_MAX_QUEUE_DEPTH", 2)
+    monkeypatch.setattr(videos.video_service, "incoming_dir", str(tmp_path))
+    db = TestingSessionLocal()
+    user = User(email="uploader@example.com", username="uploader", hashed_password="x")
+    db.add(user)
+    db.commit()
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"}
+    db.close()
+    client = TestClient(app)
+    upload = {"filename": "clip.mp4", "size": 1000, "title": "Clip"}
+
+    job_queue.enqueue(VideoJob(video_id=1))
+    assert client.post("/videos/uploads", headers=headers, json=upload).status_code == 201
+
+    job_queue.enqueue(VideoJob(video_id=2))
+    shed = client.post("/videos/uploads", headers=headers, json=upload)
+    assert shed.status_code == 503
+    assert shed.headers["retry-after"] == "30"
+
+    with pytest.raises(HTTPException):
+        asyncio.run(require_upload_capacity(job_queue))
+    monkeypatch.setattr(rate_limit_module, "UPLOAD_MAX_QUEUE_DEPTH", 0)
+    asyncio.run(require_upload_capacity(job_queue))
@@ -0,0 +1,165 @@
+import asyncio
+import threading
+import fakeredis
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.main import app
+from app.core.response_cache import ResponseCache, response_cache
+from app.core import security
+from app.core.security import create_access_token
+from app.models.user import User
+from app.models.video import Video
+from app.services.video_service import VideoProcessingService
+from tests.conftest import TestDatabase
+
+database = TestDatabase("test_response_cache.db")
+TestingSessionLocal, AsyncTestingSessionLocal = database.SessionLocal, database.AsyncSessionLocal
+
+video_queries = []
+
+@event.listens_for(database.async_engine.sync_engine, "before_cursor_execute")
+def record_query(conn, cursor, statement, parameters, context, executemany):
+    if "FROM videos" in statement:
+        video_queries.append(statement)
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = fakeredis.FakeRedis()
+    monkeypatch.setattr(response_cache, "client", fake)
+    return fake
+
+@pytest.fixture
+def creator():
+    db = TestingSessionLocal()
+    user = User(email="cached@example.com", username="cached", hashed_password="x")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    db.close()
+    yield user
+    db = TestingSessionLocal()
+    db.query(Video).delete()
+    db.query(User).delete()
+    db.commit()
+    db.close()
+
+def create_video(creator_id, title="Cached"):
+    db = TestingSessionLocal()
+    video = Video(
+        title=title,
+        filename="cached.mp4",
+        original_filename="cached.mp4",
+        file_size=1000,
+        duration=5.0,
+        width=640,
+        height=360,
+        format="mp4",
+        video_url="/static/videos/cached.mp4",
+        processing_status="completed",
+        creator_id=creator_id
+    )
+    db.add(video)
+    db.commit()
+    db.refresh(video)
+    db.close()
+    return video
+
+def test_keys_ignore_parameter_order_and_unset_values():
+    cache = ResponseCache()
+    assert cache.key("/videos/", page=1, page_size=20, cursor=None) == cache.key("/videos/", page_size=20, page=1)
+    assert cache.key("/videos/", page=1) != cache.key("/videos/", page=2)
+
+def test_expiry_is_jittered_within_bounds(redis):
+    cache = ResponseCache(client=redis, ttl=100, jitter=0.2)
+    for index in range(50):
+        cache.set(f"response:/videos/{index}?", b"{}", ["feed"])
+    ttls = {redis.ttl(f"response:/videos/{index}?") for index in range(50)}
+    assert all(100 <= ttl <= 120 for ttl in ttls)
+    assert len(ttls) > 1
+
+def test_public_pages_are_served_from_the_cache(redis, creator):
+    client = TestClient(app)
+    video = create_video(creator.id)
+    before = response_cache.stats()
+
+    for path in ("/videos/?page_size=5", f"/videos/{video.id}"):
+        first = client.get(path)
+        count = len(video_queries)
+        second = client.get(path)
+        assert (first.headers["x-cache"], second.headers["x-cache"]) == ("MISS", "HIT")
+        assert second.content == first.content
+        assert len(video_queries) == count
+
+    after = response_cache.stats()
+    assert (after["hits"] - before["hits"], after["misses"] - before["misses"]) == (2, 2)
+    # Parsed parameters key the page, not the raw query string
+    assert client.get("/videos/?page=1&page_size=05").headers["x-cache"] == "HIT"
+
+def test_changes_invalidate_the_pages_showing_a_video(redis, creator):
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(creator.id)})}"}
+    video = create_video(creator.id)
+    pages = ["/videos/", f"/videos/?creator_id={creator.id}", f"/videos/{video.id}"]
+    for path in pages:
+        assert client.get(path).status_code == 200
+
+    assert client.put(f"/videos/{video.id}", headers=headers, json={"title": "Renamed"}).status_code == 200
+    assert client.get("/videos/").json()["videos"][0]["title"] == "Renamed"
+    assert client.get(f"/videos/{video.id}").json()["title"] == "Renamed"
+
+    assert client.put(f"/videos/{video.id}", headers=headers, json={"is_public": False}).status_code == 200
+    assert client.get("/videos/").json()["videos"] == []
+    assert client.get(f"/videos/?creator_id={creator.id}").json()["videos"] == []
+    assert client.get(f"/videos/{video.id}").status_code == 404
+
+    other = create_video(creator.id, title="Other")
+    assert client.get(f"/videos/{other.id}").status_code == 200
+    service = VideoProcessingService()
+    service.storage_service.use_cloud = False
+
+    async def delete():
+        async with AsyncTestingSessionLocal() as db:
+            return await service.delete_video(other.id, creator.id, db)
+    assert asyncio.run(delete())
+    assert client.get(f"/videos/{other.id}").status_code == 404
+
+def test_redis_outage_falls_back_to_the_database(monkeypatch, creator):
+    class DownRedis:
+        def __getattr__(self, name):
+            raise ConnectionError("Redis is down")
+
+    monkeypatch.setattr(response_cache, "client", DownRedis())
+    create_video(creator.id)
+    response = TestClient(app).get("/videos/")
+    assert response.status_code == 200
+    assert response.json()["videos"][0]["title"] == "Cached"
+
+def test_redis_calls_stay_off_the_event_loop(monkeypatch, creator):
+    threads = set()
+
+    class RecordingRedis:
+        def __init__(self):
+            self.redis = fakeredis.FakeRedis()
+
+        def __getattr__(self, name):
+            threads.add(threading.current_thread().name)
+            return getattr(self.redis, name)
+
+    monkeypatch.setattr(response_cache, "client", RecordingRedis())
+    video = create_video(creator.id)
+    client = TestClient(app)
+    assert client.get("/videos/").status_code == 200
+    assert client.get(f"/videos/{video.id}").status_code == 200
+    assert threads == {"AnyIO worker thread"}
+
+def test_metrics_require_the_scraper_token(monkeypatch):
+    client = TestClient(app)
+    assert client.get("/metrics").status_code == 404
+
+    monkeypatch.setattr(security, "METRICS_TOKEN", "scrape-me")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-me"})
+    assert response.status_code == 200
+    assert "hit_rate" in response.json()["response_cache"]
@@ -0,0 +1,159 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.api import videos
+from app.core.job_queue import InMemoryJobQueue, get_job_queue
+from app.core.security import create_access_token
+from app.core.upload_sessions import InMemoryUploadSessionStore, get_upload_session_store, merge_ranges
+from app.models.user import User
+from app.models.video import Video
+from tests.test_video_service import create_test_clip, video_bytes
+from tests.conftest import TestDatabase
+
+job_queue = InMemoryJobQueue()
+sessions = InMemoryUploadSessionStore()
+
+database = TestDatabase("test_resumable.db", overrides={
+    get_job_queue: lambda: job_queue,
+    get_upload_session_store: lambda: sessions
+})
+TestingSessionLocal = database.SessionLocal
+
+@pytest.fixture(scope="module")
+def client(tmp_path_factory):
+    original_incoming_dir = videos.video_service.incoming_dir
+    videos.video_service.incoming_dir = str(tmp_path_factory.mktemp("incoming"))
+    yield TestClient(app)
+    videos.video_service.incoming_dir = original_incoming_dir
+
+@pytest.fixture(scope="module")
+def users(client):
+    db = TestingSessionLocal()
+    owner = User(email="resumable@example.com", username="resumable", hashed_password="x")
+    other = User(email="other@example.com", username="other", hashed_password="x")
+    db.add_all([owner, other])
+    db.commit()
+    headers = [{"Authorization": f"Bearer {create_access_token({'sub': str(user.id)})}"} for user in (owner, other)]
+    db.close()
+    return headers
+
+def start_upload(client, headers, size, filename="clip.mp4"):
+    response = client.post(
+        "/videos/uploads",
+        headers=headers,
+        json={"title": "Resumed", "description": "Sent in pieces", "filename": filename, "size": size}
+    )
+    assert response.status_code == 201
+    return response.json()
+
+def put_chunk(client, headers, upload_id, data, start, size):
+    end = start + len(data) - 1
+    return client.put(
+        f"/videos/uploads/{upload_id}",
+        headers={**headers, "Content-Range": f"bytes {start}-{end}/{size}"},
+        content=data
+    )
+
+def test_merge_ranges():
+    assert merge_ranges([(10, 19), (0, 4), (5, 9), (30, 39), (35, 45)]) == [(0, 19), (30, 45)]
+
+def test_chunks_out_of_order_and_in_parallel(client, users):
+    owner, _ = users
+    data = video_bytes(100 * 1024 + 123)
+    status = start_upload(client, owner, len(data))
+    upload_id = status["upload_id"]
+    assert status["received"] == [] and not status["complete"]
+
+    chunk_size = 16 * 1024
+    offsets = list(range(0, len(data), chunk_size))
+    random.Random(7).shuffle(offsets)
+    # Leave one chunk out, as if the connection dropped
+    missing = offsets.pop()
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        responses = list(pool.map(
+            lambda start: put_chunk(client, owner, upload_id, data[start:start + chunk_size], start, len(data)),
+            offsets
+        ))
+    assert all(response.status_code == 200 for response in responses)
+
+    status = client.get(f"/videos/uploads/{upload_id}", headers=owner).json()
+    assert not status["complete"]
+    assert status["received_bytes"] == len(data) - len(data[missing:missing + chunk_size])
+    assert client.post(f"/videos/uploads/{upload_id}/complete", headers=owner).status_code == 409
+
+    # Resume: send only what the server reports as missing
+    response = put_chunk(client, owner, upload_id, data[missing:missing + chunk_size], missing, len(data))
+    assert response.json()["complete"]
+    assert response.json()["received"] == [[0, len(data) - 1]]
+
+    depth = job_queue.depth()
+    response = client.post(f"/videos/uploads/{upload_id}/complete", headers=owner)
+    assert response.status_code == 200
+    assert response.json()["processing_status"] == "pending"
+    assert job_queue.depth() == depth + 1
+
+    db = TestingSessionLocal()
+    video = db.query(Video).filter(Video.id == response.json()["video_id"]).first()
+    db.close()
+    assert video.file_size == len(data)
+    with open(video.source_path, "rb") as f:
+        assert f.read() == data
+    # The session is gone once the upload has been handed over
+    assert client.get(f"/videos/uploads/{upload_id}", headers=owner).status_code == 404
+
+def test_rejects_bad_chunks(client, users):
+    owner, other = users
+    upload_id = start_upload(client, owner, 1000)["upload_id"]
+
+    # Body shorter than the declared range is not recorded
+    response = client.put(
+        f"/videos/uploads/{upload_id}",
+        headers={**owner, "Content-Range": "bytes 500-999/1000"},
+        content=b"x" * 100
+    )
+    assert response.status_code == 400
+    assert put_chunk(client, owner, upload_id, b"x" * 10, 995, 1000).status_code == 416
+    assert put_chunk(client, owner, upload_id, b"x" * 10, 0, 2000).status_code == 416
+    assert client.put(f"/videos/uploads/{upload_id}", headers=owner, content=b"x").status_code == 400
+    assert client.get(f"/videos/uploads/{upload_id}", headers=owner).json()["received"] == []
+
+    # Sessions are private to the uploader
+    assert put_chunk(client, other, upload_id, b"x" * 10, 0, 1000).status_code == 404
+    assert client.delete(f"/videos/uploads/{upload_id}", headers=owner).status_code == 200
+    assert client.get(f"/videos/uploads/{upload_id}", headers=owner).status_code == 404
+
+def test_rejects_unsupported_uploads_up_front(client, users):
+    owner, _ = users
+    response = client.post(
+        "/videos/uploads",
+        headers=owner,
+        json={"title": "Too big", "filename": "clip.mp4", "size": videos.video_service.max_file_size + 1}
+    )
+    assert response.status_code == 400
+    response = client.post(
+        "/videos/uploads", headers=owner, json={"title": "Wrong type", "filename": "clip.avi", "size": 10}
+    )
+    assert response.status_code == 400
+
+def test_first_chunk_header_is_validated(client, users, tmp_path):
+    owner, _ = users
+    # Not a video at all: rejected on the first chunk and the session is dropped
+    upload_id = start_upload(client, owner, 4096)["upload_id"]
+    response = put_chunk(client, owner, upload_id, b"%PDF-1.7" + b"x" * 4088, 0, 4096)
+    assert response.status_code == 400
+    assert client.get(f"/videos/uploads/{upload_id}", headers=owner).status_code == 404
+
+    # Too long, and only detectable once assembled because moov trails the media data
+    path = str(tmp_path / "long.mp4")
+    create_test_clip(path, fps=10, frames=150)
+    with open(path, "rb") as f:
+        data = f.read()
+    upload_id = start_upload(client, owner, len(data))["upload_id"]
+    half = len(data) // 2
+    assert put_chunk(client, owner, upload_id, data[half:], half, len(data)).status_code == 200
+    assert put_chunk(client, owner, upload_id, data[:half], 0, len(data)).status_code == 200
+    response = client.post(f"/videos/uploads/{upload_id}/complete", headers=owner)
+    assert response.status_code == 400
+    assert "exceeds maximum allowed duration" in response.json()["detail"]
@@ -0,0 +1,103 @@
+import os
+import pytest
+from starlette.applications import Starlette
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from app.core import file_response
+from app.core.file_response import RangeFileResponse
+from app.core.metrics import metrics
+from app.core.video_cache import HotVideoCache
+
+DATA = bytes(range(256)) * 40  # 10240 bytes with recognizable offsets
+
+def write_file(path, data):
+    path.write_bytes(data)
+    return str(path)
+
+def cache_counters():
+    local = metrics.snapshot()["local"]
+    return {name: local.get(f"video_cache.{name}", 0) for name in ("hit", "miss", "eviction")}
+
+def load(cache, path):
+    stat = os.stat(path)
+    return cache.load(path, stat.st_size, stat.st_mtime_ns)
+
+def lookup(cache, path):
+    stat = os.stat(path)
+    return cache.get(path, stat.st_size, stat.st_mtime_ns)
+
+def test_lru_eviction_stays_within_budget(tmp_path):
+    cache = HotVideoCache(max_bytes=3 * 1000, max_file_bytes=1000)
+    paths = [write_file(tmp_path / f"{index}.mp4", bytes([index]) * 1000) for index in range(4)]
+    before = cache_counters()
+
+    for path in paths[:3]:
+        assert lookup(cache, path) is None
+        assert bytes(load(cache, path)) == open(path, "rb").read()
+    # Touch the oldest so the second file becomes least recently used
+    assert lookup(cache, paths[0]) is not None
+    load(cache, paths[3])
+
+    assert cache.stats()["bytes"] == 3000
+    assert lookup(cache, paths[1]) is None
+    assert all(lookup(cache, path) is not None for path in (paths[0], paths[2], paths[3]))
+    after = cache_counters()
+    assert after["miss"] - before["miss"] == 4
+    assert after["hit"] - before["hit"] == 4
+    assert after["eviction"] - before["eviction"] == 1
+
+def test_oversized_and_changed_files_are_not_served(tmp_path):
+    cache = HotVideoCache(max_bytes=10000, max_file_bytes=100)
+    large = write_file(tmp_path / "large.mp4", b"x" * 101)
+    assert load(cache, large) is None
+    assert cache.stats()["entries"] == 0
+
+    path = write_file(tmp_path / "clip.mp4", b"a" * 50)
+    load(cache, path)
+    write_file(tmp_path / "clip.mp4", b"b" * 60)
+    # The replaced file no longer matches the cached stat
+    assert lookup(cache, path) is None
+    assert bytes(load(cache, path)) == b"b" * 60
+    assert cache.stats()["bytes"] == 60
+
+def test_invalidate_keeps_in_flight_views_readable(tmp_path):
+    cache = HotVideoCache(max_bytes=len(DATA), max_file_bytes=len(DATA))
+    path = write_file(tmp_path / "clip.mp4", DATA)
+    view = load(cache, path)
+
+    cache.invalidate(path)
+    assert lookup(cache, path) is None
+    assert cache.stats() == {"entries": 0, "bytes": 0, "max_bytes": len(DATA)}
+    assert bytes(view[100:200]) == DATA[100:200]
+
+@pytest.fixture
+def cached_client(tmp_path):
+    path = write_file(tmp_path / "video.mp4", DATA)
+    cache = HotVideoCache(max_bytes=len(DATA), max_file_bytes=len(DATA))
+
+    async def endpoint(request):
+        return RangeFileResponse(
+            path, request.headers, media_type="video/mp4", method=request.method, chunk_size=1000, cache=cache
+        )
+
+    app = Starlette(routes=[Route("/video", endpoint, methods=["GET", "HEAD"])])
+    return TestClient(app), cache, path
+
+def test_ranges_are_served_from_memory(cached_client, monkeypatch):
+    client, cache, path = cached_client
+    assert client.get("/video").content == DATA
+    assert cache.stats()["entries"] == 1
+
+    # Later requests never open the file
+    def fail(*args, **kwargs):
+        raise AssertionError("file opened on a cache hit")
+
+    monkeypatch.setattr(file_response.anyio, "open_file", fail)
+    response = client.get("/video", headers={"Range": "bytes=1000-2999"})
+    assert response.status_code == 206
+    assert response.content == DATA[1000:3000]
+
+    response = client.get("/video", headers={"Range": "bytes=0-9,-10"})
+    assert response.status_code == 206
+    assert DATA[:10] in response.content and DATA[-10:] in response.content
+    assert int(response.headers["content-length"]) == len(response.content)
@@ -0,0 +1,196 @@
+import asyncio
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from fastapi import UploadFile
+from app.core.video_cache import video_cache
+from app.models.user import User
+from app.models.video import Video
+from app.models.video_asset import VideoAsset
+from app.schemas.video import VideoCreate
+from app.services.media_processing import OpenCVTranscoder
+from app.services.video_service import VideoProcessingService
+from tests.conftest import TestDatabase
+from tests.test_video_service import create_test_clip
+
+database = TestDatabase("test_dedup.db")
+TestingSessionLocal, AsyncTestingSessionLocal = database.SessionLocal, database.AsyncSessionLocal
+
+class CountingTranscoder(OpenCVTranscoder):
+    """OpenCV transcoder that records how often it actually runs"""
+
+    def __init__(self):
+        super().__init__("mp4v")  # avc1 is not available in every OpenCV build
+        self.calls = 0
+
+    def transcode(self, *args, **kwargs):
+        self.calls += 1
+        return super().transcode(*args, **kwargs)
+
+@pytest.fixture
+def db():
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+
+@pytest.fixture
+def creator(db):
+    user = User(email="dedup@example.com", username="dedupuser", hashed_password="x")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    yield user
+    db.query(Video).delete()
+    db.query(VideoAsset).delete()
+    db.query(User).delete()
+    db.commit()
+
+@pytest.fixture
+def service(tmp_path):
+    # Run stages on a thread so the counting transcoder is shared with the test
+    service = VideoProcessingService(executor=ThreadPoolExecutor(max_workers=1), transcoder=CountingTranscoder())
+    service.fast_path = False
+    service.hls_ladder = []
+    service.incoming_dir = str(tmp_path / "incoming")
+    service.storage_service.use_cloud = False
+    service.storage_service.local_video_dir = str(tmp_path / "videos")
+    service.storage_service.local_thumbnail_dir = str(tmp_path / "thumbnails")
+    os.makedirs(service.storage_service.local_video_dir)
+    os.makedirs(service.storage_service.local_thumbnail_dir)
+    return service
+
+@pytest.fixture
+def clip_bytes(tmp_path):
+    path = str(tmp_path / "clip.mp4")
+    create_test_clip(path)
+    with open(path, "rb") as f:
+        return f.read()
+
+def upload(service, data, creator, db, title="Clip"):
+    """Upload on an async session, as the API does; returns the video as db sees it"""
+    async def run():
+        async with AsyncTestingSessionLocal() as session:
+            file = UploadFile(file=io.BytesIO(data), filename="clip.mp4")
+            return (await service.create_pending_video(file, VideoCreate(title=title), creator.id, session)).id
+    video_id = asyncio.run(run())
+    db.expire_all()
+    return db.get(Video, video_id)
+
+def delete(service, video, creator, db):
+    async def run():
+        async with AsyncTestingSessionLocal() as session:
+            return await service.delete_video(video.id, creator.id, session)
+    deleted = asyncio.run(run())
+    db.expire_all()
+    return deleted
+
+def stored_files(service):
+    storage = service.storage_service
+    return sorted(os.listdir(storage.local_video_dir) + os.listdir(storage.local_thumbnail_dir))
+
+def test_duplicate_upload_reuses_processed_asset(service, clip_bytes, creator, db):
+    first = upload(service, clip_bytes, creator, db)
+    assert first.processing_status == "pending"
+    first = asyncio.run(service.process_pending_video(first, db))
+    assert service.transcoder.calls == 1
+    assert first.asset.ref_count == 1
+    files = stored_files(service)
+
+    second = upload(service, clip_bytes, creator, db, title="Repost")
+
+    # Completed straight away from the existing asset, with no new transcode or copy
+    assert second.processing_status == "completed"
+    assert second.source_path is None
+    assert second.content_hash == first.content_hash
+    assert (second.video_url, second.thumbnail_url) == (first.video_url, first.thumbnail_url)
+    assert (second.width, second.height, second.duration) == (first.width, first.height, first.duration)
+    assert service.transcoder.calls == 1
+    assert stored_files(service) == files
+    assert os.listdir(service.incoming_dir) == []
+    db.refresh(first.asset)
+    assert first.asset.ref_count == 2
+
+def test_queued_duplicate_attaches_instead_of_transcoding(service, clip_bytes, creator, db):
+    # Both copies arrive before either has been processed
+    first = upload(service, clip_bytes, creator, db)
+    second = upload(service, clip_bytes, creator, db)
+    assert second.processing_status == "pending"
+
+    asyncio.run(service.process_pending_video(first, db))
+    second = asyncio.run(service.process_pending_video(second, db))
+
+    assert service.transcoder.calls == 1
+    assert second.asset_id == first.asset_id
+    assert second.asset.ref_count == 2
+
+def test_deletion_is_reference_counted(service, clip_bytes, creator, db):
+    first = asyncio.run(service.process_pending_video(upload(service, clip_bytes, creator, db), db))
+    second = upload(service, clip_bytes, creator, db)
+    asset_id = first.asset_id
+    files = stored_files(service)
+    assert len(files) == 2
+    video_path = os.path.join(service.storage_service.local_video_dir, first.filename)
+    stat = os.stat(video_path)
+    assert video_cache.load(video_path, stat.st_size, stat.st_mtime_ns) is not None
+
+    assert delete(service, first, creator, db)
+    # Soft deletion drops the bytes from memory even though the file stays
+    assert video_cache.get(video_path, stat.st_size, stat.st_mtime_ns) is None
+    # The repost still plays from the shared files
+    assert stored_files(service) == files
+    assert db.query(VideoAsset).filter(VideoAsset.id == asset_id).one().ref_count == 1
+
+    assert delete(service, second, creator, db)
+    assert stored_files(service) == []
+    assert db.query(VideoAsset).filter(VideoAsset.id == asset_id).first() is None
+
+    # The same content uploaded again after full deletion is processed afresh
+    third = upload(service, clip_bytes, creator, db)
+    assert third.processing_status == "pending"
+
+def test_concurrent_duplicate_keeps_a_single_copy(service, clip_bytes, creator, db, monkeypatch):
+    first = upload(service, clip_bytes, creator, db)
+    second = upload(service, clip_bytes, creator, db)
+    asyncio.run(service.process_pending_video(first, db))
+    files = stored_files(service)
+
+    # Simulate the second worker starting before the first registered the asset
+    real_find_asset = service.find_asset
+    lookups = []
+
+    def find_asset_after_first_lookup(content_hash, db):
+        lookups.append(content_hash)
+        return real_find_asset(content_hash, db) if len(lookups) > 1 else None
+
+    monkeypatch.setattr(service, "find_asset", find_asset_after_first_lookup)
+    second = asyncio.run(service.process_pending_video(second, db))
+
+    assert service.transcoder.calls == 2
+    assert second.asset_id == first.asset_id
+    assert second.asset.ref_count == 2
+    # The losing worker's uploaded copy was removed again
+    assert stored_files(service) == files
+
+def test_deletion_during_processing_registers_no_asset(service, clip_bytes, creator, db, monkeypatch):
+    video = upload(service, clip_bytes, creator, db)
+    video_id = video.id
+
+    # The owner deletes the video after it was transcoded but before it is saved
+    real_package_hls = service.package_hls
+
+    async def delete_then_package(*args):
+        async with AsyncTestingSessionLocal() as session:
+            assert await service.delete_video(video_id, creator.id, session)
+        return await real_package_hls(*args)
+
+    monkeypatch.setattr(service, "package_hls", delete_then_package)
+    asyncio.run(service.process_pending_video(video, db))
+
+    assert service.transcoder.calls == 1
+    assert db.query(VideoAsset).count() == 0
+    db.expire_all()
+    assert db.get(Video, video_id).asset_id is None
+    # Neither the new output nor the staged upload is left behind
+    assert stored_files(service) == []
+    assert os.listdir(service.incoming_dir) == []
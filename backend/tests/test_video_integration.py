@@ -4,17 +4,22 @@ import tempfile
 import os
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool
 from app.main import app
-from app.core.database import get_db, Base
+from app.core.database import get_async_db, get_db, Base
 from app.models.user import User
 from app.models.video import Video
 from app.core.security import get_password_hash
+from app.core.job_queue import InMemoryJobQueue, get_job_queue
 
 # Test database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+AsyncTestingSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 def override_get_db():
     try:
@@ -23,7 +28,16 @@ def override_get_db():
     finally:
         db.close()
 
+async def override_get_async_db():
+    async with AsyncTestingSessionLocal() as db:
+        yield db
+
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
+
+# Uploads are queued for the workers; keep the queue in-process for tests
+job_queue = InMemoryJobQueue()
+app.dependency_overrides[get_job_queue] = lambda: job_queue
 
 @pytest.fixture(scope="module")
 def client():
@@ -109,7 +123,8 @@ def test_video_upload_success(client, auth_headers):
         data = response.json()
         assert "video_id" in data
         assert data["message"] == "Video uploaded successfully"
-        assert data["processing_status"] == "completed"
+        assert data["processing_status"] == "pending"
+        assert job_queue.depth() >= 1
         
     finally:
         if os.path.exists(video_path):
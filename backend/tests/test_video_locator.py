@@ -0,0 +1,142 @@
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.main import app
+from app.core.security import create_access_token
+from app.models.user import User
+from app.models.video import Video
+from app.services.video_locator import VideoLocator, video_locator
+from app.services.video_service import VideoProcessingService
+from tests.conftest import TestDatabase
+
+database = TestDatabase("test_locator.db")
+TestingSessionLocal, AsyncTestingSessionLocal = database.SessionLocal, database.AsyncSessionLocal
+
+queries = []
+
+@event.listens_for(database.engine, "before_cursor_execute")
+@event.listens_for(database.async_engine.sync_engine, "before_cursor_execute")
+def record_query(conn, cursor, statement, parameters, context, executemany):
+    queries.append(statement)
+
+class FakeRedis:
+    """The few Redis string commands the locator uses, kept in a dict"""
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.ttls[key] = ex
+
+    def delete(self, *keys):
+        for key in keys:
+            self.values.pop(key, None)
+
+@pytest.fixture
+def redis(monkeypatch):
+    fake = FakeRedis()
+    monkeypatch.setattr(video_locator.cache, "client", fake)
+    video_locator.clear()
+    yield fake
+    video_locator.clear()
+
+@pytest.fixture
+def creator():
+    db = TestingSessionLocal()
+    user = User(email="locator@example.com", username="locator", hashed_password="x")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    db.close()
+    yield user
+    db = TestingSessionLocal()
+    db.query(Video).delete()
+    db.query(User).delete()
+    db.commit()
+    db.close()
+
+def create_video(creator_id, **fields):
+    db = TestingSessionLocal()
+    fields = {"processing_status": "completed", **fields}
+    video = Video(
+        title="Located",
+        filename="located.mp4",
+        original_filename="located.mp4",
+        file_size=1000,
+        duration=5.0,
+        width=640,
+        height=360,
+        format="mp4",
+        video_url="/static/videos/located.mp4",
+        thumbnail_url="/static/thumbnails/located.jpg",
+        creator_id=creator_id,
+        **fields
+    )
+    db.add(video)
+    db.commit()
+    db.refresh(video)
+    db.close()
+    return video
+
+def new_locator(redis):
+    return VideoLocator(client=redis, session_factory=AsyncTestingSessionLocal)
+
+def resolve(locator, video_id):
+    return asyncio.run(locator.resolve(video_id))
+
+def test_resolves_through_local_then_shared_tiers(redis, creator):
+    video = create_video(creator.id)
+    locator = new_locator(redis)
+
+    location = resolve(locator, video.id)
+    assert (location.filename, location.thumbnail_url) == ("located.mp4", "/static/thumbnails/located.jpg")
+    assert redis.ttls[f"video_location:{video.id}"] == locator.ttl
+
+    count = len(queries)
+    assert resolve(locator, video.id) == location
+    # Another process has an empty local map but shares Redis
+    assert resolve(new_locator(redis), video.id) == location
+    assert len(queries) == count
+
+def test_unresolvable_ids_are_cached_briefly(redis, creator):
+    private = create_video(creator.id, is_public=False)
+    pending = create_video(creator.id, processing_status="pending")
+    locator = new_locator(redis)
+
+    for video_id in (private.id, pending.id, 999999):
+        assert resolve(locator, video_id) is None
+        assert redis.ttls[f"video_location:{video_id}"] == locator.negative_ttl
+    count = len(queries)
+    assert all(resolve(new_locator(redis), video_id) is None for video_id in (private.id, pending.id, 999999))
+    assert len(queries) == count
+
+def test_update_and_delete_invalidate(redis, creator):
+    client = TestClient(app)
+    headers = {"Authorization": f"Bearer {create_access_token({'sub': str(creator.id)})}"}
+    video = create_video(creator.id)
+
+    assert client.get(f"/videos/{video.id}/thumbnail").status_code == 200
+    count = len(queries)
+    for _ in range(5):
+        assert client.get(f"/videos/{video.id}/thumbnail").status_code == 200
+    assert len(queries) == count
+
+    assert client.put(f"/videos/{video.id}", headers=headers, json={"is_public": False}).status_code == 200
+    assert client.get(f"/videos/{video.id}/thumbnail").status_code == 404
+    assert client.put(f"/videos/{video.id}", headers=headers, json={"is_public": True}).status_code == 200
+    assert client.get(f"/videos/{video.id}/thumbnail").status_code == 200
+
+    service = VideoProcessingService()
+    service.storage_service.use_cloud = False
+
+    async def delete():
+        async with AsyncTestingSessionLocal() as db:
+            return await service.delete_video(video.id, creator.id, db)
+    assert asyncio.run(delete())
+    assert client.get(f"/videos/{video.id}/thumbnail").status_code == 404
@@ -0,0 +1,232 @@
+import os
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.core.job_queue import InMemoryJobQueue, VideoJob
+from app.models.user import User
+from app.models.video import Video
+from app.services.video_service import InvalidVideoError
+from app.services.video_worker import VideoWorker, VideoWorkerPool
+
+# Test database setup
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test_queue.db"
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+class FakeVideoService:
+    """Stands in for VideoProcessingService so no real transcoding happens"""
+
+    def __init__(self, failures=0, invalid=False):
+        self.failures = failures
+        self.invalid = invalid
+        self.calls = 0
+        self.discarded = []
+
+    async def process_pending_video(self, video, db):
+        self.calls += 1
+        if self.invalid:
+            raise InvalidVideoError("Video duration (30.0s) exceeds maximum allowed duration (10.0s)")
+        if self.calls <= self.failures:
+            raise RuntimeError("storage temporarily unavailable")
+        video.processing_status = "completed"
+        video.source_path = None
+        db.commit()
+        return video
+
+    def discard_source(self, source_path):
+        self.discarded.append(source_path)
+
+@pytest.fixture(scope="module", autouse=True)
+def setup_database():
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+    if os.path.exists("test_queue.db"):
+        os.remove("test_queue.db")
+
+@pytest.fixture(scope="module")
+def creator():
+    db = TestingSessionLocal()
+    user = User(email="queue@example.com", username="queueuser", hashed_password="x")
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    db.close()
+    return user
+
+def create_pending_video(creator_id, **fields):
+    db = TestingSessionLocal()
+    fields = {"processing_status": "pending", **fields}
+    video = Video(
+        title="Queued",
+        filename="queued.mp4",
+        original_filename="queued.mp4",
+        file_size=10,
+        duration=0.0,
+        width=0,
+        height=0,
+        format="mp4",
+        video_url="",
+        source_path="uploads/incoming/queued.mp4",
+        creator_id=creator_id,
+        **fields
+    )
+    db.add(video)
+    db.commit()
+    db.refresh(video)
+    db.close()
+    return video.id
+
+def get_video(video_id):
+    db = TestingSessionLocal()
+    video = db.query(Video).filter(Video.id == video_id).first()
+    db.close()
+    return video
+
+def test_queue_delivers_and_acks_jobs():
+    queue = InMemoryJobQueue()
+    queue.enqueue(VideoJob(video_id=1))
+    queue.enqueue(VideoJob(video_id=2))
+    assert queue.depth() == 2
+
+    first = queue.dequeue("worker-a", timeout=0.1)
+    assert first.video_id == 1
+    queue.ack("worker-a", first)
+
+    assert queue.dequeue("worker-a", timeout=0.1).video_id == 2
+    assert queue.dequeue("worker-a", timeout=0.1) is None
+
+def test_queue_delays_retries():
+    queue = InMemoryJobQueue()
+    queue.retry(VideoJob(video_id=1, attempts=1), delay=60)
+    assert queue.depth() == 1
+    assert queue.dequeue("worker-a", timeout=0.1) is None
+
+    queue.retry(VideoJob(video_id=2, attempts=1), delay=0)
+    assert queue.dequeue("worker-a", timeout=0.1).video_id == 2
+
+def test_queue_recovers_jobs_from_dead_workers():
+    queue = InMemoryJobQueue(heartbeat_ttl=0)
+    queue.enqueue(VideoJob(video_id=7))
+    job = queue.dequeue("crashed-worker", timeout=0.1)
+    assert job is not None
+    assert queue.depth() == 0
+
+    # The worker never acked and its heartbeat has lapsed
+    assert queue.recover_stale() == 1
+    assert queue.dequeue("healthy-worker", timeout=0.1).video_id == 7
+
+def test_worker_completes_video(creator):
+    video_id = create_pending_video(creator.id)
+    service = FakeVideoService()
+    worker = VideoWorker(InMemoryJobQueue(), session_factory=TestingSessionLocal, video_service=service)
+
+    worker.handle_job(VideoJob(video_id=video_id))
+
+    video = get_video(video_id)
+    assert video.processing_status == "completed"
+    assert video.processing_attempts == 1
+
+def test_worker_retries_transient_failures(creator):
+    video_id = create_pending_video(creator.id)
+    queue = InMemoryJobQueue()
+    service = FakeVideoService(failures=1)
+    worker = VideoWorker(queue, session_factory=TestingSessionLocal, video_service=service, retry_delay=0)
+
+    worker.handle_job(VideoJob(video_id=video_id))
+    video = get_video(video_id)
+    assert video.processing_status == "pending"
+    assert "temporarily unavailable" in video.processing_error
+
+    retry = queue.dequeue("worker-a", timeout=0.1)
+    assert retry.attempts == 1
+    worker.handle_job(retry)
+    assert get_video(video_id).processing_status == "completed"
+
+def test_worker_fails_after_max_attempts(creator):
+    video_id = create_pending_video(creator.id)
+    queue = InMemoryJobQueue()
+    service = FakeVideoService(failures=10)
+    worker = VideoWorker(queue, session_factory=TestingSessionLocal, video_service=service, max_attempts=2, retry_delay=0)
+
+    worker.handle_job(VideoJob(video_id=video_id, attempts=1))
+
+    video = get_video(video_id)
+    assert video.processing_status == "failed"
+    assert queue.depth() == 0
+    assert service.discarded == ["uploads/incoming/queued.mp4"]
+
+def test_worker_does_not_retry_invalid_videos(creator):
+    video_id = create_pending_video(creator.id)
+    queue = InMemoryJobQueue()
+    worker = VideoWorker(queue, session_factory=TestingSessionLocal, video_service=FakeVideoService(invalid=True))
+
+    worker.handle_job(VideoJob(video_id=video_id))
+
+    video = get_video(video_id)
+    assert video.processing_status == "failed"
+    assert "exceeds maximum allowed duration" in video.processing_error
+    assert queue.depth() == 0
+
+def test_worker_waits_out_another_workers_lease(creator):
+    # Redelivered while the first worker, whose heartbeat lapsed, is still transcoding
+    started_at = datetime.now(timezone.utc) - timedelta(seconds=10)
+    video_id = create_pending_video(creator.id, processing_status="processing", processing_started_at=started_at)
+    queue = InMemoryJobQueue()
+    service = FakeVideoService()
+    worker = VideoWorker(queue, session_factory=TestingSessionLocal, video_service=service, lease_timeout=60)
+
+    worker.handle_job(VideoJob(video_id=video_id))
+
+    assert service.calls == 0
+    assert get_video(video_id).processing_status == "processing"
+    # Kept for when the lease runs out, without using up an attempt
+    assert queue.depth() == 1
+    assert queue.dequeue("worker-a", timeout=0.1) is None
+    run_at, job = queue._delayed[0]
+    assert 45 < run_at - time.time() <= 50
+    assert job.attempts == 0
+
+def test_worker_takes_over_an_expired_lease(creator):
+    started_at = datetime.now(timezone.utc) - timedelta(seconds=120)
+    video_id = create_pending_video(creator.id, processing_status="processing", processing_started_at=started_at)
+    queue = InMemoryJobQueue()
+    worker = VideoWorker(queue, session_factory=TestingSessionLocal, video_service=FakeVideoService(), lease_timeout=60)
+
+    worker.handle_job(VideoJob(video_id=video_id))
+
+    video = get_video(video_id)
+    assert video.processing_status == "completed"
+    assert video.processing_attempts == 1
+    assert queue.depth() == 0
+
+def test_worker_pool_drains_queue_and_stops(creator, monkeypatch):
+    video_ids = [create_pending_video(creator.id) for _ in range(3)]
+    queue = InMemoryJobQueue()
+    for video_id in video_ids:
+        queue.enqueue(VideoJob(video_id=video_id))
+
+    # Workers are built inside start(); give them the fake service and test database
+    service = FakeVideoService()
+    original_init = VideoWorker.__init__
+
+    def patched_init(self, queue, worker_id=None, **kwargs):
+        original_init(self, queue, worker_id=worker_id, session_factory=TestingSessionLocal, video_service=service)
+
+    monkeypatch.setattr(VideoWorker, "__init__", patched_init)
+    pool = VideoWorkerPool(concurrency=2, queue=queue)
+    pool.start()
+    workers = list(pool.workers)
+
+    for _ in range(50):
+        if all(get_video(video_id).processing_status == "completed" for video_id in video_ids):
+            break
+        time.sleep(0.1)
+    pool.stop(timeout=5)
+
+    assert all(get_video(video_id).processing_status == "completed" for video_id in video_ids)
+    assert not any(worker.is_alive() for worker in workers)
+    assert pool.recovery is None
@@ -0,0 +1,437 @@
+import asyncio
+import hashlib
+import io
+import os
+import struct
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+import httpx
+import numpy as np
+import pytest
+from fastapi import HTTPException, UploadFile
+from app.main import app
+from app.core.executors import StageTimeoutError, run_blocking, shutdown_media_executor
+from app.services import header_probe, media_processing, mp4
+from app.services.media_processing import FFmpegTranscoder, OpenCVTranscoder
+from app.services.video_service import VideoProcessingService, InvalidVideoError
+from config import FFMPEG_BINARY
+
+def create_test_clip(path, width=320, height=240, fps=10, frames=30, fourcc="mp4v"):
+    """Write a small synthetic clip with a moving circle"""
+    out = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*fourcc), fps, (width, height))
+    for frame_num in range(frames):
+        frame = np.zeros((height, width, 3), dtype=np.uint8)
+        cv2.circle(frame, (int(frame_num * width / frames), height // 2), 20, (0, 255, 0), -1)
+        out.write(frame)
+    out.release()
+
+def video_bytes(size):
+    """A real WebM header padded with filler to the requested size; enough to pass header checks"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "clip.webm")
+        create_test_clip(path, fourcc="VP80", frames=10)
+        with open(path, "rb") as f:
+            data = f.read()
+    return data + os.urandom(max(size - len(data), 0))
+
+class CountingStream(io.BytesIO):
+    """BytesIO that records how much of the upload was actually consumed"""
+
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+def test_spool_upload_copies_in_chunks():
+    service = VideoProcessingService()
+    service.chunk_size = 1024
+    data = video_bytes(10 * 1024 + 17)
+    upload = UploadFile(file=io.BytesIO(data), filename="clip.mp4")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        destination = os.path.join(temp_dir, "clip.mp4")
+        written, content_hash = asyncio.run(service.spool_upload(upload, destination))
+
+        assert written == len(data)
+        assert content_hash == hashlib.sha256(data).hexdigest()
+        with open(destination, 'rb') as f:
+            assert f.read() == data
+
+def test_spool_upload_aborts_oversized_upload_early():
+    service = VideoProcessingService()
+    service.chunk_size = 1024
+    service.max_file_size = 4 * 1024
+    stream = CountingStream(video_bytes(64 * 1024))
+    upload = UploadFile(file=stream, filename="clip.mp4")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(service.spool_upload(upload, os.path.join(temp_dir, "clip.mp4")))
+
+    assert exc_info.value.status_code == 413
+    # Reading stops one chunk past the limit instead of consuming the whole body
+    assert stream.bytes_read <= service.max_file_size + service.chunk_size
+
+def test_spool_upload_rejects_non_video_on_first_chunk():
+    service = VideoProcessingService()
+    service.chunk_size = 1024
+    stream = CountingStream(b"%PDF-1.7\n" + os.urandom(64 * 1024))
+    upload = UploadFile(file=stream, filename="clip.mp4")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(service.spool_upload(upload, os.path.join(temp_dir, "clip.mp4")))
+
+    assert exc_info.value.status_code == 400
+    assert stream.bytes_read == service.chunk_size
+
+def test_spool_upload_rejects_long_video_from_header():
+    service = VideoProcessingService()
+    service.chunk_size = 256
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # WebM carries its duration ahead of the frames
+        source = os.path.join(temp_dir, "long.webm")
+        create_test_clip(source, fps=10, frames=150, fourcc="VP80")
+        with open(source, "rb") as f:
+            stream = CountingStream(f.read())
+        upload = UploadFile(file=stream, filename="long.webm")
+
+        with pytest.raises(HTTPException) as exc_info:
+            asyncio.run(service.spool_upload(upload, os.path.join(temp_dir, "spooled.webm")))
+
+    assert exc_info.value.status_code == 400
+    assert "exceeds maximum allowed duration" in exc_info.value.detail
+    assert stream.bytes_read < len(stream.getvalue()) // 2
+
+@pytest.mark.parametrize("fourcc, extension", [("mp4v", "mp4"), ("VP80", "webm")])
+@pytest.mark.parametrize("chunk_size", [1, 100, 64 * 1024])
+def test_header_validator_reads_duration_and_size(fourcc, extension, chunk_size):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, f"clip.{extension}")
+        create_test_clip(path, width=320, height=240, fps=10, frames=30, fourcc=fourcc)
+        with open(path, "rb") as f:
+            data = f.read()
+
+    validator = header_probe.HeaderValidator(["mp4", "webm", "mov"], max_duration=10.0, max_dimension=4096)
+    for offset in range(0, len(data), chunk_size):
+        validator.feed(data[offset:offset + chunk_size])
+    validator.finish()
+
+    # OpenCV's MP4 has moov after mdat, which is skipped rather than buffered
+    assert validator.container == extension
+    assert validator.done
+    assert validator.info["duration"] == pytest.approx(3.0)
+    assert (validator.info["width"], validator.info["height"]) == (320, 240)
+
+def test_header_validator_rejects_absurd_resolution_and_wrong_container():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "clip.webm")
+        create_test_clip(path, fourcc="VP80", frames=10)
+        with open(path, "rb") as f:
+            data = f.read()
+
+    validator = header_probe.HeaderValidator(["mp4", "webm", "mov"], max_duration=10.0, max_dimension=256)
+    with pytest.raises(InvalidVideoError, match="320x240"):
+        validator.feed(data)
+
+    # A real WebM is still refused when only MP4/MOV are allowed, whatever it is named
+    with pytest.raises(InvalidVideoError, match="Unsupported video container"):
+        header_probe.HeaderValidator(["mp4", "mov"], max_duration=10.0, max_dimension=4096).feed(data)
+
+def test_sniff_container():
+    assert header_probe.sniff_container(b"\x00\x00\x00\x20ftypisom\x00\x00\x02\x00") == "mp4"
+    assert header_probe.sniff_container(b"\x00\x00\x00\x14ftypqt  \x00\x00\x00\x00") == "mov"
+    assert header_probe.sniff_container(b"\x1a\x45\xdf\xa3\x9f\x42\x86\x81\x01\x42\xf7\x81") == "webm"
+    assert header_probe.sniff_container(b"RIFF\x00\x00\x00\x00AVI LIST") is None
+
+def test_probe_and_transcode_collects_media_info_in_one_pass(monkeypatch):
+    # Run stages on a thread so the patched VideoCapture is visible to them
+    # avc1 is not available in every OpenCV build
+    service = VideoProcessingService(executor=ThreadPoolExecutor(max_workers=1), transcoder=OpenCVTranscoder("mp4v"))
+    opened = []
+    original_capture = cv2.VideoCapture
+    monkeypatch.setattr(cv2, "VideoCapture", lambda path: opened.append(path) or original_capture(path))
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, "source.mp4")
+        output = os.path.join(temp_dir, "optimized.mp4")
+        thumbnail = os.path.join(temp_dir, "thumb.jpg")
+        create_test_clip(source, width=1920, height=1080, fps=10, frames=30)
+
+        media_info = asyncio.run(service.probe_and_transcode(source, output, thumbnail))
+
+        assert opened == [source]
+        assert media_info.duration == pytest.approx(3.0)
+        assert (media_info.width, media_info.height) == (1920, 1080)
+        assert (media_info.output_width, media_info.output_height) == (1280, 720)
+        assert media_info.fps == pytest.approx(10)
+        assert media_info.codec in ("mp4v", "FMP4")  # backends name MPEG-4 Part 2 differently
+        assert media_info.frame_count == 30
+        mp4.validate_faststart(output)
+        assert os.path.getsize(thumbnail) > 0
+
+def test_probe_and_transcode_rejects_long_videos_before_decoding():
+    service = VideoProcessingService(transcoder=OpenCVTranscoder("mp4v"))
+    service.max_duration = 1.0
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, "source.mp4")
+        output = os.path.join(temp_dir, "optimized.mp4")
+        create_test_clip(source, fps=10, frames=30)
+
+        with pytest.raises(InvalidVideoError):
+            asyncio.run(service.probe_and_transcode(source, output, os.path.join(temp_dir, "thumb.jpg")))
+        assert not os.path.exists(output)
+
+def test_event_loop_stays_responsive_while_processing():
+    """/health keeps answering quickly while several uploads are being transcoded"""
+    service = VideoProcessingService(transcoder=OpenCVTranscoder("mp4v"))
+    service.fast_path = False
+    concurrent_uploads = 4
+
+    async def measure_health_latency(jobs):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            tasks = [asyncio.create_task(service.probe_and_transcode(*job)) for job in jobs]
+            latencies = []
+            while not all(task.done() for task in tasks):
+                start = time.perf_counter()
+                response = await client.get("/health")
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200
+                await asyncio.sleep(0.005)
+            await asyncio.gather(*tasks)
+        return latencies
+
+    try:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            jobs = []
+            for index in range(concurrent_uploads):
+                source = os.path.join(temp_dir, f"source_{index}.mp4")
+                create_test_clip(source, width=1920, height=1080, fps=30, frames=30)
+                jobs.append((source, os.path.join(temp_dir, f"out_{index}.mp4"), os.path.join(temp_dir, f"thumb_{index}.jpg")))
+
+            latencies = sorted(asyncio.run(measure_health_latency(jobs)))
+    finally:
+        shutdown_media_executor()
+
+    assert len(latencies) >= 10
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    # Running inline, a single transcode would block /health for over a second
+    assert p99 < 0.25
+
+def test_stage_timeout_leaves_other_stages_running():
+    """A stuck stage is killed on its own; work sharing the media pool carries on"""
+    async def run_both():
+        shared = asyncio.create_task(run_blocking(time.sleep, 1, timeout=10, stage="faststart"))
+        with pytest.raises(StageTimeoutError):
+            await run_blocking(time.sleep, 30, timeout=0.5, stage="probe", isolated=True)
+        await shared
+
+    try:
+        started = time.perf_counter()
+        asyncio.run(run_both())
+        assert time.perf_counter() - started < 10
+    finally:
+        shutdown_media_executor()
+
+def test_run_ffmpeg_kills_overrunning_command_and_removes_partial_output(tmp_path):
+    partial = tmp_path / "optimized.mp4"
+    partial.write_bytes(b"half written")
+    hls_dir = tmp_path / "hls"
+    (hls_dir / "240p").mkdir(parents=True)
+
+    started = time.perf_counter()
+    with pytest.raises(StageTimeoutError):
+        media_processing.run_ffmpeg(["sleep", "30"], timeout=0.2, partial_outputs=[str(partial), str(hls_dir)])
+    assert time.perf_counter() - started < 5
+    assert not partial.exists() and not hls_dir.exists()
+
+def test_select_ladder_never_upscales():
+    ladder = media_processing.parse_ladder("720:2500, 240:400,480:1000")
+    assert ladder == [(240, 400), (480, 1000), (720, 2500)]
+    assert media_processing.select_ladder(ladder, 1080) == ladder
+    assert media_processing.select_ladder(ladder, 480) == [(240, 400), (480, 1000)]
+    # Sources below the lowest rung still get a single rendition at their own height
+    assert media_processing.select_ladder(ladder, 181) == [(180, 400)]
+
+def test_parse_master_playlist():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        master_path = os.path.join(temp_dir, "master.m3u8")
+        with open(master_path, "w") as f:
+            f.write(
+                "#EXTM3U\n#EXT-X-VERSION:7\n"
+                '#EXT-X-STREAM-INF:BANDWIDTH=545600,RESOLUTION=426x240,CODECS="avc1.640015,mp4a.40.2"\n'
+                "240p/index.m3u8\n\n"
+                "#EXT-X-STREAM-INF:BANDWIDTH=1205600,RESOLUTION=854x480\n"
+                "480p/index.m3u8\n"
+            )
+
+        renditions = media_processing.parse_master_playlist(master_path)
+
+    assert renditions == [
+        {"name": "240p", "width": 426, "height": 240, "bandwidth": 545600,
+         "codecs": "avc1.640015,mp4a.40.2", "playlist": "240p/index.m3u8"},
+        {"name": "480p", "width": 854, "height": 480, "bandwidth": 1205600,
+         "codecs": None, "playlist": "480p/index.m3u8"},
+    ]
+
+@pytest.mark.skipif(not media_processing.ffmpeg_available(FFMPEG_BINARY), reason="ffmpeg not installed")
+def test_package_hls_writes_ladder():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, "source.mp4")
+        output_dir = os.path.join(temp_dir, "hls")
+        create_test_clip(source, width=640, height=480, fps=10, frames=30)
+
+        renditions = media_processing.package_hls(source, output_dir, 480, [(240, 400), (480, 1000), (720, 2500)], 2, FFMPEG_BINARY)
+
+        assert [r["name"] for r in renditions] == ["240p", "480p"]
+        for rendition in renditions:
+            playlist_dir = os.path.join(output_dir, rendition["name"])
+            assert os.path.exists(os.path.join(output_dir, rendition["playlist"]))
+            assert any(name.endswith(".m4s") for name in os.listdir(playlist_dir))
+
+@pytest.mark.skipif(not media_processing.ffmpeg_available(FFMPEG_BINARY), reason="ffmpeg not installed")
+def test_ffmpeg_transcoder_keeps_audio():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, "source.mov")
+        output = os.path.join(temp_dir, "optimized.mp4")
+        thumbnail = os.path.join(temp_dir, "thumb.jpg")
+        subprocess.run([
+            FFMPEG_BINARY, "-y", "-loglevel", "error",
+            "-f", "lavfi", "-i", "testsrc=size=960x800:rate=30",
+            "-f", "lavfi", "-i", "sine=frequency=440",
+            "-t", "2", "-c:v", "libx264", "-preset", "ultrafast", "-c:a", "aac", "-shortest", source
+        ], check=True)
+
+        media_info = FFmpegTranscoder(FFMPEG_BINARY).transcode(source, output, thumbnail, max_duration=10.0)
+
+        assert (media_info.output_width, media_info.output_height) == (864, 720)
+        assert media_info.duration == pytest.approx(2.0, abs=0.1)
+        assert media_processing.has_audio_stream(output, FFMPEG_BINARY)
+        assert os.path.getsize(thumbnail) > 0
+        mp4.validate_faststart(output)
+
+WEB_READY_INFO = {
+    "containers": ["mov", "mp4", "m4a", "3gp", "3g2", "mj2"],
+    "duration": 5.0,
+    "bitrate_kbps": 1800,
+    "video_streams": [{"codec": "h264", "yuv420p": True, "width": 1280, "height": 720}],
+    "audio_codecs": ["aac"],
+}
+
+def test_is_web_ready_accepts_typical_phone_upload():
+    assert media_processing.is_web_ready(WEB_READY_INFO, max_bitrate_kbps=5000)
+    assert media_processing.is_web_ready({**WEB_READY_INFO, "audio_codecs": []}, max_bitrate_kbps=5000)
+
+@pytest.mark.parametrize("override", [
+    {"containers": ["matroska", "webm"]},
+    {"bitrate_kbps": 12000},
+    {"audio_codecs": ["opus"]},
+    {"video_streams": [{"codec": "hevc", "yuv420p": True, "width": 1280, "height": 720}]},
+    {"video_streams": [{"codec": "h264", "yuv420p": False, "width": 1280, "height": 720}]},
+    {"video_streams": [{"codec": "h264", "yuv420p": True, "width": 1920, "height": 1080}]},
+])
+def test_is_web_ready_rejects_inputs_needing_transcode(override):
+    assert not media_processing.is_web_ready({**WEB_READY_INFO, **override}, max_bitrate_kbps=5000)
+
+@pytest.mark.skipif(not media_processing.ffmpeg_available(FFMPEG_BINARY), reason="ffmpeg not installed")
+def test_remux_web_ready_skips_transcode():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        source = os.path.join(temp_dir, "source.mp4")
+        output = os.path.join(temp_dir, "optimized.mp4")
+        thumbnail = os.path.join(temp_dir, "thumb.jpg")
+        subprocess.run([
+            FFMPEG_BINARY, "-y", "-loglevel", "error",
+            "-f", "lavfi", "-i", "testsrc=size=640x360:rate=30",
+            "-f", "lavfi", "-i", "sine=frequency=440",
+            "-t", "2", "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p",
+            "-c:a", "aac", "-shortest", source
+        ], check=True)
+
+        media_info = media_processing.remux_web_ready(source, output, thumbnail, 10.0, 5000, FFMPEG_BINARY)
+
+        assert media_info.transcode_mode == "remux"
+        assert (media_info.output_width, media_info.output_height) == (640, 360)
+        assert media_processing.has_audio_stream(output, FFMPEG_BINARY)
+        assert os.path.getsize(thumbnail) > 0
+        mp4.validate_faststart(output)
+
+        # MPEG-4 Part 2 is not web-ready and must take the full transcode
+        legacy = os.path.join(temp_dir, "legacy.mp4")
+        create_test_clip(legacy)
+        assert media_processing.remux_web_ready(legacy, output, thumbnail, 10.0, 5000, FFMPEG_BINARY) is None
+
+def read_frames(path):
+    capture = cv2.VideoCapture(path)
+    frames = []
+    while True:
+        ret, frame = capture.read()
+        if not ret:
+            break
+        frames.append(frame)
+    capture.release()
+    return frames
+
+def test_make_faststart_moves_moov_ahead_of_mdat():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "clip.mp4")
+        create_test_clip(path)
+        # OpenCV finalizes the file by appending moov after the media data
+        assert mp4.top_level_layout(path)[-1] == b"moov"
+        with pytest.raises(ValueError, match="not ahead of mdat"):
+            mp4.validate_faststart(path)
+        original_size = os.path.getsize(path)
+        original_frames = read_frames(path)
+
+        assert mp4.make_faststart(path) is True
+
+        mp4.validate_faststart(path)
+        assert os.path.getsize(path) == original_size
+        # Chunk offsets were patched, so every frame still decodes identically
+        relocated_frames = read_frames(path)
+        assert len(relocated_frames) == len(original_frames)
+        assert all((a == b).all() for a, b in zip(original_frames, relocated_frames))
+        # Already faststart: nothing to rewrite
+        assert mp4.make_faststart(path) is False
+
+def box(box_type, payload):
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+def chunk_offsets(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    stco = data.index(b"stco")
+    count = struct.unpack_from(">I", data, stco + 8)[0]
+    return data, list(struct.unpack_from(f">{count}I", data, stco + 12))
+
+def test_make_faststart_only_shifts_offsets_into_media_before_moov():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "split.mp4")
+        ftyp = box(b"ftyp", b"isom\x00\x00\x02\x00isom")
+        first_mdat = box(b"mdat", b"A" * 32)
+        first_chunk = len(ftyp) + 8
+
+        def moov_for(second_chunk):
+            stco = box(b"stco", struct.pack(">II", 0, 2) + struct.pack(">II", first_chunk, second_chunk))
+            return box(b"moov", box(b"trak", box(b"mdia", box(b"minf", box(b"stbl", stco)))))
+
+        # A second mdat after moov, as some muxers write when appending
+        moov_size = len(moov_for(0))
+        second_chunk = len(ftyp) + len(first_mdat) + moov_size + 8
+        with open(path, "wb") as f:
+            f.write(ftyp + first_mdat + moov_for(second_chunk) + box(b"mdat", b"B" * 32))
+
+        assert mp4.make_faststart(path) is True
+
+        assert mp4.top_level_layout(path) == [b"ftyp", b"moov", b"mdat", b"mdat"]
+        data, offsets = chunk_offsets(path)
+        assert offsets == [first_chunk + moov_size, second_chunk]
+        assert [data[offset:offset + 4] for offset in offsets] == [b"AAAA", b"BBBB"]
@@ -111,6 +111,18 @@ class TestVideoStreaming:
         response = client.get("/videos/999999999/stream")
         assert response.status_code == 404  # Not found
     
+    def test_hls_endpoints(self):
+        """Test adaptive streaming playlist and segment endpoints"""
+        response = client.get("/videos/1/hls/master.m3u8")
+        assert response.status_code == 404  # Video doesn't exist
+        
+        response = client.get("/videos/1/hls/480p/seg_000.m4s")
+        assert response.status_code == 404
+        
+        # Path traversal is rejected before any lookup
+        response = client.get("/videos/1/hls/..%2F..%2Fconfig.py/index.m3u8")
+        assert response.status_code == 404
+    
     def test_video_thumbnail_endpoint(self):
         """Test video thumbnail endpoint"""
         response = client.get("/videos/1/thumbnail")